@@ -0,0 +1,224 @@
+import math
+import threading
+import time
+from collections import deque
+from flask import current_app, request, g, jsonify, make_response
+
+
+# Highest priority first; a class is shed while any higher one is queueing
+ADMISSION_CLASSES = ("critical", "normal", "bulk")
+
+# Requests not subject to admission (long-lived streams would pin a slot)
+EXEMPT = "exempt"
+
+
+class AdmissionClass:
+    """
+    Concurrency limit for one request class: up to `limit` requests run
+    at once, up to `max_queue` more wait (at most `queue_timeout`
+    seconds), anything beyond is rejected immediately.
+    """
+
+    # Recent queue waits kept for percentiles
+    SAMPLES = 1024
+
+    def __init__(self, name: str, *, limit: int, max_queue: int, queue_timeout: float, retry_after: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self._cond = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+
+        self.admitted = 0
+        self.queued = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        self.shed_priority = 0
+        self.wait_seconds = 0.0
+        self._waits = deque(maxlen=self.SAMPLES)
+
+    def acquire(self) -> bool:
+        with self._cond:
+            if self.active < self.limit and self.waiting == 0:
+                self.active += 1
+                self.admitted += 1
+                return True
+
+            if self.waiting >= self.max_queue:
+                self.shed_queue_full += 1
+                return False
+
+            self.waiting += 1
+            self.queued += 1
+            started = time.monotonic()
+            deadline = started + self.queue_timeout
+
+            try:
+                while self.active >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.shed_timeout += 1
+                        # A release may have woken this waiter just as
+                        # it timed out; pass the wakeup on
+                        self._cond.notify()
+                        return False
+                    self._cond.wait(remaining)
+            finally:
+                self.waiting -= 1
+                waited = time.monotonic() - started
+                self.wait_seconds += waited
+                self._waits.append(waited)
+
+            self.active += 1
+            self.admitted += 1
+            return True
+
+    def release(self) -> None:
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    def shed_for_priority(self) -> None:
+        with self._cond:
+            self.shed_priority += 1
+
+    def metrics(self) -> dict:
+        with self._cond:
+            waits = sorted(self._waits)
+            return {
+                "limit": self.limit,
+                "max_queue": self.max_queue,
+                "active": self.active,
+                "waiting": self.waiting,
+                "admitted": self.admitted,
+                "queued": self.queued,
+                "shed_queue_full": self.shed_queue_full,
+                "shed_timeout": self.shed_timeout,
+                "shed_priority": self.shed_priority,
+                "avg_queue_ms": round(self.wait_seconds / self.queued * 1000, 2) if self.queued else 0.0,
+                "p95_queue_ms": round(waits[max(0, math.ceil(len(waits) * 0.95) - 1)] * 1000, 2) if waits else 0.0,
+            }
+
+
+class AdmissionController:
+    """
+    Per-process admission control over request classes, checked before
+    the view runs: a shed request costs no DB work and gets 503 with
+    Retry-After.
+    """
+
+    def __init__(self, classes: dict, routes: dict, default_class: str = "normal"):
+        self.classes = classes
+        self.default_class = default_class
+        # Longest prefix first
+        self.routes = sorted(routes.items(), key=lambda r: len(r[0]), reverse=True)
+
+    @classmethod
+    def from_config(cls, config) -> "AdmissionController":
+        limits = config.get("ADMISSION_LIMITS", {})
+        classes = {
+            name: AdmissionClass(name, **limits[name])
+            for name in ADMISSION_CLASSES
+            if name in limits
+        }
+        return cls(
+            classes,
+            config.get("ADMISSION_ROUTES", {}),
+            config.get("ADMISSION_DEFAULT_CLASS", "normal"),
+        )
+
+    def classify(self, method: str, path: str) -> str:
+        for prefix, request_class in self.routes:
+            # "GET /api/..." entries only match that method
+            if " " in prefix:
+                prefix_method, prefix = prefix.split(" ", 1)
+                if prefix_method != method:
+                    continue
+            if path.startswith(prefix):
+                return request_class
+        return self.default_class
+
+    def admit(self, request_class: str) -> AdmissionClass | None:
+        """
+        Returns the class slot to release after the request, or None
+        when the request is shed.
+        """
+
+        admission = self.classes[request_class]
+
+        # Priority shedding: higher classes are already queueing, so
+        # lower ones give up their turn instead of competing for the DB
+        rank = ADMISSION_CLASSES.index(request_class)
+        for higher in ADMISSION_CLASSES[:rank]:
+            other = self.classes.get(higher)
+            if other is not None and other.waiting > 0:
+                admission.shed_for_priority()
+                return None
+
+        return admission if admission.acquire() else None
+
+    def metrics(self) -> dict:
+        return {name: admission.metrics() for name, admission in self.classes.items()}
+
+
+def get_admission_controller() -> AdmissionController:
+    """
+    Returns the app-wide controller, built from config on first use.
+    """
+
+    controller = current_app.extensions.get("admission")
+    if controller is None:
+        controller = AdmissionController.from_config(current_app.config)
+        current_app.extensions["admission"] = controller
+
+    return controller
+
+
+def admission_metrics() -> dict:
+    """
+    Per-class counters and queue times for /api/admin/metrics
+    (empty when admission control is off).
+    """
+
+    if not current_app.config.get("ADMISSION_ENABLED"):
+        return {}
+    return get_admission_controller().metrics()
+
+
+def init_admission(app) -> None:
+    """
+    With ADMISSION_ENABLED on, every request takes a slot of its class
+    (ADMISSION_ROUTES) before the view runs and gives it back when the
+    request context ends (after streamed responses finish).
+    """
+
+    if not app.config.get("ADMISSION_ENABLED"):
+        return
+
+    with app.app_context():
+        controller = get_admission_controller()
+
+    @app.before_request
+    def admit_request():
+        request_class = controller.classify(request.method, request.path)
+        if request_class == EXEMPT or request_class not in controller.classes:
+            return None
+
+        admission = controller.admit(request_class)
+        if admission is None:
+            response = make_response(jsonify({"message": "Server busy, retry later"}), 503)
+            response.headers["Retry-After"] = str(controller.classes[request_class].retry_after)
+            return response
+
+        g.admission = admission
+        return None
+
+    @app.teardown_request
+    def release_slot(exc):
+        admission = g.pop("admission", None)
+        if admission is not None:
+            admission.release()
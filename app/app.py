@@ -1,4 +1,6 @@
 from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
+import models
 from models import db
 from routes.auth_routes import auth_bp
 from routes.admin_routes import admin_bp
@@ -7,7 +9,17 @@ from routes.view_my_profile import profile
 from routes.leave_routes import leave_bp
 from routes.attendance_routes import attendance_bp
 from routes.report_routes import report_bp
+from routes.export_routes import export_bp
+from routes.event_routes import event_bp
+from routes.dashboard_routes import dashboard_bp
 from config import Config
+from commands import register_commands
+from outbox import start_outbox_worker
+from json_provider import JSON_PROVIDERS
+from auth import bcrypt
+from startup import warm_up
+from query_counter import init_query_counter
+from admission import init_admission
 
 
 def create_app():
@@ -18,10 +30,33 @@ def create_app():
     # --------------------------s
     app.config.from_object(Config)
 
+    # Key column types were chosen when models was imported
+    if app.config.get("COMPACT_KEY_STORAGE", False) != models.COMPACT_KEY_STORAGE:
+        raise RuntimeError(
+            "COMPACT_KEY_STORAGE must be set in the environment before "
+            "models is imported; app.config cannot switch it"
+        )
+
+    # --------------------------
+    # JSON
+    # --------------------------
+    app.json = JSON_PROVIDERS[app.config.get("JSON_PROVIDER", "fast")](app)
+
+    # --------------------------
+    # Proxy
+    # --------------------------
+    # remote_addr from the trusted proxies' X-Forwarded-For entry only
+    proxies = app.config.get("TRUSTED_PROXY_COUNT", 0)
+    if proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies)
+
     # --------------------------
     # Extensions
     # --------------------------
     db.init_app(app)
+    bcrypt.init_app(app)
+    init_query_counter(app)
+    init_admission(app)
 
     # --------------------------
     # Blueprints
@@ -33,7 +68,28 @@ def create_app():
     app.register_blueprint(leave_bp)
     app.register_blueprint(attendance_bp)
     app.register_blueprint(report_bp)
+    app.register_blueprint(export_bp)
+    app.register_blueprint(event_bp)
+    app.register_blueprint(dashboard_bp)
 
+    # --------------------------
+    # CLI
+    # --------------------------
+    register_commands(app)
+
+    # --------------------------
+    # Background workers
+    # --------------------------
+    if app.config.get("OUTBOX_WORKER_IN_PROCESS"):
+        start_outbox_worker(app)
+
+    # --------------------------
+    # Warm-up
+    # --------------------------
+    if app.config.get("WARM_UP_ON_START"):
+        with app.app_context():
+            stats = warm_up()
+        app.logger.info(f"Warm-up done: {stats}")
 
 
     return app
@@ -1,5 +1,13 @@
 from datetime import datetime, date, timedelta
-from models import db, Attendance
+from flask import current_app
+from sqlalchemy import update, func, or_, and_
+from sqlalchemy.exc import IntegrityError
+from models import db, Attendance, AttendanceSession, Users, UsersInfo
+from cache import TTLCache
+from events import publish_event
+from outbox import enqueue
+from work_calendar import get_work_calendar, get_user_department
+from shifts import shift_for_user, classify_status, status_value
 from exceptions import (
     AttendanceError,
     AlreadyClockedIn,
@@ -8,9 +16,26 @@ from exceptions import (
 )
 
 
+# How each backend reports the two clock-in constraints: SQL Server
+# and PostgreSQL name the index, SQLite lists its columns
+_CLOCK_IN_CONSTRAINTS = (
+    "uq_attendance_user_date",
+    "uq_attendance_sessions_open",
+    "attendance.user_id, attendance.date",
+    "attendance_sessions.user_id",
+)
+
+
+def _is_clock_in_conflict(error: IntegrityError) -> bool:
+    message = str(error.orig)
+    return any(marker in message for marker in _CLOCK_IN_CONSTRAINTS)
+
+
 def clock_in(*, user_id: str) -> dict:
     """
-    Records clock-in for the current day.
+    Starts a work session for the current day. The first clock-in
+    creates today's row (or claims an 'absent' one written by the
+    nightly job); later ones (after a clock-out) reopen it.
     Returns attendance record dict.
     Raises AttendanceError subclasses on failure.
     """
@@ -18,31 +43,85 @@ def clock_in(*, user_id: str) -> dict:
     today = date.today()
     now = datetime.utcnow()
 
-    # ------------------------
-    # Check if already clocked in today
-    # ------------------------
-    existing = Attendance.query.filter_by(
-        user_id=user_id,
-        date=today
-    ).first()
-
-    if existing:
-        raise AlreadyClockedIn("Already clocked in today")
-
     try:
-        record = Attendance(
-            user_id=user_id,
-            date=today,
-            clock_in=now,
-            clock_out=None,
-            status="present",
-            created_at=now,
-            updated_at=now,
-        )
-        db.session.add(record)
+        # Late/present is decided here and stored; half_day only once
+        # the day is closed again
+        shift = shift_for_user(user_id)
+
+        # ------------------------
+        # Reopen today's row if every session so far is closed, or
+        # claim it if it has no clock-in yet (explicit 'absent')
+        # ------------------------
+        first_clock_in = func.coalesce(Attendance.clock_in, now)
+        record = db.session.execute(
+            update(Attendance).where(
+                Attendance.user_id == user_id,
+                Attendance.date == today,
+                or_(
+                    and_(Attendance.clock_in.isnot(None), Attendance.open_since.is_(None)),
+                    Attendance.clock_in.is_(None),
+                ),
+            ).values(
+                clock_in=first_clock_in,
+                clock_out=None,
+                open_since=now,
+                status=status_value(shift, day=today, worked_seconds=Attendance.worked_seconds, closed=False, clock_in=first_clock_in),
+                updated_at=now,
+            ).returning(
+                Attendance.attendance_id,
+                Attendance.date,
+                Attendance.clock_in,
+                Attendance.clock_out,
+                Attendance.status,
+                Attendance.worked_seconds,
+            ).execution_options(synchronize_session=False)
+        ).first()
+
+        # ------------------------
+        # uq_attendance_user_date rejects a second row for today and
+        # uq_attendance_sessions_open a second open session
+        # ------------------------
+        try:
+            if record is None:
+                record = Attendance(
+                    user_id=user_id,
+                    date=today,
+                    clock_in=now,
+                    clock_out=None,
+                    open_since=now,
+                    worked_seconds=0,
+                    status=classify_status(shift, day=today, clock_in=now, worked_seconds=0, closed=False),
+                    created_at=now,
+                    updated_at=now,
+                )
+                db.session.add(record)
+                db.session.flush()
+
+            db.session.add(AttendanceSession(
+                attendance_id=record.attendance_id,
+                user_id=user_id,
+                date=today,
+                started_at=now,
+                created_at=now,
+                updated_at=now,
+            ))
+            db.session.flush()
+        except IntegrityError as e:
+            if not _is_clock_in_conflict(e):
+                raise
+            raise AlreadyClockedIn("Already clocked in")
+
+        enqueue("attendance.clock_in", {
+            "user_id": user_id,
+            "date": today,
+            "clock_in": now,
+        })
         db.session.commit()
 
-        return _format_attendance(record)
+        result = _format_attendance(record)
+        publish_event("attendance.clock_in", {"user_id": user_id, **result})
+
+        return result
 
     except (AlreadyClockedIn,):
         db.session.rollback()
@@ -54,7 +133,8 @@ def clock_in(*, user_id: str) -> dict:
 
 def clock_out(*, user_id: str) -> dict:
     """
-    Records clock-out for the current day.
+    Ends the user's open work session (also one started before
+    midnight) and adds it to that day's worked_seconds.
     Returns attendance record dict.
     Raises AttendanceError subclasses on failure.
     """
@@ -62,26 +142,68 @@ def clock_out(*, user_id: str) -> dict:
     today = date.today()
     now = datetime.utcnow()
 
-    # ------------------------
-    # Check if clocked in today
-    # ------------------------
-    record = Attendance.query.filter_by(
-        user_id=user_id,
-        date=today
-    ).first()
-
-    if not record:
-        raise NotClockedIn("Not clocked in today")
-
-    if record.clock_out is not None:
-        raise AlreadyClockedOut("Already clocked out today")
-
     try:
-        record.clock_out = now
-        record.updated_at = now
+        # ------------------------
+        # Close the open session; RETURNING hands back what the
+        # aggregate update needs
+        # ------------------------
+        session = db.session.execute(
+            update(AttendanceSession).where(
+                AttendanceSession.user_id == user_id,
+                AttendanceSession.ended_at.is_(None),
+            ).values(
+                ended_at=now,
+                updated_at=now,
+            ).returning(
+                AttendanceSession.attendance_id,
+                AttendanceSession.date,
+                AttendanceSession.started_at,
+            ).execution_options(synchronize_session=False)
+        ).first()
+
+        if session is None:
+            # Failure path only: find out why nothing matched
+            existing = Attendance.query.filter_by(user_id=user_id, date=today).first()
+
+            if not existing or existing.clock_in is None:
+                raise NotClockedIn("Not clocked in today")
+            raise AlreadyClockedOut("Already clocked out today")
+
+        seconds = max(0, int((now - session.started_at).total_seconds()))
+        worked_seconds = Attendance.worked_seconds + seconds
+
+        record = db.session.execute(
+            update(Attendance).where(
+                Attendance.attendance_id == session.attendance_id,
+            ).values(
+                clock_out=now,
+                open_since=None,
+                worked_seconds=worked_seconds,
+                status=status_value(
+                    shift_for_user(user_id), day=session.date, worked_seconds=worked_seconds, closed=True
+                ),
+                updated_at=now,
+            ).returning(
+                Attendance.attendance_id,
+                Attendance.date,
+                Attendance.clock_in,
+                Attendance.clock_out,
+                Attendance.status,
+                Attendance.worked_seconds,
+            ).execution_options(synchronize_session=False)
+        ).one()
+
+        enqueue("attendance.clock_out", {
+            "user_id": user_id,
+            "date": record.date,
+            "clock_out": now,
+        })
         db.session.commit()
 
-        return _format_attendance(record)
+        result = _format_attendance(record)
+        publish_event("attendance.clock_out", {"user_id": user_id, **result})
+
+        return result
 
     except (NotClockedIn, AlreadyClockedOut):
         db.session.rollback()
@@ -103,6 +225,93 @@ def get_today_summary(*, user_id: str) -> dict:
         date=today
     ).first()
 
+    return build_today_summary(record, today=today)
+
+
+def get_weekly_attendance(*, user_id: str) -> list:
+    """
+    Returns attendance records for the current week (Monday to Sunday).
+    """
+
+    today = date.today()
+    monday, sunday = week_bounds(today)
+
+    records = get_attendance_range(user_id=user_id, start=monday, end=sunday)
+
+    return build_week(records, today=today)
+
+
+def get_monthly_stats(*, user_id: str) -> dict:
+    """
+    Returns monthly attendance statistics for the current month.
+    """
+
+    today = date.today()
+    first_of_month = today.replace(day=1)
+
+    records = get_attendance_range(user_id=user_id, start=first_of_month, end=today)
+
+    return build_monthly_stats(
+        records, today=today, department=get_user_department(user_id)
+    )
+
+
+# --------------------------
+# Builders
+# --------------------------
+# Pure functions over already-fetched rows, so one range query can
+# feed several views (see dashboard.py).
+
+def week_bounds(today: date) -> tuple[date, date]:
+    """
+    Returns (Monday, Sunday) of the week containing `today`.
+    """
+
+    monday = today - timedelta(days=today.weekday())
+    return monday, monday + timedelta(days=6)
+
+
+def get_attendance_range(*, user_id: str, start: date, end: date) -> list:
+    """
+    Returns the user's attendance rows between start and end (inclusive).
+    """
+
+    return Attendance.query.filter(
+        Attendance.user_id == user_id,
+        Attendance.date >= start,
+        Attendance.date <= end
+    ).all()
+
+
+def counts_as_worked(record: Attendance, *, today: date) -> bool:
+    """
+    Whether a row counts as a worked day: it has at least one closed
+    session, or a session is open today. Older open rows are closed by
+    the nightly job and do not count until then.
+    """
+
+    if record.clock_in is None:
+        return False
+    return record.clock_out is not None or record.date == today
+
+
+def worked_seconds_so_far(record: Attendance, *, today: date, now: datetime) -> float:
+    """
+    Seconds worked on a row's day: the closed-session aggregate plus,
+    for today, the open session so far. Never sums raw sessions.
+    """
+
+    seconds = record.worked_seconds or 0
+    if record.open_since is not None and record.date == today:
+        seconds += max(0.0, (now - record.open_since).total_seconds())
+    return seconds
+
+
+def build_today_summary(record: Attendance | None, *, today: date) -> dict:
+    """
+    Today's summary from today's row (None when there is none).
+    """
+
     if not record:
         return {
             "date": today.strftime("%d %b %Y"),
@@ -110,6 +319,7 @@ def get_today_summary(*, user_id: str) -> dict:
             "clock_out": None,
             "status": "absent",
             "is_clocked_in": False,
+            "worked_hours": 0.0,
         }
 
     return {
@@ -117,25 +327,19 @@ def get_today_summary(*, user_id: str) -> dict:
         "clock_in": record.clock_in.strftime("%I:%M %p") if record.clock_in else None,
         "clock_out": record.clock_out.strftime("%I:%M %p") if record.clock_out else None,
         "status": record.status,
-        "is_clocked_in": record.clock_out is None,
+        "is_clocked_in": record.clock_in is not None and record.clock_out is None,
+        "worked_hours": round(
+            worked_seconds_so_far(record, today=today, now=datetime.utcnow()) / 3600.0, 2
+        ),
     }
 
 
-def get_weekly_attendance(*, user_id: str) -> list:
+def build_week(records: list, *, today: date) -> list:
     """
-    Returns attendance records for the current week (Monday to Sunday).
+    Monday-to-Sunday strip; rows outside the week are ignored.
     """
 
-    today = date.today()
-    weekday = today.weekday()  # Monday=0, Sunday=6
-    monday = today - timedelta(days=weekday)
-    sunday = monday + timedelta(days=6)
-
-    records = Attendance.query.filter(
-        Attendance.user_id == user_id,
-        Attendance.date >= monday,
-        Attendance.date <= sunday
-    ).all()
+    monday, _ = week_bounds(today)
 
     # Index by date for quick lookup
     records_by_date = {r.date: r for r in records}
@@ -157,41 +361,31 @@ def get_weekly_attendance(*, user_id: str) -> list:
     return week
 
 
-def get_monthly_stats(*, user_id: str) -> dict:
+def build_monthly_stats(records: list, *, today: date, department: str | None) -> dict:
     """
-    Returns monthly attendance statistics for the current month.
+    Month-to-date stats; rows outside the month are ignored.
     """
 
-    today = date.today()
     first_of_month = today.replace(day=1)
 
-    records = Attendance.query.filter(
-        Attendance.user_id == user_id,
-        Attendance.date >= first_of_month,
-        Attendance.date <= today
-    ).all()
-
-    total_hours = 0.0
+    now = datetime.utcnow()
+    total_seconds = 0
     days_present = 0
 
     for record in records:
-        if record.clock_in and record.clock_out:
-            diff = (record.clock_out - record.clock_in).total_seconds() / 3600.0
-            total_hours += diff
-            days_present += 1
-        elif record.clock_in:
-            # Still clocked in, count hours so far
-            diff = (datetime.utcnow() - record.clock_in).total_seconds() / 3600.0
-            total_hours += diff
+        if not first_of_month <= record.date <= today:
+            continue
+
+        if counts_as_worked(record, today=today):
+            total_seconds += worked_seconds_so_far(record, today=today, now=now)
             days_present += 1
 
-    # Expected: 8 hours per working day (Mon-Fri) in the month so far
-    expected_days = 0
-    current = first_of_month
-    while current <= today:
-        if current.weekday() < 5:  # Monday to Friday
-            expected_days += 1
-        current += timedelta(days=1)
+    total_hours = total_seconds / 3600.0
+
+    # Expected: 8 hours per working day in the month so far
+    expected_days = get_work_calendar().working_days_between(
+        first_of_month, today, department
+    )
 
     expected_hours = expected_days * 8
     avg_daily = round(total_hours / days_present, 1) if days_present > 0 else 0.0
@@ -205,9 +399,94 @@ def get_monthly_stats(*, user_id: str) -> dict:
     }
 
 
+# Department snapshots shared by every request in this worker
+_live_cache = TTLCache(ttl_seconds=5)
+
+
+def get_live_attendance(*, department: str | None = None) -> dict:
+    """
+    Returns today's attendance state for a department (or the whole
+    company): counts by status and the employees currently clocked in.
+    Served from a short-TTL snapshot so polling displays share one query.
+    """
+
+    ttl = current_app.config.get("LIVE_ATTENDANCE_TTL_SECONDS", 5)
+
+    return _live_cache.get_or_set(
+        department or "*",
+        lambda: _build_live_attendance(department=department),
+        ttl_seconds=ttl,
+    )
+
+
+def _build_live_attendance(*, department: str | None) -> dict:
+    today = date.today()
+
+    # One query: active clients joined to today's row via (date, user_id)
+    query = db.session.query(
+        UsersInfo.user_id,
+        UsersInfo.name,
+        UsersInfo.employee_id,
+        UsersInfo.department,
+        Attendance.clock_in,
+        Attendance.clock_out,
+        Attendance.status,
+    ).join(
+        Users, Users.user_id == UsersInfo.user_id
+    ).outerjoin(
+        Attendance,
+        (Attendance.date == today) & (Attendance.user_id == UsersInfo.user_id)
+    ).filter(
+        Users.role == "client",
+        Users.is_active.is_(True),
+    )
+
+    if department:
+        query = query.filter(UsersInfo.department == department)
+
+    counts = {
+        "present": 0,
+        "late": 0,
+        "half_day": 0,
+        "absent": 0,
+        "not_clocked_in": 0,
+    }
+    clocked_in = []
+
+    for row in query.all():
+        if row.status is None:
+            counts["not_clocked_in"] += 1
+            continue
+
+        counts[row.status] = counts.get(row.status, 0) + 1
+
+        if row.clock_in is not None and row.clock_out is None:
+            clocked_in.append({
+                "user_id": row.user_id,
+                "employee_name": row.name,
+                "employee_id": row.employee_id,
+                "department": row.department,
+                "clock_in": row.clock_in.strftime("%I:%M %p"),
+                "status": row.status,
+            })
+
+    clocked_in.sort(key=lambda e: e["employee_name"])
+
+    return {
+        "date": today.strftime("%d %b %Y"),
+        "department": department,
+        "total_employees": sum(counts.values()),
+        "counts": counts,
+        "clocked_in_count": len(clocked_in),
+        "clocked_in": clocked_in,
+        "generated_at": datetime.utcnow(),
+    }
+
+
 def _format_attendance(record: Attendance) -> dict:
     """
-    Formats an attendance record into a response dict.
+    Formats an attendance record (or a RETURNING row with the same
+    attribute names) into a response dict.
     """
     return {
         "attendance_id": record.attendance_id,
@@ -215,5 +494,6 @@ def _format_attendance(record: Attendance) -> dict:
         "clock_in": record.clock_in.strftime("%I:%M %p") if record.clock_in else None,
         "clock_out": record.clock_out.strftime("%I:%M %p") if record.clock_out else None,
         "status": record.status,
-        "is_clocked_in": record.clock_out is None,
+        "is_clocked_in": record.clock_in is not None and record.clock_out is None,
+        "worked_hours": round((record.worked_seconds or 0) / 3600.0, 2),
     }
@@ -0,0 +1,302 @@
+import time
+from datetime import datetime, date, timedelta
+from flask import current_app
+from sqlalchemy import select, update, insert, literal, literal_column, func, cast, exists, case, and_
+from models import db, Attendance, AttendanceSession, LeaveRequests, Shift, Users, UsersInfo, DEPARTMENTS
+from work_calendar import get_work_calendar
+from shifts import load_shift_rules
+from exceptions import AttendanceJobError
+
+
+def run_nightly_attendance(*, day: date | None = None, days: int = 1) -> dict:
+    """
+    Nightly batch job:
+    - closes open attendance rows from before today using the
+      configured AUTO_CLOCK_OUT_POLICY
+    - writes explicit 'absent' rows for working days with no record
+      (`day` defaults to yesterday; `days` walks backwards for backfill)
+    - re-derives late/half_day for the processed days, so rows closed
+      by the auto clock-out get a final status
+    Returns rows touched and runtime.
+    Raises AttendanceJobError on failure.
+    """
+
+    started = time.perf_counter()
+    day = day or (date.today() - timedelta(days=1))
+
+    try:
+        closed = close_stale_attendance(before=date.today())
+
+        absent = 0
+        for offset in range(days):
+            absent += mark_absent_day(day=day - timedelta(days=offset))
+
+        reclassified = reclassify_window(start=day - timedelta(days=days - 1), end=day)
+
+        db.session.commit()
+
+    except Exception as e:
+        db.session.rollback()
+        raise AttendanceJobError("Nightly attendance job failed") from e
+
+    return {
+        "closed": closed,
+        "absent_inserted": absent,
+        "reclassified": reclassified,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def close_stale_attendance(*, before: date) -> int:
+    """
+    Closes every open session dated before `before`, and folds it into
+    its attendance row, as two set-based UPDATEs. Must be called inside
+    an active transaction.
+    Returns number of attendance rows closed.
+    """
+
+    policy = current_app.config.get("AUTO_CLOCK_OUT_POLICY", "shift_hours")
+
+    if policy == "shift_hours":
+        hours = current_app.config.get("AUTO_CLOCK_OUT_HOURS", 8)
+        ended_at = _add_hours(AttendanceSession.started_at, hours)
+        clock_out = _add_hours(Attendance.open_since, hours)
+        credit = hours * 3600
+    elif policy == "no_credit":
+        ended_at = AttendanceSession.started_at
+        clock_out = Attendance.open_since
+        credit = 0
+    else:
+        raise AttendanceJobError(f"Unknown auto clock-out policy: {policy}")
+
+    now = datetime.utcnow()
+
+    db.session.execute(
+        update(AttendanceSession).where(
+            AttendanceSession.date < before,
+            AttendanceSession.ended_at.is_(None),
+        ).values(
+            ended_at=ended_at,
+            updated_at=now,
+        ).execution_options(synchronize_session=False)
+    )
+
+    result = db.session.execute(
+        update(Attendance).where(
+            Attendance.date < before,
+            Attendance.open_since.isnot(None),
+        ).values(
+            clock_out=clock_out,
+            open_since=None,
+            worked_seconds=Attendance.worked_seconds + credit,
+            updated_at=now,
+        ).execution_options(synchronize_session=False)
+    )
+
+    return result.rowcount
+
+
+def mark_absent_day(*, day: date) -> int:
+    """
+    Inserts 'absent' rows for active clients with no attendance record
+    and no approved leave on `day`, as one INSERT ... SELECT.
+    Departments whose calendar treats `day` as non-working are skipped.
+    Must be called inside an active transaction.
+    Returns number of rows inserted.
+    """
+
+    calendar = get_work_calendar()
+    departments = [d for d in DEPARTMENTS if calendar.is_working_day(day, d)]
+
+    if not departments:
+        return 0
+
+    now = datetime.utcnow()
+
+    has_record = exists().where(
+        Attendance.user_id == UsersInfo.user_id,
+        Attendance.date == day,
+    )
+    on_leave = exists().where(
+        LeaveRequests.user_id == UsersInfo.user_id,
+        LeaveRequests.status == "approved",
+        LeaveRequests.from_date <= day,
+        LeaveRequests.to_date >= day,
+    )
+
+    source = select(
+        UsersInfo.user_id,
+        literal(day),
+        literal("absent"),
+        literal(now),
+        literal(now),
+    ).join(
+        Users, Users.user_id == UsersInfo.user_id
+    ).where(
+        Users.role == "client",
+        Users.is_active.is_(True),
+        UsersInfo.department.in_(departments),
+        cast(UsersInfo.created_at, db.Date) <= day,
+        ~has_record,
+        ~on_leave,
+    )
+
+    result = db.session.execute(
+        insert(Attendance).from_select(
+            ["user_id", "date", "status", "created_at", "updated_at"],
+            source,
+        )
+    )
+
+    return result.rowcount
+
+
+def reclassify_attendance(*, start: date | None = None, end: date | None = None, chunk_size: int | None = None) -> dict:
+    """
+    Backfill: re-derives present/late/half_day for worked rows from the
+    current shift definitions. Walks attendance_id in windows of
+    `chunk_size` and commits each window, so locks and log growth stay
+    bounded on large tables.
+    Returns rows updated, windows and runtime.
+    Raises AttendanceJobError on failure.
+    """
+
+    started = time.perf_counter()
+    chunk_size = chunk_size or current_app.config.get("RECLASSIFY_CHUNK_SIZE", 5000)
+
+    bounds = db.session.query(
+        func.min(Attendance.attendance_id), func.max(Attendance.attendance_id)
+    ).filter(*_date_filters(start, end)).one()
+
+    updated = 0
+    windows = 0
+    low, high = bounds
+
+    if low is not None:
+        try:
+            for window_start in range(low, high + 1, chunk_size):
+                updated += reclassify_window(
+                    start=start, end=end,
+                    id_range=(window_start, window_start + chunk_size - 1),
+                )
+                db.session.commit()
+                windows += 1
+
+        except Exception as e:
+            db.session.rollback()
+            raise AttendanceJobError("Attendance reclassification failed") from e
+
+    return {
+        "updated": updated,
+        "windows": windows,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def reclassify_window(*, start: date | None, end: date | None, id_range: tuple | None = None) -> int:
+    """
+    One UPDATE per shift (plus one for users without a shift) over the
+    worked rows in range, setting status with a CASE. Must be called
+    inside an active transaction.
+    Returns number of rows whose status changed.
+    """
+
+    filters = [
+        Attendance.clock_in.isnot(None),
+        *_date_filters(start, end),
+    ]
+    if id_range is not None:
+        filters += [Attendance.attendance_id >= id_range[0], Attendance.attendance_id <= id_range[1]]
+
+    by_user, by_department = load_shift_rules()
+    departments = list(by_department)
+
+    own_shift = exists().where(Shift.user_id == Attendance.user_id)
+
+    def in_departments(names):
+        return exists().where(
+            UsersInfo.user_id == Attendance.user_id,
+            UsersInfo.department.in_(names),
+        )
+
+    minute = _minute_of_day(Attendance.clock_in)
+    now = datetime.utcnow()
+    updated = 0
+
+    # Same rule as ShiftRule.classify at write time, evaluated in SQL
+    for shift in [*by_department.values(), *by_user.values()]:
+        if shift.user_id is not None:
+            scope = Attendance.user_id == shift.user_id
+        else:
+            scope = and_(~own_shift, in_departments([shift.department]))
+
+        status = case(
+            (and_(Attendance.open_since.is_(None), Attendance.worked_seconds < shift.min_work_seconds), "half_day"),
+            (minute > shift.late_after_minute, "late"),
+            else_="present",
+        )
+
+        updated += _set_status(filters + [scope], status, now)
+
+    # No shift applies: plain 'present'
+    unscoped = [~own_shift]
+    if departments:
+        unscoped.append(~in_departments(departments))
+    updated += _set_status(filters + unscoped, literal("present"), now)
+
+    return updated
+
+
+def _set_status(filters: list, status, now: datetime) -> int:
+    result = db.session.execute(
+        update(Attendance).where(
+            *filters, Attendance.status != status,
+        ).values(
+            status=status,
+            updated_at=now,
+        ).execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def _date_filters(start: date | None, end: date | None) -> list:
+    filters = []
+    if start:
+        filters.append(Attendance.date >= start)
+    if end:
+        filters.append(Attendance.date <= end)
+    return filters
+
+
+def _minute_of_day(column):
+    """
+    Dialect-specific minutes since midnight of a datetime column.
+    """
+
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == "mssql":
+        return func.datepart(literal_column("hour"), column) * 60 + func.datepart(literal_column("minute"), column)
+    if dialect == "mysql":
+        return func.hour(column) * 60 + func.minute(column)
+    if dialect == "sqlite":
+        return cast(func.strftime("%H", column), db.Integer) * 60 + cast(func.strftime("%M", column), db.Integer)
+
+    return cast(func.extract("hour", column), db.Integer) * 60 + cast(func.extract("minute", column), db.Integer)
+
+
+def _add_hours(column, hours: int):
+    """
+    Dialect-specific `column + N hours` for set-based updates.
+    """
+
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == "mssql":
+        return func.dateadd(literal_column("hour"), hours, column)
+    if dialect == "mysql":
+        return func.timestampadd(literal_column("HOUR"), hours, column)
+    if dialect == "sqlite":
+        return func.datetime(column, f"+{hours} hours")
+
+    return column + timedelta(hours=hours)
@@ -1,6 +1,8 @@
-import secrets, hmac, hashlib
+import secrets, hmac, hashlib, uuid
 from datetime import datetime, timedelta
+from sqlalchemy import update, select, insert
 from models import db, Auth, TokenServices, Users, Admins
+from flask import current_app
 from flask_bcrypt import Bcrypt
 from exceptions import (
     MissingCredentials,
@@ -9,6 +11,7 @@ from exceptions import (
     NotAnAdmin,
     MissingRefreshToken,
     InvalidRefreshToken,
+    RefreshTokenReused,
     MissingAccessToken,
     InvalidAccessToken,
 )
@@ -54,59 +57,237 @@ def authenticate_admin(username: str, password: str) -> str:
 
     return user_id
 
-def create_access_token(user_id, minutes=15):
-    raw_token = secrets.token_hex(32)
+def _hash_refresh_token(raw_token: str) -> str:
+    # HMAC prevents offline guessing if DB leaks
+    secret = REFRESH_TOKEN_PEPPER.encode()
+    return hmac.new(secret, raw_token.encode(), hashlib.sha256).hexdigest()
 
-    token_hash = hashlib.sha256(raw_token.encode()).hexdigest()
+def issue_token_pair(
+    user_id, *, family_id=None, access_minutes=15, refresh_days=3
+) -> tuple[str, str]:
+    """
+    Creates an access + refresh token for one login with a single
+    two-row INSERT and one commit (which also commits any pending
+    change in the session, e.g. a rotated token's revocation).
+    Returns (access_token, refresh_token).
+    """
 
-    token = TokenServices(
-        user_id=user_id,
-        token_hash=token_hash,
-        token_type="access",
-        expires_at=datetime.utcnow() + timedelta(minutes=minutes),
-        revoked=False
+    raw_access = secrets.token_hex(32)
+    raw_refresh = secrets.token_urlsafe(48)
+
+    now = datetime.utcnow()
+    family_id = family_id or str(uuid.uuid4())
+
+    db.session.execute(
+        insert(TokenServices).values([
+            {
+                "user_id": user_id,
+                "token_hash": hashlib.sha256(raw_access.encode()).hexdigest(),
+                "token_type": "access",
+                "family_id": family_id,
+                "expires_at": now + timedelta(minutes=access_minutes),
+                "revoked": False,
+                "created_at": now,
+            },
+            {
+                "user_id": user_id,
+                "token_hash": _hash_refresh_token(raw_refresh),
+                "token_type": "refresh",
+                "family_id": family_id,
+                "expires_at": now + timedelta(days=refresh_days),
+                "revoked": False,
+                "created_at": now,
+            },
+        ])
     )
 
-    db.session.add(token)
     db.session.commit()
 
-    return raw_token
+    return raw_access, raw_refresh
 
-def _hash_refresh_token(raw_token: str) -> str:
-    # HMAC prevents offline guessing if DB leaks
-    secret = REFRESH_TOKEN_PEPPER.encode()
-    return hmac.new(secret, raw_token.encode(), hashlib.sha256).hexdigest()
+def rotate_refresh_token(raw_refresh_token: str) -> tuple[str, str, str]:
+    """
+    Swaps a refresh token for a new access + refresh pair.
+    The old token is revoked by a single UPDATE ... OUTPUT/RETURNING
+    that also yields its owner and family; the new pair is inserted
+    in the same transaction.
+    Returns (user_id, access_token, refresh_token).
+    Presenting an already-rotated token revokes its whole family,
+    except within REFRESH_REUSE_GRACE_SECONDS of its rotation (two
+    tabs refreshing at once, a retry after a dropped response): then
+    another pair is issued in the same family.
+    """
 
-def create_refresh_token(user_id, days=3):
-    raw_token = secrets.token_urlsafe(48)  # strong + URL-safe
+    if not raw_refresh_token:
+        raise MissingRefreshToken("refresh_token is missing")
 
-    token_hash = _hash_refresh_token(raw_token)
+    token_hash = _hash_refresh_token(raw_refresh_token)
 
-    token = TokenServices(
-        user_id=user_id,
+    try:
+        swapped = db.session.execute(
+            update(TokenServices).where(
+                TokenServices.token_hash == token_hash,
+                TokenServices.token_type == "refresh",
+                TokenServices.revoked == False,  # noqa: E712
+                TokenServices.expires_at > datetime.utcnow(),
+            ).values(
+                revoked=True
+            ).returning(
+                TokenServices.user_id, TokenServices.family_id
+            ).execution_options(synchronize_session=False)
+        ).first()
+
+        if swapped is None:
+            swapped = _just_rotated(token_hash)
+
+        if swapped is None:
+            _handle_refresh_reuse(token_hash)
+            db.session.rollback()
+            raise InvalidRefreshToken("The refresh_token provided is invalid")
+
+        user_id = swapped.user_id
+        family_id = swapped.family_id or str(uuid.uuid4())
+
+        access_token, refresh_token = issue_token_pair(
+            user_id, family_id=family_id
+        )
+
+        return user_id, access_token, refresh_token
+
+    except (InvalidRefreshToken, MissingRefreshToken):
+        raise
+    except Exception:
+        db.session.rollback()
+        raise
+
+def _just_rotated(token_hash: str):
+    """
+    Returns the (user_id, family_id) of a refresh token rotated within
+    the grace window, else None. "Just rotated" means: the token is
+    unexpired, every refresh token its family gained after it is
+    younger than the window, and one of them is still live (logout
+    revokes the whole family, so it never qualifies).
+    """
+
+    grace = current_app.config.get("REFRESH_REUSE_GRACE_SECONDS", 30)
+    now = datetime.utcnow()
+
+    presented = db.session.query(
+        TokenServices.user_id, TokenServices.family_id,
+        TokenServices.created_at, TokenServices.expires_at,
+    ).filter_by(
         token_hash=token_hash,
         token_type="refresh",
-        expires_at=datetime.utcnow() + timedelta(days=days),
-        revoked=False
-    )
+        revoked=True
+    ).first()
 
-    db.session.add(token)
-    db.session.commit()
+    if not presented or not presented.family_id or presented.expires_at <= now:
+        return None
 
-    return raw_token
+    newer = db.session.query(
+        TokenServices.created_at, TokenServices.revoked
+    ).filter(
+        TokenServices.family_id == presented.family_id,
+        TokenServices.token_type == "refresh",
+        TokenServices.created_at > presented.created_at,
+    ).all()
 
-def revoke_refresh_token(raw_refresh_token: str):
-    token_hash = _hash_refresh_token(raw_refresh_token)
+    if (
+        newer
+        and all(row.created_at >= now - timedelta(seconds=grace) for row in newer)
+        and any(not row.revoked for row in newer)
+    ):
+        return presented
 
-    token = TokenServices.query.filter_by(
+    return None
+
+def _handle_refresh_reuse(token_hash: str) -> None:
+    """
+    A revoked refresh token being replayed means it leaked:
+    revoke every token in its family (or all of the user's tokens
+    for pre-rotation tokens without a family).
+    """
+
+    reused = db.session.query(
+        TokenServices.user_id, TokenServices.family_id
+    ).filter_by(
         token_hash=token_hash,
         token_type="refresh",
-        revoked=False
+        revoked=True
     ).first()
 
-    if token:
-        token.revoked = True
-        db.session.commit()
+    if not reused:
+        return
+
+    if reused.family_id:
+        revoke_token_family(reused.family_id)
+    else:
+        revoke_all_user_tokens(reused.user_id)
+
+    raise RefreshTokenReused("The refresh_token provided was already used")
+
+def revoke_token_family(family_id: str) -> int:
+    """
+    Logs out one login (all devices sharing it) with a single UPDATE.
+    Returns number of tokens revoked.
+    """
+
+    result = db.session.execute(
+        update(TokenServices).where(
+            TokenServices.family_id == family_id,
+            TokenServices.revoked == False,  # noqa: E712
+        ).values(
+            revoked=True
+        ).execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+    return result.rowcount
+
+def revoke_family_of_refresh_token(raw_refresh_token: str) -> int:
+    """
+    Revokes the family a refresh token belongs to, in one statement
+    (family looked up by subquery).
+    Returns number of tokens revoked.
+    """
+
+    if not raw_refresh_token:
+        raise MissingRefreshToken("refresh_token is missing")
+
+    family = select(TokenServices.family_id).where(
+        TokenServices.token_hash == _hash_refresh_token(raw_refresh_token),
+        TokenServices.token_type == "refresh",
+    ).scalar_subquery()
+
+    result = db.session.execute(
+        update(TokenServices).where(
+            TokenServices.family_id == family,
+            TokenServices.revoked == False,  # noqa: E712
+        ).values(
+            revoked=True
+        ).execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+    return result.rowcount
+
+def revoke_all_user_tokens(user_id: str) -> int:
+    """
+    "Logout everywhere": revokes every live token of the user.
+    Returns number of tokens revoked.
+    """
+
+    result = db.session.execute(
+        update(TokenServices).where(
+            TokenServices.user_id == user_id,
+            TokenServices.revoked == False,  # noqa: E712
+        ).values(
+            revoked=True
+        ).execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+    return result.rowcount
 
 def is_admin_user(user_id: str) -> bool:
     """
@@ -157,20 +338,22 @@ def verify_access_token(auth_header: str) -> str:
 
     return token.user_id
 
-def verify_refresh_token_and_get_user(raw_refresh_token: str):
-    if not raw_refresh_token:
-        raise MissingRefreshToken("refresh_token is missing")
+def access_token_expires_at(raw_token: str) -> datetime | None:
+    """
+    Expiry of a live (unrevoked, unexpired) access token, else None.
+    Long-lived responses (SSE) use it to end with the token.
+    """
 
-    token_hash = _hash_refresh_token(raw_refresh_token)
+    if not raw_token:
+        return None
 
-    token = TokenServices.query.filter_by(
-        token_hash=token_hash,
-        token_type="refresh",
+    expires_at = db.session.query(TokenServices.expires_at).filter_by(
+        token_hash=hashlib.sha256(raw_token.encode()).hexdigest(),
+        token_type="access",
         revoked=False
-    ).first()
+    ).scalar()
 
-    if not token or token.expires_at < datetime.utcnow():
-        raise InvalidRefreshToken("The refresh_token provided is invalid")
-
-    return token.user_id
+    if expires_at is None or expires_at < datetime.utcnow():
+        return None
 
+    return expires_at
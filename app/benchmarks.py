@@ -0,0 +1,119 @@
+import statistics
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from json_provider import JSON_PROVIDERS
+from directory import synthetic_employees
+from search import EmployeeSearchIndex
+
+
+def _leave_rows(count: int) -> list:
+    created = datetime(2024, 1, 1, 9, 30)
+    start = date(2024, 1, 1)
+
+    return [
+        {
+            "leave_id": i,
+            "user_id": str(uuid.UUID(int=i % 500)),
+            "employee_name": f"Employee {i % 500}",
+            "employee_id": f"EMP{i % 500:05d}",
+            "department": "qa",
+            "leave_type": "annual",
+            "from_date": (start + timedelta(days=i % 300)).strftime("%d %b %Y"),
+            "to_date": (start + timedelta(days=i % 300 + 2)).strftime("%d %b %Y"),
+            "days": 3,
+            "reason": "Family trip",
+            "status": "pending",
+            "created_at": created + timedelta(minutes=i),
+        }
+        for i in range(count)
+    ]
+
+
+def _monthly_report() -> dict:
+    return {
+        "employee": {"user_id": str(uuid.UUID(int=1)), "name": "Employee 1", "department": "qa"},
+        "month": "January 2024",
+        "attendance_summary": {"working_days": 22, "present": 20, "absent": 2, "late": 3},
+        "working_hours": {"total_hours": 161.5, "average_hours": 8.07},
+        "leave_summary": [{"leave_type": "annual", "days": 2}],
+        "generated_at": datetime(2024, 2, 1, 6, 0),
+    }
+
+
+def json_payloads() -> dict:
+    """
+    Synthetic payloads shaped like the bulk endpoints' responses.
+    """
+
+    return {
+        "admin_all_leave_requests (5000)": {"leave_requests": _leave_rows(5000)},
+        "leave_history (200)": {"history": _leave_rows(200)},
+        "monthly_report": _monthly_report(),
+    }
+
+
+def bench_json(app, *, repeat: int = 20) -> list:
+    """
+    Times each JSON provider on each payload.
+    Returns (payload, provider, microseconds per dump, bytes) rows.
+    """
+
+    results = []
+
+    for name, payload in json_payloads().items():
+        for provider_name, provider_class in JSON_PROVIDERS.items():
+            provider = provider_class(app)
+            body = provider.dumps(payload)
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                provider.dumps(payload)
+            elapsed = time.perf_counter() - start
+
+            results.append((name, provider_name, elapsed / repeat * 1e6, len(body.encode())))
+
+    return results
+
+
+SEARCH_QUERIES = (
+    "EMP0421",        # employee_id prefix
+    "030000123",      # phone prefix
+    "ayesha",         # name word prefix
+    "qures",          # name word prefix (surname)
+    "ureshi",         # name substring only
+    "sana.khan1",     # email prefix
+    "a",              # one letter
+    "zzz",            # no match
+)
+
+
+def bench_search(*, employees: int = 100_000, rounds: int = 50) -> dict:
+    """
+    Builds a search index over synthetic employees and times queries.
+    Returns build seconds and per-query latency percentiles (ms).
+    """
+
+    by_user = synthetic_employees(employees)
+    index = EmployeeSearchIndex()
+
+    start = time.perf_counter()
+    index.sync(by_user)
+    build_seconds = time.perf_counter() - start
+
+    queries = {}
+    for query in SEARCH_QUERIES:
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            hits = index.search(query, limit=20)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        timings.sort()
+        queries[query] = {
+            "hits": len(hits),
+            "p50_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+        }
+
+    return {"employees": employees, "build_seconds": round(build_seconds, 2), "queries": queries}
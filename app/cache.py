@@ -0,0 +1,69 @@
+import threading
+import time
+
+
+class TTLCache:
+    """
+    Small thread-safe per-process cache with a time-to-live per entry.
+    Used for short-lived snapshots that many requests read at once.
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return default
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+
+            return value
+
+    def set(self, key, value, ttl_seconds: float | None = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+
+        with self._lock:
+            if len(self._entries) >= self.max_entries and key not in self._entries:
+                self._evict_expired()
+                if len(self._entries) >= self.max_entries:
+                    # Drop the entry closest to expiry
+                    oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                    del self._entries[oldest]
+
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def get_or_set(self, key, compute, ttl_seconds: float | None = None):
+        """
+        Returns the cached value, computing and storing it on a miss.
+        """
+
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+
+        value = compute()
+        self.set(key, value, ttl_seconds)
+        return value
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, (exp, _) in self._entries.items() if exp < now]:
+            del self._entries[key]
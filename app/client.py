@@ -1,12 +1,12 @@
 import uuid
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
-from flask_bcrypt import Bcrypt
 # from helper_func import detect_image_extension
 from models import db, Users, Clients, Auth, UsersInfo
+from outbox import enqueue
+from auth import bcrypt
 # from validations import is_valid_profile_image, is_allowed_social_platform, is_valid_social_handle
 # from spaces import get_spaces, generate_signed_get_url, DO_SPACES_BUCKET
-import imghdr
 from exceptions import (
     ClientCreationError,
     UsernameAlreadyExists,
@@ -24,8 +24,6 @@ from exceptions import (
     SocialUpsertError
 )
 
-bcrypt = Bcrypt()
-
 
 def create_client(
     *,
@@ -176,6 +174,11 @@ def create_client_with_profile(
             gender=gender,
         )
 
+        enqueue("user.created", {
+            "user_id": user_id,
+            "username": username,
+            "department": department,
+        })
         db.session.commit()
         return user_id
 
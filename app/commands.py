@@ -0,0 +1,341 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from exports import parse_export_filters, write_export_file, EXPORT_FORMATS
+from snapshot import export_snapshots, SNAPSHOT_TABLES
+from outbox import drain_outbox, OutboxWorker
+from exceptions import ExportError, AttendanceJobError, OutboxError, MigrationError
+
+# Modules only a single command needs are imported inside that command,
+# so web workers (which also load this file) don't pay for them.
+
+
+# =========================
+# EXPORT HISTORY
+# =========================
+@click.command("export-history")
+@click.argument("kind", type=click.Choice(["attendance", "leave"]))
+@click.option("--out", "out_path", required=True, help="Output path (.gz is written).")
+@click.option("--format", "fmt", type=click.Choice(EXPORT_FORMATS), default="csv")
+@click.option("--from", "from_date", help="Start date (yyyy-mm-dd).")
+@click.option("--to", "to_date", help="End date (yyyy-mm-dd).")
+@click.option("--department", help="Department filter.")
+@click.option("--user-id", help="Single user filter.")
+@with_appcontext
+def export_history_command(kind, out_path, fmt, from_date, to_date, department, user_id):
+    """Stream attendance or leave history into a gzip file."""
+
+    try:
+        filters = parse_export_filters(
+            from_date=from_date,
+            to_date=to_date,
+            department=department,
+            user_id=user_id,
+        )
+        written = write_export_file(
+            path=out_path, kind=kind, fmt=fmt, filters=filters
+        )
+
+    except ExportError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(f"Wrote {written} bytes of {kind} {fmt} to {out_path}")
+
+
+# =========================
+# ANALYTICS SNAPSHOT
+# =========================
+@click.command("snapshot-export")
+@click.option("--out", "out_dir", required=True, help="Snapshot root directory.")
+@click.option("--table", "tables", multiple=True, type=click.Choice(list(SNAPSHOT_TABLES)))
+@click.option("--full", is_flag=True, help="Ignore watermarks and rewrite every partition.")
+@with_appcontext
+def snapshot_export_command(out_dir, tables, full):
+    """Write Parquet snapshots partitioned by year/month."""
+
+    try:
+        results = export_snapshots(out_dir=out_dir, tables=list(tables), full=full)
+
+    except ExportError as e:
+        raise click.ClickException(str(e))
+
+    for stats in results:
+        click.echo(
+            f"{stats['table']}: {stats['partitions']} partitions, "
+            f"{stats['rows']} rows in {stats['seconds']}s"
+        )
+
+
+# =========================
+# NIGHTLY ATTENDANCE JOB
+# =========================
+@click.command("nightly-attendance")
+@click.option("--date", "day", type=click.DateTime(formats=["%Y-%m-%d"]),
+              help="Day to mark absences for (default: yesterday).")
+@click.option("--days", default=1, show_default=True,
+              help="Number of days to process, walking back from --date.")
+@with_appcontext
+def nightly_attendance_command(day, days):
+    """Auto clock-out stale rows and write explicit absent rows."""
+
+    from attendance_jobs import run_nightly_attendance
+
+    try:
+        stats = run_nightly_attendance(
+            day=day.date() if day else None, days=days
+        )
+
+    except AttendanceJobError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(
+        f"Closed {stats['closed']} open rows, inserted "
+        f"{stats['absent_inserted']} absent rows, reclassified "
+        f"{stats['reclassified']} rows in {stats['seconds']}s"
+    )
+
+
+# =========================
+# RECLASSIFY ATTENDANCE (shift backfill)
+# =========================
+@click.command("reclassify-attendance")
+@click.option("--from", "from_date", type=click.DateTime(formats=["%Y-%m-%d"]),
+              help="First day (default: all history).")
+@click.option("--to", "to_date", type=click.DateTime(formats=["%Y-%m-%d"]),
+              help="Last day (default: all history).")
+@click.option("--chunk-size", type=int, help="Override RECLASSIFY_CHUNK_SIZE.")
+@with_appcontext
+def reclassify_attendance_command(from_date, to_date, chunk_size):
+    """Re-derive present/late/half_day from the current shifts."""
+
+    from attendance_jobs import reclassify_attendance
+
+    try:
+        stats = reclassify_attendance(
+            start=from_date.date() if from_date else None,
+            end=to_date.date() if to_date else None,
+            chunk_size=chunk_size,
+        )
+
+    except AttendanceJobError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(
+        f"Updated {stats['updated']} rows in {stats['windows']} windows "
+        f"in {stats['seconds']}s"
+    )
+
+
+# =========================
+# OUTBOX WORKER
+# =========================
+@click.command("outbox-worker")
+@click.option("--once", is_flag=True, help="Drain a single batch and exit.")
+@with_appcontext
+def outbox_worker_command(once):
+    """Deliver outbox side effects (runs until interrupted)."""
+
+    if once:
+        try:
+            stats = drain_outbox()
+        except OutboxError as e:
+            raise click.ClickException(str(e))
+
+        click.echo(
+            f"Claimed {stats['claimed']}: delivered {stats['delivered']}, "
+            f"retried {stats['retried']}, failed {stats['failed']}"
+        )
+        return
+
+    worker = OutboxWorker(current_app._get_current_object())
+    worker.start()
+    click.echo("Outbox worker running (Ctrl+C to stop)")
+
+    try:
+        while worker.is_alive():
+            worker.join(timeout=1)
+    except KeyboardInterrupt:
+        worker.stop()
+        worker.join()
+
+
+# =========================
+# COMPACT KEY STORAGE MIGRATION
+# =========================
+@click.command("compact-keys-migrate")
+@click.option("--dry-run", is_flag=True, help="Print the statements without running them.")
+@with_appcontext
+def compact_keys_migrate_command(dry_run):
+    """Convert UUID/token-hash columns to compact binary storage."""
+
+    from compact_keys import migrate_compact_keys
+
+    try:
+        statements = migrate_compact_keys(dry_run=dry_run)
+    except MigrationError as e:
+        raise click.ClickException(str(e))
+
+    for statement in statements:
+        click.echo(f"{statement};")
+
+    if not dry_run:
+        click.echo("Done. Set COMPACT_KEY_STORAGE=1 in the environment and restart.")
+
+
+# =========================
+# SCHEMA MIGRATIONS
+# =========================
+@click.command("db-status")
+@with_appcontext
+def db_status_command():
+    """List migrations and whether they are applied."""
+
+    from migrate import migration_status
+
+    for revision, description, applied in migration_status():
+        click.echo(f"[{'x' if applied else ' '}] {revision}  {description}")
+
+
+@click.command("db-upgrade")
+@click.option("--target", help="Stop after this revision.")
+@click.option("--explain", "show_plans", is_flag=True,
+              help="Print hot query plans before and after upgrading.")
+@with_appcontext
+def db_upgrade_command(target, show_plans):
+    """Apply pending schema migrations."""
+
+    from migrate import upgrade, explain_hot_queries
+
+    if show_plans:
+        _echo_plans("BEFORE", explain_hot_queries())
+
+    try:
+        applied = upgrade(
+            target=target,
+            on_applied=lambda m: click.echo(f"Applied {m.revision}: {m.description}"),
+        )
+    except MigrationError as e:
+        raise click.ClickException(str(e))
+
+    if not applied:
+        click.echo("Database is up to date")
+
+    if show_plans:
+        _echo_plans("AFTER", explain_hot_queries())
+
+
+@click.command("db-explain")
+@with_appcontext
+def db_explain_command():
+    """Print query plans for the hot queries."""
+
+    from migrate import explain_hot_queries
+
+    _echo_plans("CURRENT", explain_hot_queries())
+
+
+def _echo_plans(label: str, plans: dict) -> None:
+    for name, lines in plans.items():
+        click.echo(f"--- {label}: {name}")
+        for line in lines:
+            click.echo(f"    {line}")
+
+
+# =========================
+# BENCHMARKS
+# =========================
+@click.command("bench-json")
+@click.option("--repeat", default=20, show_default=True, help="Dumps per measurement.")
+@with_appcontext
+def bench_json_command(repeat):
+    """Compare JSON provider serialization cost on bulk payloads."""
+
+    from benchmarks import bench_json
+
+    for name, provider, micros, size in bench_json(current_app, repeat=repeat):
+        click.echo(f"{name:<34} {provider:<8} {micros:>12.1f} us {size:>10} bytes")
+
+
+@click.command("import-profile")
+@click.option("--top", default=20, show_default=True, help="Slowest modules to list.")
+@click.option("--budget-ms", type=float, help="Override IMPORT_TIME_BUDGET_MS.")
+@click.option("--module", default="app", show_default=True, help="Module to import.")
+@with_appcontext
+def import_profile_command(top, budget_ms, module):
+    """Report app import time (-X importtime) against the budget."""
+
+    from startup import profile_imports
+
+    budget_ms = budget_ms or current_app.config.get("IMPORT_TIME_BUDGET_MS", 1500)
+
+    try:
+        profile = profile_imports(module=module)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(f"{'module':<48} {'self ms':>9} {'cumul ms':>9}")
+    for name, self_ms, cumulative_ms, _ in profile["modules"][:top]:
+        click.echo(f"{name:<48} {self_ms:>9.1f} {cumulative_ms:>9.1f}")
+
+    total_ms = profile["total_ms"]
+    click.echo(f"Total import time: {total_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+
+    if total_ms > budget_ms:
+        raise click.ClickException("Import time budget exceeded")
+
+
+@click.command("directory-footprint")
+@click.option("--employees", default=10_000, show_default=True, help="Synthetic employees.")
+@with_appcontext
+def directory_footprint_command(employees):
+    """Measure employee directory memory (tracemalloc)."""
+
+    from directory import measure_footprint, get_directory
+
+    synthetic = measure_footprint(employees=employees)
+    click.echo(
+        f"Synthetic: {synthetic['employees']} employees, "
+        f"{synthetic['total_bytes'] / 1024:.0f} KiB "
+        f"({synthetic['bytes_per_employee']} bytes/employee)"
+    )
+
+    directory = get_directory()
+    directory.refresh(full=True)
+    click.echo(f"Live directory: {len(directory)} employees loaded")
+
+
+@click.command("bench-search")
+@click.option("--employees", default=100_000, show_default=True, help="Synthetic employees.")
+@click.option("--rounds", default=50, show_default=True, help="Runs per query.")
+def bench_search_command(employees, rounds):
+    """Time employee search index build and queries."""
+
+    from benchmarks import bench_search
+
+    result = bench_search(employees=employees, rounds=rounds)
+    click.echo(f"Indexed {result['employees']} employees in {result['build_seconds']} s")
+
+    for query, stats in result["queries"].items():
+        click.echo(
+            f"  {query!r:<14} {stats['hits']:>3} hits  "
+            f"p50 {stats['p50_ms']:>7.3f} ms  p95 {stats['p95_ms']:>7.3f} ms"
+        )
+
+
+def register_commands(app):
+    """
+    Attaches CLI commands to the app (`flask <command>`).
+    """
+    app.cli.add_command(export_history_command)
+    app.cli.add_command(snapshot_export_command)
+    app.cli.add_command(nightly_attendance_command)
+    app.cli.add_command(reclassify_attendance_command)
+    app.cli.add_command(outbox_worker_command)
+    app.cli.add_command(compact_keys_migrate_command)
+    app.cli.add_command(db_status_command)
+    app.cli.add_command(db_upgrade_command)
+    app.cli.add_command(db_explain_command)
+    app.cli.add_command(bench_json_command)
+    app.cli.add_command(import_profile_command)
+    app.cli.add_command(directory_footprint_command)
+    app.cli.add_command(bench_search_command)
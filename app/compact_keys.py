@@ -0,0 +1,169 @@
+from sqlalchemy import inspect, text
+from models import db
+from exceptions import MigrationError
+
+
+# (table, column) pairs holding UUID strings
+UUID_COLUMNS = (
+    ("users2", "user_id"),
+    ("auth", "user_id"),
+    ("token_services", "user_id"),
+    ("token_services", "family_id"),
+    ("admins", "user_id"),
+    ("admins", "granted_by"),
+    ("clients", "user_id"),
+    ("users_info", "user_id"),
+    ("leave_requests", "user_id"),
+    ("attendance", "user_id"),
+    ("attendance_sessions", "user_id"),
+    ("punch_events", "user_id"),
+    ("shifts", "user_id"),
+)
+
+
+def build_compact_keys_migration(connection) -> list:
+    """
+    Builds the T-SQL statements converting an existing MSSQL schema to
+    compact key storage:
+    - VARCHAR(36) UUID columns -> UNIQUEIDENTIFIER (16 bytes)
+    - token_services.token_hash VARCHAR(64) hex -> BINARY(32)
+    Constraints and indexes touching those columns are dropped and
+    recreated with their reflected names; indexes keep their
+    clustering, INCLUDE columns and filter (dialect_options).
+    """
+
+    if connection.dialect.name != "mssql":
+        raise MigrationError("Compact key migration is only implemented for MSSQL")
+
+    insp = inspect(connection)
+    tables = {t for t, _ in UUID_COLUMNS} | {"token_services"}
+    targets = {(t, c) for t, c in UUID_COLUMNS} | {("token_services", "token_hash")}
+
+    def touches(table, columns):
+        return any((table, c) in targets for c in columns)
+
+    foreign_keys, primary_keys, uniques, indexes = [], [], [], []
+
+    for table in sorted(tables):
+        for fk in insp.get_foreign_keys(table):
+            if touches(table, fk["constrained_columns"]) or touches(fk["referred_table"], fk["referred_columns"]):
+                foreign_keys.append((table, fk))
+
+        pk = insp.get_pk_constraint(table)
+        if pk["constrained_columns"] and touches(table, pk["constrained_columns"]):
+            primary_keys.append((table, pk))
+
+        unique_names = set()
+        for uq in insp.get_unique_constraints(table):
+            unique_names.add(uq["name"])
+            if touches(table, uq["column_names"]):
+                uniques.append((table, uq))
+
+        for ix in insp.get_indexes(table):
+            if ix["name"] in unique_names:
+                continue
+            include = ix.get("dialect_options", {}).get("mssql_include", [])
+            if touches(table, ix["column_names"] + include):
+                indexes.append((table, ix))
+
+    statements = []
+
+    # 1. Drop everything that pins the column types
+    for table, fk in foreign_keys:
+        statements.append(f"ALTER TABLE [{table}] DROP CONSTRAINT [{fk['name']}]")
+    for table, ix in indexes:
+        statements.append(f"DROP INDEX [{ix['name']}] ON [{table}]")
+    for table, uq in uniques:
+        statements.append(f"ALTER TABLE [{table}] DROP CONSTRAINT [{uq['name']}]")
+    for table, pk in primary_keys:
+        statements.append(f"ALTER TABLE [{table}] DROP CONSTRAINT [{pk['name']}]")
+
+    # 2. Convert column types
+    for table, column in UUID_COLUMNS:
+        nullable = _is_nullable(insp, table, column)
+        statements.append(
+            f"ALTER TABLE [{table}] ALTER COLUMN [{column}] UNIQUEIDENTIFIER "
+            f"{'NULL' if nullable else 'NOT NULL'}"
+        )
+
+    statements += [
+        "ALTER TABLE [token_services] ADD [token_hash_bin] BINARY(32) NULL",
+        "UPDATE [token_services] SET [token_hash_bin] = CONVERT(BINARY(32), [token_hash], 2)",
+        "ALTER TABLE [token_services] DROP COLUMN [token_hash]",
+        "EXEC sp_rename 'token_services.token_hash_bin', 'token_hash', 'COLUMN'",
+        "ALTER TABLE [token_services] ALTER COLUMN [token_hash] BINARY(32) NOT NULL",
+    ]
+
+    # 3. Recreate constraints and indexes
+    for table, pk in primary_keys:
+        statements.append(
+            f"ALTER TABLE [{table}] ADD CONSTRAINT [{pk['name']}] "
+            f"PRIMARY KEY ({_columns(pk['constrained_columns'])})"
+        )
+    for table, uq in uniques:
+        statements.append(
+            f"ALTER TABLE [{table}] ADD CONSTRAINT [{uq['name']}] "
+            f"UNIQUE ({_columns(uq['column_names'])})"
+        )
+    for table, ix in indexes:
+        statements.append(_create_index(table, ix))
+    for table, fk in foreign_keys:
+        ondelete = fk.get("options", {}).get("ondelete")
+        statements.append(
+            f"ALTER TABLE [{table}] ADD CONSTRAINT [{fk['name']}] "
+            f"FOREIGN KEY ({_columns(fk['constrained_columns'])}) "
+            f"REFERENCES [{fk['referred_table']}] ({_columns(fk['referred_columns'])})"
+            + (f" ON DELETE {ondelete}" if ondelete else "")
+        )
+
+    return statements
+
+
+def migrate_compact_keys(*, dry_run: bool = False) -> list:
+    """
+    Runs the compact key conversion in a single transaction.
+    Returns the executed (or, with dry_run, planned) statements.
+    Raises MigrationError on failure.
+    """
+
+    try:
+        with db.engine.begin() as connection:
+            statements = build_compact_keys_migration(connection)
+
+            if not dry_run:
+                for statement in statements:
+                    connection.execute(text(statement))
+
+        return statements
+
+    except MigrationError:
+        raise
+    except Exception as e:
+        raise MigrationError("Compact key migration failed") from e
+
+
+def _is_nullable(insp, table: str, column: str) -> bool:
+    for col in insp.get_columns(table):
+        if col["name"] == column:
+            return col["nullable"]
+
+    raise MigrationError(f"Column {table}.{column} not found")
+
+
+def _create_index(table: str, ix: dict) -> str:
+    options = ix.get("dialect_options", {})
+    unique = "UNIQUE " if ix.get("unique") else ""
+    clustered = "CLUSTERED " if options.get("mssql_clustered") else ""
+
+    statement = f"CREATE {unique}{clustered}INDEX [{ix['name']}] ON [{table}] ({_columns(ix['column_names'])})"
+    if options.get("mssql_include"):
+        statement += f" INCLUDE ({_columns(options['mssql_include'])})"
+    # Reflected filter_definition, e.g. "([ended_at] IS NULL)"
+    if options.get("mssql_where"):
+        statement += f" WHERE {options['mssql_where']}"
+
+    return statement
+
+
+def _columns(names) -> str:
+    return ", ".join(f"[{n}]" for n in names)
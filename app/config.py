@@ -1,6 +1,41 @@
+import json
+import os
 import secrets
 from sqlalchemy.engine import URL
 
+
+def _env_number(name: str, default):
+    """Numeric setting overridable from the environment (docker .env)."""
+    value = os.environ.get(name)
+    return type(default)(value) if value not in (None, "") else default
+
+
+def _env_list(name: str) -> list:
+    """Comma-separated setting from the environment."""
+    return [v.strip() for v in os.environ.get(name, "").split(",") if v.strip()]
+
+
+def _load_work_calendar() -> dict:
+    """
+    Holidays and weekends from the JSON file named by WORK_CALENDAR_FILE:
+    {"holidays": ["2026-12-25"], "default_weekend": [5, 6],
+     "department_weekends": {"sales": [4, 5]}}
+    """
+    path = os.environ.get("WORK_CALENDAR_FILE")
+    if not path:
+        return {}
+    with open(path) as fh:
+        return json.load(fh)
+
+
+_WORK_CALENDAR = _load_work_calendar()
+
+
+def compact_key_storage() -> bool:
+    """COMPACT_KEY_STORAGE=1 in the environment switches key columns."""
+    return os.environ.get("COMPACT_KEY_STORAGE", "") in ("1", "true", "True")
+
+
 class Config:
     SECRET_KEY = secrets.token_bytes(32)
 
@@ -19,4 +54,194 @@ class Config:
     )
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    WTF_CSRF_SECRET_KEY = secrets.token_bytes(32)
\ No newline at end of file
+    WTF_CSRF_SECRET_KEY = secrets.token_bytes(32)
+
+    # --------------------------
+    # Work calendar
+    # --------------------------
+    # Loaded at startup from WORK_CALENDAR_FILE (JSON, see
+    # _load_work_calendar); HOLIDAYS=2026-01-01,2026-12-25 in the
+    # environment adds holidays. Restart the workers after a change.
+
+    # Public holidays (yyyy-mm-dd), observed by every department
+    HOLIDAYS = sorted(set(_WORK_CALENDAR.get("holidays", [])) | set(_env_list("HOLIDAYS")))
+
+    # Weekend days per department (Monday=0 ... Sunday=6)
+    DEFAULT_WEEKEND = tuple(_WORK_CALENDAR.get("default_weekend", (5, 6)))
+    DEPARTMENT_WEEKENDS = {
+        department: tuple(days)
+        for department, days in _WORK_CALENDAR.get("department_weekends", {}).items()
+    }
+
+    # --------------------------
+    # Nightly attendance job
+    # --------------------------
+    # How stale open sessions (never clocked out) are closed:
+    #   "shift_hours" -> ended at session start + AUTO_CLOCK_OUT_HOURS
+    #   "no_credit"   -> ended at session start (zero hours credited)
+    AUTO_CLOCK_OUT_POLICY = "shift_hours"
+    AUTO_CLOCK_OUT_HOURS = 8
+
+    # --------------------------
+    # Shifts (late / half-day classification)
+    # --------------------------
+    # Per-process cache of the shifts table
+    SHIFT_CACHE_TTL_SECONDS = 60
+    # Rows per UPDATE window in `flask reclassify-attendance`
+    RECLASSIFY_CHUNK_SIZE = 5000
+
+    # --------------------------
+    # Punch ingestion (offline kiosks/apps)
+    # --------------------------
+    PUNCH_BATCH_MAX_EVENTS = 5000
+    # Events older than this, or further in the future, are rejected
+    PUNCH_MAX_AGE_DAYS = 7
+    PUNCH_MAX_FUTURE_SECONDS = 300
+
+    # --------------------------
+    # Live attendance dashboard
+    # --------------------------
+    LIVE_ATTENDANCE_TTL_SECONDS = 5
+
+    # --------------------------
+    # Request coalescing (singleflight)
+    # --------------------------
+    # Callers waiting on an identical in-flight computation give up
+    # after this long and run it themselves
+    SINGLEFLIGHT_WAIT_SECONDS = 30
+
+    # --------------------------
+    # Live events (SSE)
+    # --------------------------
+    # "memory": per-worker only; "redis": shared across workers
+    EVENT_BACKEND = "memory"
+    EVENT_REDIS_URL = "redis://localhost:6379/0"
+    EVENT_REDIS_CHANNEL = "hrm-events"
+    EVENT_HEARTBEAT_SECONDS = 15
+    # Streams re-check their access token this often (logout ends
+    # them) and close when it expires
+    EVENT_AUTH_RECHECK_SECONDS = 60
+    # EventSource cannot send headers: the stream token travels in a
+    # cookie set by POST /api/admin/events/session (HTTPS only)
+    EVENT_COOKIE_SECURE = True
+
+    # --------------------------
+    # Outbox worker
+    # --------------------------
+    # Run a drain thread inside each web worker (otherwise use
+    # `flask outbox-worker` as a separate process)
+    OUTBOX_WORKER_IN_PROCESS = False
+    OUTBOX_BATCH_SIZE = 100
+    OUTBOX_POLL_SECONDS = 1.0
+    OUTBOX_MAX_ATTEMPTS = 8
+    OUTBOX_BACKOFF_SECONDS = 2
+    OUTBOX_BACKOFF_MAX_SECONDS = 600
+    # Claimed rows are invisible to other workers for this long; rows
+    # of a worker that died mid-batch are redelivered afterwards
+    OUTBOX_LEASE_SECONDS = 60
+    # Delivered rows are deleted after this many days, in batches
+    OUTBOX_RETENTION_DAYS = 7
+    OUTBOX_PURGE_BATCH_SIZE = 1000
+    OUTBOX_PURGE_INTERVAL_SECONDS = 3600
+
+    # --------------------------
+    # Refresh tokens
+    # --------------------------
+    # A refresh token rotated this recently may be presented again
+    # (concurrent refreshes) without counting as reuse
+    REFRESH_REUSE_GRACE_SECONDS = 30
+
+    # --------------------------
+    # Rate limiting
+    # --------------------------
+    RATE_LIMIT_ENABLED = True
+    # Reverse proxies in front of the app (nginx: 1) whose
+    # X-Forwarded-For entry is trusted for the client address; 0 when
+    # the app is reached directly
+    TRUSTED_PROXY_COUNT = _env_number("TRUSTED_PROXY_COUNT", 1)
+    # "memory": per-worker counters; "redis": shared across workers
+    RATE_LIMIT_BACKEND = "memory"
+    RATE_LIMIT_REDIS_URL = "redis://localhost:6379/1"
+    # scope -> key type -> (max requests, window seconds)
+    RATE_LIMITS = {
+        "login": {"ip": (20, 60), "username": (5, 60)},
+        "refresh": {"ip": (60, 60)},
+    }
+
+    # --------------------------
+    # Key storage
+    # --------------------------
+    # Store UUIDs as 16-byte/native UUID and token hashes as BINARY(32).
+    # Run `flask compact-keys-migrate` before enabling on an existing DB.
+    # Column types are fixed when models.py is imported, so this comes
+    # only from the environment (set it before the process starts);
+    # create_app refuses an app config that disagrees.
+    COMPACT_KEY_STORAGE = compact_key_storage()
+
+    # --------------------------
+    # JSON responses
+    # --------------------------
+    # "fast": orjson when installed (stdlib fallback); "stdlib": json module
+    JSON_PROVIDER = "fast"
+
+    # --------------------------
+    # Startup
+    # --------------------------
+    # `flask import-profile` fails when importing the app takes longer
+    IMPORT_TIME_BUDGET_MS = 1500
+    # Pre-open pooled connections and build caches in create_app()
+    WARM_UP_ON_START = False
+    WARM_UP_CONNECTIONS = 4
+
+    # --------------------------
+    # Diagnostics
+    # --------------------------
+    # Adds X-Query-Count (SQL statements per request) to every response
+    QUERY_COUNT_HEADER = False
+
+    # --------------------------
+    # Admission control (load shedding)
+    # --------------------------
+    ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "1") == "1"
+    # Per worker process, per class: concurrent requests, queued requests,
+    # max seconds in queue, Retry-After on 503. Keep the sum of limits
+    # within the DB pool (SQLAlchemy default: 5 + 10 overflow).
+    # Override with env vars, e.g. ADMISSION_BULK_LIMIT=1.
+    ADMISSION_LIMITS = {
+        name: {
+            "limit": _env_number(f"ADMISSION_{name.upper()}_LIMIT", limit),
+            "max_queue": _env_number(f"ADMISSION_{name.upper()}_QUEUE", queue),
+            "queue_timeout": _env_number(f"ADMISSION_{name.upper()}_QUEUE_TIMEOUT", timeout),
+            "retry_after": _env_number(f"ADMISSION_{name.upper()}_RETRY_AFTER", retry_after),
+        }
+        for name, (limit, queue, timeout, retry_after) in {
+            "critical": (6, 48, 5.0, 1),
+            "normal": (6, 12, 2.0, 2),
+            "bulk": (2, 2, 0.5, 10),
+        }.items()
+    }
+    # Path prefix (optionally "METHOD /path") -> class; longest match wins
+    ADMISSION_ROUTES = {
+        "/api/attendance/clock-in": "critical",
+        "/api/attendance/clock-out": "critical",
+        "/api/login": "critical",
+        "/api/admin/login": "critical",
+        "/api/refresh": "critical",
+        "/api/reports/": "bulk",
+        "/api/admin/export/": "bulk",
+        # Kiosk batches retry safely (idempotent) after Retry-After
+        "/api/attendance/punches": "bulk",
+        # Long-lived SSE stream would pin a slot
+        "/api/admin/events": "exempt",
+        # Shedding metrics must stay readable during the overload
+        "/api/admin/metrics": "exempt",
+    }
+    ADMISSION_DEFAULT_CLASS = "normal"
+
+    # --------------------------
+    # Employee directory (in-process UsersInfo snapshot)
+    # --------------------------
+    # How often readers check max(updated_at) for changes
+    DIRECTORY_POLL_SECONDS = 5
+    # Full reload (also drops deleted employees)
+    DIRECTORY_FULL_RELOAD_SECONDS = 300
@@ -0,0 +1,79 @@
+from datetime import date
+from models import UsersInfo
+from attendance import (
+    week_bounds,
+    get_attendance_range,
+    build_today_summary,
+    build_week,
+    build_monthly_stats,
+)
+from exceptions import AttendanceError
+
+
+DASHBOARD_FIELDS = ("today", "week", "stats", "profile")
+
+
+def get_dashboard(*, user_id: str, fields: tuple = DASHBOARD_FIELDS) -> dict:
+    """
+    Builds the app-open dashboard in at most two queries: the profile
+    row (also the department for stats) and one attendance range
+    covering this week and the month to date.
+    Returns {field: payload} for the requested fields.
+    Raises AttendanceError on failure.
+    """
+
+    today = date.today()
+    result = {}
+
+    try:
+        user_info = None
+        if "profile" in fields or "stats" in fields:
+            user_info = UsersInfo.query.filter_by(user_id=user_id).first()
+
+        if "profile" in fields:
+            result["profile"] = _format_profile(user_info) if user_info else None
+
+        if {"today", "week", "stats"} & set(fields):
+            monday, sunday = week_bounds(today)
+            records = get_attendance_range(
+                user_id=user_id,
+                start=min(monday, today.replace(day=1)),
+                end=sunday,
+            )
+
+            if "today" in fields:
+                todays = next((r for r in records if r.date == today), None)
+                result["today"] = build_today_summary(todays, today=today)
+
+            if "week" in fields:
+                result["week"] = build_week(records, today=today)
+
+            if "stats" in fields:
+                result["stats"] = build_monthly_stats(
+                    records,
+                    today=today,
+                    department=user_info.department if user_info else None,
+                )
+
+        return result
+
+    except Exception as e:
+        raise AttendanceError("Failed to build dashboard") from e
+
+
+def _format_profile(user_info: UsersInfo) -> dict:
+    """
+    Same shape as /my_profile/details.
+    """
+
+    return {
+        "name": user_info.name,
+        "gender": user_info.gender,
+        "email": user_info.email,
+        "department": user_info.department,
+        "designation": user_info.designation,
+        "phone": user_info.phone,
+        "employee_id": user_info.employee_id,
+        "created_at": user_info.created_at,
+        "updated_at": user_info.updated_at,
+    }
@@ -0,0 +1,300 @@
+import threading
+import time
+from flask import current_app
+from sqlalchemy import func
+from models import db, UsersInfo
+
+
+class Employee:
+    """
+    Compact read-only view of a UsersInfo row.
+    """
+
+    __slots__ = (
+        "user_id",
+        "name",
+        "employee_id",
+        "department",
+        "designation",
+        "email",
+        "phone",
+        "gender",
+        "updated_at",
+    )
+
+    def __init__(self, user_id, name, employee_id, department, designation, email, phone, gender, updated_at):
+        self.user_id = user_id
+        self.name = name
+        self.employee_id = employee_id
+        self.department = department
+        self.designation = designation
+        self.email = email
+        self.phone = phone
+        self.gender = gender
+        self.updated_at = updated_at
+
+
+_COLUMNS = [getattr(UsersInfo, name) for name in Employee.__slots__]
+
+
+class _Snapshot:
+    """
+    Immutable set of indexes; refreshes build a new one and swap it in,
+    so readers never see a half-applied update.
+    """
+
+    __slots__ = ("by_user", "by_department", "by_employee_id", "watermark")
+
+    def __init__(self, by_user: dict, watermark):
+        self.by_user = by_user
+        self.watermark = watermark
+
+        self.by_employee_id = {e.employee_id: e for e in by_user.values()}
+
+        by_department = {}
+        for employee in by_user.values():
+            by_department.setdefault(employee.department, []).append(employee)
+        for members in by_department.values():
+            members.sort(key=lambda e: e.name)
+        self.by_department = by_department
+
+
+class EmployeeDirectory:
+    """
+    Per-process snapshot of UsersInfo with lookups by user_id,
+    employee_id and department.
+
+    Every `poll_seconds` a reader checks max(updated_at); when it moved,
+    only rows changed since the watermark are re-read. Deleted rows are
+    dropped by a full reload every `full_reload_seconds`.
+    """
+
+    def __init__(self, *, poll_seconds: float = 5, full_reload_seconds: float = 300):
+        self.poll_seconds = poll_seconds
+        self.full_reload_seconds = full_reload_seconds
+
+        self._snapshot = _Snapshot({}, None)
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._loaded_at = None
+        self._rechecked_watermark = None
+
+        self.full_reloads = 0
+        self.incremental_refreshes = 0
+
+    @classmethod
+    def from_config(cls, config) -> "EmployeeDirectory":
+        return cls(
+            poll_seconds=config.get("DIRECTORY_POLL_SECONDS", 5),
+            full_reload_seconds=config.get("DIRECTORY_FULL_RELOAD_SECONDS", 300),
+        )
+
+    # --------------------------
+    # Lookups
+    # --------------------------
+    def get(self, user_id: str) -> Employee | None:
+        return self._current().by_user.get(user_id)
+
+    def by_user_id(self) -> dict:
+        """
+        The current {user_id: Employee} mapping, for joining many rows
+        against one consistent snapshot. Do not mutate.
+        """
+        return self._current().by_user
+
+    def by_employee_id(self, employee_id: str) -> Employee | None:
+        return self._current().by_employee_id.get(employee_id)
+
+    def in_department(self, department: str) -> list:
+        return list(self._current().by_department.get(department, ()))
+
+    def all(self) -> list:
+        return list(self._current().by_user.values())
+
+    def __len__(self) -> int:
+        return len(self._snapshot.by_user)
+
+    # --------------------------
+    # Refresh
+    # --------------------------
+    def _current(self) -> _Snapshot:
+        now = time.monotonic()
+        if now - self._checked_at >= self.poll_seconds:
+            self.refresh()
+        return self._snapshot
+
+    def refresh(self, *, full: bool = False) -> None:
+        """
+        Brings the snapshot up to date. One thread refreshes at a time;
+        others keep reading the current snapshot meanwhile (except before
+        the first load, when they wait for it).
+        """
+
+        if not self._lock.acquire(blocking=self._loaded_at is None):
+            return
+
+        try:
+            now = time.monotonic()
+            if self._loaded_at is not None and not full and now - self._checked_at < self.poll_seconds:
+                # Another thread refreshed while this one waited
+                return
+
+            full = (
+                full
+                or self._loaded_at is None
+                or now - self._loaded_at >= self.full_reload_seconds
+            )
+
+            if full:
+                self._full_reload()
+                self._loaded_at = now
+            else:
+                self._incremental_refresh()
+
+            self._checked_at = now
+
+        finally:
+            self._lock.release()
+
+    def _full_reload(self) -> None:
+        by_user = {}
+        watermark = None
+
+        for row in db.session.query(*_COLUMNS).yield_per(1000):
+            employee = Employee(*row)
+            by_user[employee.user_id] = employee
+            if watermark is None or employee.updated_at > watermark:
+                watermark = employee.updated_at
+
+        self._snapshot = _Snapshot(by_user, watermark)
+        self.full_reloads += 1
+
+    def _incremental_refresh(self) -> None:
+        snapshot = self._snapshot
+        latest = db.session.query(func.max(UsersInfo.updated_at)).scalar()
+
+        if latest is None:
+            return
+
+        if snapshot.watermark is not None:
+            if latest < snapshot.watermark:
+                return
+
+            # A write in the same clock tick as the watermark leaves
+            # max(updated_at) unchanged; re-read that tick once
+            if latest == snapshot.watermark:
+                if self._rechecked_watermark == latest:
+                    return
+                self._rechecked_watermark = latest
+
+        query = db.session.query(*_COLUMNS)
+        if snapshot.watermark is not None:
+            # >= so rows sharing the watermark timestamp are not missed
+            query = query.filter(UsersInfo.updated_at >= snapshot.watermark)
+
+        by_user = dict(snapshot.by_user)
+        for row in query:
+            employee = Employee(*row)
+            by_user[employee.user_id] = employee
+
+        self._snapshot = _Snapshot(by_user, latest)
+        self.incremental_refreshes += 1
+
+    def metrics(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "employees": len(snapshot.by_user),
+            "departments": len(snapshot.by_department),
+            "watermark": snapshot.watermark,
+            "full_reloads": self.full_reloads,
+            "incremental_refreshes": self.incremental_refreshes,
+        }
+
+
+def get_directory() -> EmployeeDirectory:
+    """
+    Returns the app-wide directory, built from config on first use.
+    """
+
+    directory = current_app.extensions.get("employee_directory")
+    if directory is None:
+        directory = EmployeeDirectory.from_config(current_app.config)
+        current_app.extensions["employee_directory"] = directory
+
+    return directory
+
+
+_FIRST_NAMES = (
+    "Ali", "Ayesha", "Bilal", "Fatima", "Hamza", "Hina", "Imran", "Maria",
+    "Omar", "Sana", "Usman", "Zara", "Ahmed", "Noor", "Saad", "Amna",
+    "Danish", "Erum", "Faisal", "Gul", "Haris", "Iqra", "Junaid", "Kiran",
+    "Laiba", "Mehwish", "Nabeel", "Owais", "Rabia", "Shahid", "Tariq", "Uzma",
+)
+_LAST_NAMES = (
+    "Khan", "Ahmed", "Malik", "Hussain", "Qureshi", "Sheikh", "Butt",
+    "Chaudhry", "Raza", "Siddiqui", "Mirza", "Javed", "Iqbal", "Anwar",
+    "Abbasi", "Baig", "Dar", "Farooq", "Gill", "Hashmi", "Jafri", "Kazmi",
+    "Lodhi", "Memon", "Niazi", "Paracha", "Rana", "Saleem", "Tahir", "Zaidi",
+)
+
+
+def synthetic_employees(count: int) -> dict:
+    """
+    Returns {user_id: Employee} with realistic-looking, unique records,
+    for footprint and search benchmarks.
+    """
+
+    import uuid
+    from datetime import datetime
+    from models import DEPARTMENTS
+
+    now = datetime.utcnow()
+    by_user = {}
+
+    for i in range(count):
+        user_id = str(uuid.UUID(int=i))
+        first = _FIRST_NAMES[i % len(_FIRST_NAMES)]
+        last = _LAST_NAMES[(i // len(_FIRST_NAMES)) % len(_LAST_NAMES)]
+
+        by_user[user_id] = Employee(
+            user_id,
+            f"{first} {last} {i}",
+            f"EMP{i:06d}",
+            DEPARTMENTS[i % len(DEPARTMENTS)],
+            "developer",
+            f"{first}.{last}{i}@example.com".lower(),
+            f"0300{i:07d}",
+            "female" if i % 2 else "male",
+            now,
+        )
+
+    return by_user
+
+
+def measure_footprint(*, employees: int = 10_000) -> dict:
+    """
+    Builds a synthetic directory snapshot of `employees` records and
+    measures its memory with tracemalloc (records plus indexes).
+    Returns total bytes and bytes per employee.
+    """
+
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+
+        snapshot = _Snapshot(synthetic_employees(employees), None)
+
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    total = after - before
+    del snapshot
+
+    return {
+        "employees": employees,
+        "total_bytes": total,
+        "bytes_per_employee": round(total / employees) if employees else 0,
+    }
@@ -0,0 +1,160 @@
+import itertools
+import json
+import queue
+import threading
+from datetime import datetime
+from flask import current_app
+from json_provider import dumps_compact
+
+
+# Events buffered per subscriber before the oldest are dropped
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+
+class Subscription:
+    """
+    A subscriber's bounded mailbox. Slow consumers lose the oldest
+    events instead of blocking publishers.
+    """
+
+    def __init__(self, broker, maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        self._broker = broker
+        self._queue = queue.Queue(maxsize=maxsize)
+
+    def deliver(self, event: dict) -> None:
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: float) -> dict | None:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        self._broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """
+    Fan-out pub/sub inside a single worker process.
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event: dict) -> None:
+        self._fan_out(event)
+
+    def _fan_out(self, event: dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+
+class RedisBroker(InProcessBroker):
+    """
+    Cross-worker pub/sub: events are published to a Redis channel and a
+    listener thread in every worker fans them out to local subscribers.
+    Requires the `redis` package.
+    """
+
+    def __init__(self, *, url: str, channel: str):
+        super().__init__()
+
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._channel = channel
+
+        listener = threading.Thread(
+            target=self._listen, name="event-broker-listener", daemon=True
+        )
+        listener.start()
+
+    def publish(self, event: dict) -> None:
+        self._redis.publish(self._channel, dumps_compact(event))
+
+    def next_id(self) -> int:
+        return int(self._redis.incr(f"{self._channel}:seq"))
+
+    def _listen(self) -> None:
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self._channel)
+
+        for message in pubsub.listen():
+            try:
+                self._fan_out(json.loads(message["data"]))
+            except (ValueError, TypeError):
+                continue
+
+
+def get_event_broker() -> InProcessBroker:
+    """
+    Returns the app-wide broker, built from config on first use.
+    """
+
+    broker = current_app.extensions.get("event_broker")
+    if broker is None:
+        if current_app.config.get("EVENT_BACKEND") == "redis":
+            broker = RedisBroker(
+                url=current_app.config["EVENT_REDIS_URL"],
+                channel=current_app.config.get("EVENT_REDIS_CHANNEL", "hrm-events"),
+            )
+        else:
+            broker = InProcessBroker()
+
+        current_app.extensions["event_broker"] = broker
+
+    return broker
+
+
+def publish_event(event_type: str, data: dict) -> None:
+    """
+    Publishes a domain event after its transaction has committed.
+    Best effort: a broker failure never fails the request.
+    """
+
+    try:
+        broker = get_event_broker()
+        broker.publish({
+            "id": broker.next_id(),
+            "type": event_type,
+            "data": data,
+            "ts": datetime.utcnow().isoformat(),
+        })
+    except Exception as e:
+        current_app.logger.warning(f"Failed to publish {event_type}: {e}")
+
+
+def format_sse(event: dict) -> str:
+    """
+    Encodes an event as a Server-Sent Events frame.
+    """
+
+    payload = dumps_compact(event["data"])
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {payload}\n\n"
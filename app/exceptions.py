@@ -64,6 +64,11 @@ class InvalidRefreshToken(RefreshTokenError):
     """Invalid Refresh token"""
     pass
 
+
+class RefreshTokenReused(InvalidRefreshToken):
+    """An already-rotated refresh token was presented again"""
+    pass
+
 ##########################################################
 
 class AccessTokenError(Exception):
@@ -172,8 +177,66 @@ class AlreadyClockedOut(AttendanceError):
     pass
 
 
+class AttendanceJobError(AttendanceError):
+    """Raised when the nightly attendance batch job fails."""
+    pass
+
+
+class InvalidPunchBatch(AttendanceError):
+    """Raised when a punch batch is malformed as a whole."""
+    pass
+
+
+class PunchBatchConflict(AttendanceError):
+    """Raised when a punch batch races another write; safe to retry."""
+    pass
+
+
+#######################################################
+
+class ShiftError(Exception):
+    """Base error for shift definition failures."""
+    pass
+
+
+class InvalidShiftData(ShiftError):
+    """Raised when a shift definition is invalid."""
+    pass
+
+
 #######################################################
 
 class ReportError(Exception):
     """Base error for report generation failures."""
     pass
+
+
+#######################################################
+
+class MigrationError(Exception):
+    """Raised when a schema migration cannot be applied."""
+    pass
+
+
+#######################################################
+
+class OutboxError(Exception):
+    """Base error for outbox delivery failures."""
+    pass
+
+
+#######################################################
+
+class ExportError(Exception):
+    """Base error for data export failures."""
+    pass
+
+
+class InvalidExportFilter(ExportError):
+    """Raised when export filters fail validation."""
+    pass
+
+
+class SnapshotError(ExportError):
+    """Raised when a columnar snapshot export fails."""
+    pass
@@ -0,0 +1,273 @@
+import csv
+import gzip
+import io
+from datetime import datetime
+from models import db, Attendance, LeaveRequests, UsersInfo, DEPARTMENTS
+from json_provider import dumps_compact
+from exceptions import ExportError, InvalidExportFilter
+
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+# Rows buffered before a chunk is handed to the HTTP response / file
+EXPORT_CHUNK_ROWS = 500
+
+EXPORT_FORMATS = ("csv", "jsonl")
+
+ATTENDANCE_EXPORT_COLUMNS = (
+    "attendance_id",
+    "user_id",
+    "employee_id",
+    "employee_name",
+    "department",
+    "date",
+    "clock_in",
+    "clock_out",
+    "worked_seconds",
+    "status",
+)
+
+LEAVE_EXPORT_COLUMNS = (
+    "leave_id",
+    "user_id",
+    "employee_id",
+    "employee_name",
+    "department",
+    "leave_type",
+    "from_date",
+    "to_date",
+    "days",
+    "reason",
+    "status",
+    "created_at",
+    "updated_at",
+)
+
+
+def parse_export_filters(
+    *,
+    from_date: str | None = None,
+    to_date: str | None = None,
+    department: str | None = None,
+    user_id: str | None = None,
+) -> dict:
+    """
+    Validates raw export filters (dates as YYYY-MM-DD).
+    Returns normalized filter dict.
+    Raises InvalidExportFilter on bad input.
+    """
+
+    try:
+        parsed_from = datetime.strptime(from_date, "%Y-%m-%d").date() if from_date else None
+        parsed_to = datetime.strptime(to_date, "%Y-%m-%d").date() if to_date else None
+    except ValueError:
+        raise InvalidExportFilter("Invalid date format. Use yyyy-mm-dd")
+
+    if parsed_from and parsed_to and parsed_to < parsed_from:
+        raise InvalidExportFilter("To date cannot be before from date")
+
+    if department and department not in DEPARTMENTS:
+        raise InvalidExportFilter("Invalid department")
+
+    return {
+        "from_date": parsed_from,
+        "to_date": parsed_to,
+        "department": department or None,
+        "user_id": user_id or None,
+    }
+
+
+def iter_attendance_rows(*, from_date=None, to_date=None, department=None, user_id=None):
+    """
+    Streams attendance rows as dicts using a server-side cursor.
+    Only EXPORT_BATCH_SIZE rows are held in memory at a time.
+    """
+
+    query = db.session.query(
+        Attendance.attendance_id,
+        Attendance.user_id,
+        UsersInfo.employee_id,
+        UsersInfo.name,
+        UsersInfo.department,
+        Attendance.date,
+        Attendance.clock_in,
+        Attendance.clock_out,
+        Attendance.worked_seconds,
+        Attendance.status,
+    ).outerjoin(
+        UsersInfo, Attendance.user_id == UsersInfo.user_id
+    )
+
+    if from_date:
+        query = query.filter(Attendance.date >= from_date)
+    if to_date:
+        query = query.filter(Attendance.date <= to_date)
+    if department:
+        query = query.filter(UsersInfo.department == department)
+    if user_id:
+        query = query.filter(Attendance.user_id == user_id)
+
+    query = query.order_by(
+        Attendance.date, Attendance.attendance_id
+    ).yield_per(EXPORT_BATCH_SIZE)
+
+    for row in query:
+        yield {
+            "attendance_id": row.attendance_id,
+            "user_id": row.user_id,
+            "employee_id": row.employee_id,
+            "employee_name": row.name,
+            "department": row.department,
+            "date": row.date.isoformat(),
+            "clock_in": row.clock_in.isoformat() if row.clock_in else None,
+            "clock_out": row.clock_out.isoformat() if row.clock_out else None,
+            "worked_seconds": row.worked_seconds,
+            "status": row.status,
+        }
+
+
+def iter_leave_rows(*, from_date=None, to_date=None, department=None, user_id=None):
+    """
+    Streams leave request rows as dicts using a server-side cursor.
+    Date filters select leaves overlapping the range.
+    """
+
+    query = db.session.query(
+        LeaveRequests.leave_id,
+        LeaveRequests.user_id,
+        UsersInfo.employee_id,
+        UsersInfo.name,
+        UsersInfo.department,
+        LeaveRequests.leave_type,
+        LeaveRequests.from_date,
+        LeaveRequests.to_date,
+        LeaveRequests.days,
+        LeaveRequests.reason,
+        LeaveRequests.status,
+        LeaveRequests.created_at,
+        LeaveRequests.updated_at,
+    ).outerjoin(
+        UsersInfo, LeaveRequests.user_id == UsersInfo.user_id
+    )
+
+    if from_date:
+        query = query.filter(LeaveRequests.to_date >= from_date)
+    if to_date:
+        query = query.filter(LeaveRequests.from_date <= to_date)
+    if department:
+        query = query.filter(UsersInfo.department == department)
+    if user_id:
+        query = query.filter(LeaveRequests.user_id == user_id)
+
+    query = query.order_by(
+        LeaveRequests.from_date, LeaveRequests.leave_id
+    ).yield_per(EXPORT_BATCH_SIZE)
+
+    for row in query:
+        yield {
+            "leave_id": row.leave_id,
+            "user_id": row.user_id,
+            "employee_id": row.employee_id,
+            "employee_name": row.name,
+            "department": row.department,
+            "leave_type": row.leave_type,
+            "from_date": row.from_date.isoformat(),
+            "to_date": row.to_date.isoformat(),
+            "days": row.days,
+            "reason": row.reason,
+            "status": row.status,
+            "created_at": row.created_at.isoformat(),
+            "updated_at": row.updated_at.isoformat(),
+        }
+
+
+def encode_csv(rows, columns):
+    """
+    Encodes row dicts into CSV text chunks (header first).
+    """
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+
+        if pending >= EXPORT_CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+
+    tail = buffer.getvalue()
+    if tail:
+        yield tail
+
+
+def encode_jsonl(rows):
+    """
+    Encodes row dicts into JSON Lines text chunks.
+    """
+
+    lines = []
+    for row in rows:
+        lines.append(dumps_compact(row))
+
+        if len(lines) >= EXPORT_CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+EXPORT_SOURCES = {
+    "attendance": (iter_attendance_rows, ATTENDANCE_EXPORT_COLUMNS),
+    "leave": (iter_leave_rows, LEAVE_EXPORT_COLUMNS),
+}
+
+
+def stream_export(*, kind: str, fmt: str, filters: dict):
+    """
+    Returns a generator of text chunks for the requested export.
+    Raises InvalidExportFilter for unknown kind/format.
+    """
+
+    if kind not in EXPORT_SOURCES:
+        raise InvalidExportFilter("Invalid export type")
+
+    if fmt not in EXPORT_FORMATS:
+        raise InvalidExportFilter("Invalid format. Must be csv or jsonl")
+
+    iter_rows, columns = EXPORT_SOURCES[kind]
+    rows = iter_rows(**filters)
+
+    if fmt == "csv":
+        return encode_csv(rows, columns)
+
+    return encode_jsonl(rows)
+
+
+def write_export_file(*, path: str, kind: str, fmt: str, filters: dict) -> int:
+    """
+    Writes an export to a gzip file, chunk by chunk.
+    Returns number of bytes written (uncompressed).
+    Raises ExportError on failure.
+    """
+
+    chunks = stream_export(kind=kind, fmt=fmt, filters=filters)
+
+    try:
+        written = 0
+        with gzip.open(path, "wt", encoding="utf-8", newline="") as fh:
+            for chunk in chunks:
+                fh.write(chunk)
+                written += len(chunk)
+
+        return written
+
+    except Exception as e:
+        raise ExportError("Failed to write export file") from e
@@ -0,0 +1,87 @@
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is used instead
+    orjson = None
+
+
+def json_default(o):
+    """
+    Fallback encoder shared by the stdlib path, SSE and the outbox:
+    dates/times as ISO 8601 (what orjson emits natively).
+    """
+
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """
+    Stdlib json with ISO 8601 dates (Flask's default uses HTTP dates).
+    """
+
+    default = staticmethod(json_default)
+
+
+class FastJSONProvider(StdlibJSONProvider):
+    """
+    orjson-backed provider. Encodes date/datetime natively and writes
+    response bytes directly; falls back to stdlib when orjson is missing.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is None or kwargs.get("indent"):
+            return super().dumps(obj, **kwargs)
+
+        return self._encode(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None:
+            return super().loads(s, **kwargs)
+
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Only an explicit compact = False (pretty output) needs stdlib;
+        # debug mode keeps the fast path so it behaves like production
+        if orjson is None or self.compact is False:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            self._encode(obj) + b"\n", mimetype=self.mimetype
+        )
+
+    def _encode(self, obj) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+
+        return orjson.dumps(obj, default=json_default, option=option)
+
+
+JSON_PROVIDERS = {
+    "stdlib": StdlibJSONProvider,
+    "fast": FastJSONProvider,
+}
+
+
+def dumps_compact(obj) -> str:
+    """
+    Compact JSON for non-response payloads (SSE frames, outbox rows).
+    """
+
+    if orjson is not None:
+        return orjson.dumps(obj, default=json_default).decode()
+
+    return json.dumps(obj, separators=(",", ":"), default=json_default)
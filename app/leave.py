@@ -1,5 +1,12 @@
-from datetime import datetime
-from models import db, LeaveRequests, UsersInfo
+from datetime import datetime, date, timedelta
+from calendar import monthrange
+from sqlalchemy import update
+from models import db, LeaveRequests
+from events import publish_event
+from outbox import enqueue
+from singleflight import coalesce
+from directory import get_directory
+from work_calendar import get_work_calendar
 from exceptions import (
     InvalidLeaveData,
     LeaveRequestCreationError,
@@ -56,6 +63,8 @@ def create_leave_request(
     # Calculate days (inclusive)
     days = (parsed_to - parsed_from).days + 1
 
+    now = datetime.utcnow()
+
     try:
         leave = LeaveRequests(
             user_id=user_id,
@@ -65,13 +74,13 @@ def create_leave_request(
             days=days,
             reason=reason.strip(),
             status="pending",
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow(),
+            created_at=now,
+            updated_at=now,
         )
         db.session.add(leave)
         db.session.commit()
 
-        return {
+        result = {
             "leave_id": leave.leave_id,
             "leave_type": leave_type,
             "from_date": parsed_from.strftime("%d %b %Y"),
@@ -79,9 +88,13 @@ def create_leave_request(
             "days": days,
             "reason": leave.reason,
             "status": leave.status,
-            "created_at": leave.created_at.isoformat(),
+            "created_at": leave.created_at,
         }
 
+        publish_event("leave.created", {"user_id": user_id, **result})
+
+        return result
+
     except (InvalidLeaveData,):
         db.session.rollback()
         raise
@@ -109,7 +122,7 @@ def get_leave_history(*, user_id: str) -> list:
                 "days": leave.days,
                 "reason": leave.reason,
                 "status": leave.status,
-                "created_at": leave.created_at.isoformat(),
+                "created_at": leave.created_at,
             }
             for leave in leaves
         ]
@@ -118,19 +131,19 @@ def get_leave_history(*, user_id: str) -> list:
         raise LeaveRequestCreationError("Failed to fetch leave history") from e
 
 
+@coalesce("admin_leave_requests", scope="admin")
 def get_all_leave_requests(*, status: str = None) -> list:
     """
     Fetches all leave requests across all users.
     Optionally filters by status (pending, approved, rejected).
     Returns list of leave request dicts with user info.
+    Employee details come from the in-process directory, not a SQL join.
     """
 
     try:
-        query = db.session.query(
-            LeaveRequests, UsersInfo
-        ).outerjoin(
-            UsersInfo, LeaveRequests.user_id == UsersInfo.user_id
-        ).order_by(LeaveRequests.created_at.desc())
+        employees = get_directory().by_user_id()
+
+        query = LeaveRequests.query.order_by(LeaveRequests.created_at.desc())
 
         # ------------------------
         # Optional status filter
@@ -138,7 +151,7 @@ def get_all_leave_requests(*, status: str = None) -> list:
         if status:
             query = query.filter(LeaveRequests.status == status)
 
-        results = query.all()
+        results = [(leave, employees.get(leave.user_id)) for leave in query.all()]
 
         return [
             {
@@ -153,7 +166,7 @@ def get_all_leave_requests(*, status: str = None) -> list:
                 "days": leave.days,
                 "reason": leave.reason,
                 "status": leave.status,
-                "created_at": leave.created_at.isoformat(),
+                "created_at": leave.created_at,
             }
             for leave, info in results
         ]
@@ -169,31 +182,51 @@ def update_leave_status(*, leave_id: int, status: str) -> dict:
     Raises LeaveRequestError subclasses on failure.
     """
 
-    # ------------------------
-    # Fetch leave request
-    # ------------------------
-    leave = LeaveRequests.query.filter_by(leave_id=leave_id).first()
-
-    if not leave:
-        raise LeaveRequestNotFound("Leave request not found")
-
-    # ------------------------
-    # Check if already processed
-    # ------------------------
-    if leave.status != "pending":
-        raise LeaveAlreadyProcessed(
-            f"Leave request already {leave.status}"
-        )
+    now = datetime.utcnow()
 
-    # ------------------------
-    # Update status
-    # ------------------------
     try:
-        leave.status = status
-        leave.updated_at = datetime.utcnow()
+        # ------------------------
+        # Update only while still pending; RETURNING hands back what
+        # the response needs
+        # ------------------------
+        leave = db.session.execute(
+            update(LeaveRequests).where(
+                LeaveRequests.leave_id == leave_id,
+                LeaveRequests.status == "pending",
+            ).values(
+                status=status,
+                updated_at=now,
+            ).returning(
+                LeaveRequests.leave_id,
+                LeaveRequests.user_id,
+                LeaveRequests.leave_type,
+                LeaveRequests.from_date,
+                LeaveRequests.to_date,
+                LeaveRequests.days,
+                LeaveRequests.reason,
+                LeaveRequests.status,
+                LeaveRequests.updated_at,
+            ).execution_options(synchronize_session=False)
+        ).first()
+
+        if leave is None:
+            # Failure path only: missing, or already processed
+            current = db.session.query(LeaveRequests.status).filter_by(
+                leave_id=leave_id
+            ).scalar()
+
+            if current is None:
+                raise LeaveRequestNotFound("Leave request not found")
+            raise LeaveAlreadyProcessed(f"Leave request already {current}")
+
+        enqueue("leave.status_changed", {
+            "leave_id": leave.leave_id,
+            "user_id": leave.user_id,
+            "status": status,
+        })
         db.session.commit()
 
-        return {
+        result = {
             "leave_id": leave.leave_id,
             "user_id": leave.user_id,
             "leave_type": LEAVE_TYPE_DISPLAY.get(leave.leave_type, leave.leave_type),
@@ -202,12 +235,110 @@ def update_leave_status(*, leave_id: int, status: str) -> dict:
             "days": leave.days,
             "reason": leave.reason,
             "status": leave.status,
-            "updated_at": leave.updated_at.isoformat(),
+            "updated_at": leave.updated_at,
         }
 
+        publish_event("leave.status_changed", result)
+
+        return result
+
     except (LeaveRequestNotFound, LeaveAlreadyProcessed):
         db.session.rollback()
         raise
     except Exception as e:
         db.session.rollback()
         raise LeaveRequestCreationError("Failed to update leave status") from e
+
+
+# Statuses shown on the leave calendar
+CALENDAR_STATUSES = ("approved", "pending")
+
+
+def get_leave_calendar(*, department: str, month: int, year: int) -> dict:
+    """
+    Returns who is on approved/pending leave on each day of a month
+    for one department, with headcount for coverage.
+    One overlap query (leaves touching the month), then a sweep line
+    over the month expands ranges into per-day lists.
+    Raises LeaveRequestCreationError on failure.
+    """
+
+    start = date(year, month, 1)
+    end = date(year, month, monthrange(year, month)[1])
+
+    try:
+        directory = get_directory()
+        members = {e.user_id: e for e in directory.in_department(department)}
+
+        rows = db.session.query(
+            LeaveRequests.leave_id,
+            LeaveRequests.user_id,
+            LeaveRequests.leave_type,
+            LeaveRequests.from_date,
+            LeaveRequests.to_date,
+            LeaveRequests.status,
+        ).filter(
+            LeaveRequests.to_date >= start,
+            LeaveRequests.from_date <= end,
+            LeaveRequests.status.in_(CALENDAR_STATUSES),
+        ).all()
+
+        # ------------------------
+        # Sweep line: entries join the active set on their first day in
+        # the month and leave it the day after their last
+        # ------------------------
+        day_count = (end - start).days + 1
+        starts = [[] for _ in range(day_count)]
+        ends = [[] for _ in range(day_count + 1)]
+
+        for row in rows:
+            employee = members.get(row.user_id)
+            if employee is None:
+                continue
+
+            entry = {
+                "leave_id": row.leave_id,
+                "user_id": row.user_id,
+                "employee_name": employee.name,
+                "employee_id": employee.employee_id,
+                "leave_type": LEAVE_TYPE_DISPLAY.get(row.leave_type, row.leave_type),
+                "status": row.status,
+            }
+            starts[(max(row.from_date, start) - start).days].append(entry)
+            ends[(min(row.to_date, end) - start).days + 1].append(row.leave_id)
+
+        calendar = get_work_calendar()
+        active = {}
+        days = []
+
+        for i in range(day_count):
+            for leave_id in ends[i]:
+                active.pop(leave_id, None)
+            for entry in starts[i]:
+                active[entry["leave_id"]] = entry
+
+            day = start + timedelta(days=i)
+            on_leave = sorted(active.values(), key=lambda e: e["employee_name"])
+            approved = sum(1 for e in on_leave if e["status"] == "approved")
+            # One person may hold several overlapping approved entries
+            away = len({e["user_id"] for e in on_leave if e["status"] == "approved"})
+
+            days.append({
+                "date": day.strftime("%d %b %Y"),
+                "is_working_day": calendar.is_working_day(day, department),
+                "approved_count": approved,
+                "pending_count": len(on_leave) - approved,
+                "available": len(members) - away,
+                "on_leave": on_leave,
+            })
+
+        return {
+            "department": department,
+            "month": month,
+            "year": year,
+            "headcount": len(members),
+            "days": days,
+        }
+
+    except Exception as e:
+        raise LeaveRequestCreationError("Failed to build leave calendar") from e
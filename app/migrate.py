@@ -0,0 +1,299 @@
+import importlib
+import pkgutil
+from datetime import datetime
+import sqlalchemy as sa
+from models import db
+from exceptions import MigrationError
+
+
+# Kept out of db.metadata so create_all() never touches it
+_version_metadata = sa.MetaData()
+
+schema_migrations = sa.Table(
+    "schema_migrations",
+    _version_metadata,
+    sa.Column("version", sa.String(20), primary_key=True),
+    sa.Column("description", sa.String(255), nullable=False),
+    sa.Column("applied_at", sa.DateTime, nullable=False),
+)
+
+
+def load_migrations() -> list:
+    """
+    Returns migration modules from the migrations/ package, by revision.
+    Each module defines `revision`, `description` and `upgrade(connection)`.
+    """
+
+    import migrations
+
+    modules = [
+        importlib.import_module(f"migrations.{info.name}")
+        for info in pkgutil.iter_modules(migrations.__path__)
+        if info.name.startswith("v")
+    ]
+
+    return sorted(modules, key=lambda m: m.revision)
+
+
+def applied_versions(connection) -> set:
+    _version_metadata.create_all(connection, checkfirst=True)
+    rows = connection.execute(sa.select(schema_migrations.c.version)).all()
+    return {row.version for row in rows}
+
+
+def migration_status() -> list:
+    """
+    Returns (revision, description, applied) for every known migration.
+    """
+
+    with db.engine.begin() as connection:
+        applied = applied_versions(connection)
+
+    return [
+        (m.revision, m.description, m.revision in applied)
+        for m in load_migrations()
+    ]
+
+
+def upgrade(*, target: str | None = None, on_applied=None) -> list:
+    """
+    Applies pending migrations in order, each in its own transaction,
+    up to and including `target` (default: latest).
+    Returns revisions applied.
+    Raises MigrationError on failure.
+    """
+
+    applied_now = []
+
+    for migration in load_migrations():
+        if target and migration.revision > target:
+            break
+
+        with db.engine.begin() as connection:
+            if migration.revision in applied_versions(connection):
+                continue
+
+            try:
+                migration.upgrade(connection)
+                connection.execute(schema_migrations.insert().values(
+                    version=migration.revision,
+                    description=migration.description,
+                    applied_at=datetime.utcnow(),
+                ))
+            except Exception as e:
+                raise MigrationError(
+                    f"Migration {migration.revision} failed: {e}"
+                ) from e
+
+        applied_now.append(migration.revision)
+        if on_applied:
+            on_applied(migration)
+
+    return applied_now
+
+
+# --------------------------
+# Helpers for migration modules
+# --------------------------
+
+def reflect_table(connection, name: str) -> sa.Table:
+    return sa.Table(name, sa.MetaData(), autoload_with=connection)
+
+
+def has_table(connection, name: str) -> bool:
+    return sa.inspect(connection).has_table(name)
+
+
+def has_column(connection, table: str, column: str) -> bool:
+    return any(c["name"] == column for c in sa.inspect(connection).get_columns(table))
+
+
+def has_index(connection, table: str, name: str) -> bool:
+    return any(ix["name"] == name for ix in sa.inspect(connection).get_indexes(table))
+
+
+def add_column(connection, table: str, column: sa.Column) -> None:
+    if has_column(connection, table, column.name):
+        return
+
+    dialect = connection.dialect
+    keyword = "ADD" if dialect.name == "mssql" else "ADD COLUMN"
+    null = "NULL" if column.nullable else "NOT NULL"
+    column_type = column.type.compile(dialect=dialect)
+
+    # Required for NOT NULL columns on tables that already have rows
+    default = ""
+    if column.server_default is not None:
+        default = f" DEFAULT {column.server_default.arg}"
+
+    connection.execute(sa.text(
+        f"ALTER TABLE {table} {keyword} {column.name} {column_type} {null}{default}"
+    ))
+
+
+def set_nullable(connection, table: str, column: str, column_type, nullable: bool) -> None:
+    dialect = connection.dialect
+    type_sql = column_type.compile(dialect=dialect)
+    null = "NULL" if nullable else "NOT NULL"
+
+    if dialect.name == "mssql":
+        sql = f"ALTER TABLE {table} ALTER COLUMN {column} {type_sql} {null}"
+    elif dialect.name == "mysql":
+        sql = f"ALTER TABLE {table} MODIFY {column} {type_sql} {null}"
+    elif dialect.name == "postgresql":
+        action = "DROP NOT NULL" if nullable else "SET NOT NULL"
+        sql = f"ALTER TABLE {table} ALTER COLUMN {column} {action}"
+    else:
+        # SQLite cannot alter columns in place; dev databases are rebuilt
+        return
+
+    connection.execute(sa.text(sql))
+
+
+def create_index(connection, table: str, name: str, columns: list, *, unique: bool = False, include: list | None = None) -> None:
+    """
+    Creates an index if missing. `include` adds non-key covering
+    columns on MSSQL (INCLUDE) and PostgreSQL.
+    """
+
+    if has_index(connection, table, name):
+        return
+
+    reflected = reflect_table(connection, table)
+    kwargs = {}
+    if include:
+        kwargs["mssql_include"] = include
+        kwargs["postgresql_include"] = include
+
+    index = sa.Index(name, *[reflected.c[c] for c in columns], unique=unique, **kwargs)
+    index.create(connection)
+
+
+def drop_index(connection, table: str, name: str) -> None:
+    if not has_index(connection, table, name):
+        return
+
+    reflected = reflect_table(connection, table)
+    index = next(ix for ix in reflected.indexes if ix.name == name)
+    index.drop(connection)
+
+
+def seconds_between(connection, start, end):
+    """
+    Dialect-specific whole seconds from `start` to `end`, for set-based
+    backfills.
+    """
+
+    dialect = connection.dialect.name
+
+    if dialect == "mssql":
+        return sa.func.datediff(sa.literal_column("second"), start, end)
+    if dialect == "mysql":
+        return sa.func.timestampdiff(sa.literal_column("SECOND"), start, end)
+    if dialect == "sqlite":
+        return sa.cast(sa.func.round((sa.func.julianday(end) - sa.func.julianday(start)) * 86400), sa.Integer)
+
+    return sa.cast(sa.func.extract("epoch", end - start), sa.Integer)
+
+
+# --------------------------
+# Query plans for hot queries
+# --------------------------
+
+def hot_queries() -> dict:
+    """
+    Representative statements for the hot paths, with sample values.
+    """
+
+    from models import LeaveRequests, TokenServices, Attendance
+
+    sample_user = "00000000-0000-0000-0000-000000000000"
+    sample_date = datetime.utcnow().date()
+
+    return {
+        "leave_summary": sa.select(
+            LeaveRequests.leave_type, LeaveRequests.days
+        ).where(
+            LeaveRequests.user_id == sample_user,
+            LeaveRequests.status == "approved",
+            LeaveRequests.from_date >= sample_date.replace(month=1, day=1),
+        ),
+        "leave_calendar": sa.select(
+            LeaveRequests.user_id, LeaveRequests.from_date, LeaveRequests.to_date,
+            LeaveRequests.leave_type, LeaveRequests.status,
+        ).where(
+            LeaveRequests.to_date >= sample_date.replace(day=1),
+            LeaveRequests.from_date <= sample_date,
+            LeaveRequests.status.in_(("approved", "pending")),
+        ),
+        "admin_leave_listing": sa.select(LeaveRequests).where(
+            LeaveRequests.status == "pending"
+        ).order_by(LeaveRequests.created_at.desc()),
+        "verify_access_token": sa.select(
+            TokenServices.user_id, TokenServices.expires_at
+        ).where(
+            TokenServices.token_hash == "0" * 64,
+            TokenServices.token_type == "access",
+            TokenServices.revoked == False,  # noqa: E712
+        ),
+        "monthly_attendance": sa.select(
+            Attendance.date, Attendance.status, Attendance.clock_in, Attendance.clock_out,
+            Attendance.open_since, Attendance.worked_seconds,
+        ).where(
+            Attendance.user_id == sample_user,
+            Attendance.date >= sample_date.replace(day=1),
+            Attendance.date <= sample_date,
+        ),
+    }
+
+
+def explain(connection, statement) -> list:
+    """
+    Returns the database's plan for a statement as text lines.
+    """
+
+    dialect = connection.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+    if dialect.name == "mssql":
+        # SHOWPLAN_TEXT returns the statement, then the plan, as
+        # separate result sets; read them on a raw DBAPI cursor
+        cursor = connection.connection.cursor()
+        try:
+            cursor.execute("SET SHOWPLAN_TEXT ON")
+            cursor.execute(sql)
+            lines = []
+            while True:
+                lines += [row[0] for row in cursor.fetchall()]
+                if not cursor.nextset():
+                    break
+        finally:
+            cursor.execute("SET SHOWPLAN_TEXT OFF")
+            cursor.close()
+        return lines
+
+    if dialect.name == "sqlite":
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+        return [row[-1] for row in rows]
+
+    rows = connection.exec_driver_sql(f"EXPLAIN {sql}").all()
+    return [" | ".join(str(v) for v in row) for row in rows]
+
+
+def explain_hot_queries() -> dict:
+    """
+    Returns {query name: plan lines} for every hot query.
+    """
+
+    plans = {}
+
+    with db.engine.connect() as connection:
+        for name, statement in hot_queries().items():
+            try:
+                plans[name] = explain(connection, statement)
+            except sa.exc.DBAPIError as e:
+                # e.g. tables not created yet on a fresh database
+                connection.rollback()
+                plans[name] = [f"(unavailable: {e.orig})"]
+
+    return plans
@@ -0,0 +1,113 @@
+"""
+Initial schema, as originally defined in models.py.
+UUID keys and token hashes use the key-storage types of models.py
+(COMPACT_KEY_STORAGE), so fresh databases match the ORM either way.
+Tables that already exist are left untouched, so databases created
+before migrations were introduced can adopt this revision as-is.
+"""
+
+import sqlalchemy as sa
+from sqlalchemy import CheckConstraint
+from models import uuid_type, token_hash_type
+
+revision = "0001"
+description = "initial schema"
+
+metadata = sa.MetaData()
+
+users2 = sa.Table(
+    "users2", metadata,
+    sa.Column("user_id", uuid_type(), primary_key=True, nullable=False),
+    sa.Column("role", sa.String(20), CheckConstraint("role IN ('admin', 'client')"), nullable=False),
+    sa.Column("is_active", sa.Boolean, nullable=False),
+    sa.Column("name", sa.String(255), nullable=False),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+)
+
+auth = sa.Table(
+    "auth", metadata,
+    sa.Column("user_id", uuid_type(), sa.ForeignKey("users2.user_id", ondelete="CASCADE"), primary_key=True, nullable=False),
+    sa.Column("username", sa.String(150), unique=True, nullable=False),
+    sa.Column("password_hash", sa.String(255), nullable=False),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+)
+
+token_services = sa.Table(
+    "token_services", metadata,
+    sa.Column("token_id", sa.BigInteger, primary_key=True, autoincrement=True),
+    sa.Column("user_id", uuid_type(), sa.ForeignKey("users2.user_id", ondelete="CASCADE"), index=True, nullable=False),
+    sa.Column("token_hash", token_hash_type(), nullable=False, unique=True),
+    sa.Column("token_type", sa.String(20), CheckConstraint("token_type IN ('access','refresh')", name="chk_token_type"), nullable=False),
+    sa.Column("revoked", sa.Boolean, nullable=False),
+    sa.Column("expires_at", sa.DateTime, nullable=False),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+)
+
+admins = sa.Table(
+    "admins", metadata,
+    sa.Column("user_id", uuid_type(), sa.ForeignKey("users2.user_id", ondelete="CASCADE"), primary_key=True, nullable=False),
+    sa.Column("permission_level", sa.Integer, nullable=False),
+    sa.Column("granted_by", uuid_type(), sa.ForeignKey("users2.user_id"), nullable=True),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+    CheckConstraint("permission_level BETWEEN 1 AND 3", name="chk_admin_permission_level"),
+)
+
+clients = sa.Table(
+    "clients", metadata,
+    sa.Column("user_id", uuid_type(), sa.ForeignKey("users2.user_id", ondelete="CASCADE"), primary_key=True, nullable=False),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+)
+
+users_info = sa.Table(
+    "users_info", metadata,
+    sa.Column("user_id", uuid_type(), sa.ForeignKey("users2.user_id", ondelete="CASCADE"), primary_key=True, nullable=False),
+    sa.Column("profile_photo_key", sa.String(255), nullable=True),
+    sa.Column("name", sa.String(100), nullable=False),
+    sa.Column("email", sa.String(150), unique=True, nullable=True),
+    sa.Column("department", sa.String(50), CheckConstraint(
+        "department IN ('software_development','qa','devops','hr','finance','sales')",
+        name="chk_department"), nullable=False),
+    sa.Column("designation", sa.String(50), CheckConstraint(
+        "designation IN ('junior_developer','developer','senior_developer','tech_lead','engineering_manager')",
+        name="chk_designation"), nullable=False),
+    sa.Column("phone", sa.String(15), nullable=False, unique=True),
+    sa.Column("employee_id", sa.String(20), nullable=False, unique=True),
+    sa.Column("gender", sa.String(10), CheckConstraint("gender IN ('male','female')", name="chk_gender"), nullable=False),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+    sa.Column("updated_at", sa.DateTime, nullable=False),
+)
+
+leave_requests = sa.Table(
+    "leave_requests", metadata,
+    sa.Column("leave_id", sa.BigInteger, primary_key=True, autoincrement=True),
+    sa.Column("user_id", uuid_type(), sa.ForeignKey("users2.user_id", ondelete="CASCADE"), index=True, nullable=False),
+    sa.Column("leave_type", sa.String(30), CheckConstraint(
+        "leave_type IN ('casual_leave','sick_leave','annual_leave','emergency_leave')",
+        name="chk_leave_type"), nullable=False),
+    sa.Column("from_date", sa.Date, nullable=False),
+    sa.Column("to_date", sa.Date, nullable=False),
+    sa.Column("days", sa.Integer, nullable=False),
+    sa.Column("reason", sa.Text, nullable=False),
+    sa.Column("status", sa.String(20), CheckConstraint(
+        "status IN ('pending','approved','rejected')", name="chk_leave_status"), nullable=False),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+    sa.Column("updated_at", sa.DateTime, nullable=False),
+)
+
+attendance = sa.Table(
+    "attendance", metadata,
+    sa.Column("attendance_id", sa.BigInteger, primary_key=True, autoincrement=True),
+    sa.Column("user_id", uuid_type(), sa.ForeignKey("users2.user_id", ondelete="CASCADE"), index=True, nullable=False),
+    sa.Column("date", sa.Date, nullable=False),
+    sa.Column("clock_in", sa.DateTime, nullable=False),
+    sa.Column("clock_out", sa.DateTime, nullable=True),
+    sa.Column("status", sa.String(20), CheckConstraint(
+        "status IN ('present','absent','half_day','late')", name="chk_attendance_status"), nullable=False),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+    sa.Column("updated_at", sa.DateTime, nullable=False),
+    sa.UniqueConstraint("user_id", "date", name="uq_attendance_user_date"),
+)
+
+
+def upgrade(connection):
+    metadata.create_all(connection, checkfirst=True)
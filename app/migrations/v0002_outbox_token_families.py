@@ -0,0 +1,43 @@
+"""
+Schema changes made in models.py after the initial schema:
+- attendance.clock_in nullable (explicit absent rows)
+- (date, user_id) index for day-wide attendance lookups
+- outbox_events table
+- token_services.family_id for refresh-token rotation
+"""
+
+import sqlalchemy as sa
+from sqlalchemy import CheckConstraint
+from migrate import add_column, set_nullable, create_index, has_table
+from models import uuid_type
+
+revision = "0002"
+description = "absent rows, outbox, token families"
+
+metadata = sa.MetaData()
+
+outbox_events = sa.Table(
+    "outbox_events", metadata,
+    sa.Column("outbox_id", sa.BigInteger, primary_key=True, autoincrement=True),
+    sa.Column("topic", sa.String(100), nullable=False),
+    sa.Column("payload", sa.Text, nullable=False),
+    sa.Column("status", sa.String(20), CheckConstraint(
+        "status IN ('pending','done','failed')", name="chk_outbox_status"), nullable=False),
+    sa.Column("attempts", sa.Integer, nullable=False),
+    sa.Column("available_at", sa.DateTime, nullable=False),
+    sa.Column("last_error", sa.String(500), nullable=True),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+    sa.Column("processed_at", sa.DateTime, nullable=True),
+    sa.Index("ix_outbox_status_available", "status", "available_at"),
+)
+
+
+def upgrade(connection):
+    set_nullable(connection, "attendance", "clock_in", sa.DateTime(), True)
+    create_index(connection, "attendance", "ix_attendance_date_user", ["date", "user_id"])
+
+    if not has_table(connection, "outbox_events"):
+        outbox_events.create(connection)
+
+    add_column(connection, "token_services", sa.Column("family_id", uuid_type(), nullable=True))
+    create_index(connection, "token_services", "ix_token_services_family_id", ["family_id"])
@@ -0,0 +1,44 @@
+"""
+Covering indexes for the hot queries:
+- leave summary:      (user_id, status, from_date) INCLUDE (leave_type, to_date, days)
+- admin listing:      (status, created_at)
+- token verification: (token_hash, token_type, revoked) INCLUDE (user_id, expires_at)
+- monthly attendance: (user_id, date) INCLUDE (status, clock_in, clock_out)
+- snapshot/directory watermarks: updated_at
+"""
+
+from migrate import create_index
+
+revision = "0003"
+description = "hot query indexes"
+
+
+def upgrade(connection):
+    create_index(
+        connection, "leave_requests", "ix_leave_user_status_from",
+        ["user_id", "status", "from_date"],
+        include=["leave_type", "to_date", "days"],
+    )
+    create_index(
+        connection, "leave_requests", "ix_leave_status_created",
+        ["status", "created_at"],
+    )
+    create_index(
+        connection, "leave_requests", "ix_leave_updated_at", ["updated_at"],
+    )
+    create_index(
+        connection, "token_services", "ix_token_hash_type_revoked",
+        ["token_hash", "token_type", "revoked"],
+        include=["user_id", "expires_at"],
+    )
+    create_index(
+        connection, "attendance", "ix_attendance_user_date_cover",
+        ["user_id", "date"],
+        include=["status", "clock_in", "clock_out"],
+    )
+    create_index(
+        connection, "attendance", "ix_attendance_updated_at", ["updated_at"],
+    )
+    create_index(
+        connection, "users_info", "ix_users_info_updated_at", ["updated_at"],
+    )
@@ -0,0 +1,20 @@
+"""
+Leave calendar overlap query (from_date <= end AND to_date >= start):
+- (status, to_date) INCLUDE (from_date, user_id, leave_type)
+One range seek per status on to_date >= start bounds the scan to leaves
+ending on or after the month start, instead of all history before the
+month end.
+"""
+
+from migrate import create_index
+
+revision = "0004"
+description = "leave calendar overlap index"
+
+
+def upgrade(connection):
+    create_index(
+        connection, "leave_requests", "ix_leave_status_to_date",
+        ["status", "to_date"],
+        include=["from_date", "user_id", "leave_type"],
+    )
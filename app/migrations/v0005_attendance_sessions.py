@@ -0,0 +1,108 @@
+"""
+Multiple work sessions per day:
+- attendance_sessions table, at most one open session per user
+- attendance.worked_seconds (sum of closed sessions) and
+  attendance.open_since (start of the open session)
+- monthly covering index now includes the aggregate columns
+Existing rows become one session each: closed rows get their
+clock_in..clock_out span as worked_seconds, open rows keep
+open_since = clock_in.
+"""
+
+import sqlalchemy as sa
+from migrate import add_column, create_index, drop_index, has_table, reflect_table, seconds_between
+from models import uuid_type
+
+revision = "0005"
+description = "attendance sessions and daily worked seconds"
+
+metadata = sa.MetaData()
+
+attendance_sessions = sa.Table(
+    "attendance_sessions", metadata,
+    sa.Column("session_id", sa.BigInteger, primary_key=True, autoincrement=True),
+    sa.Column("attendance_id", sa.BigInteger, nullable=False),
+    sa.Column("user_id", uuid_type(), nullable=False),
+    sa.Column("date", sa.Date, nullable=False),
+    sa.Column("started_at", sa.DateTime, nullable=False),
+    sa.Column("ended_at", sa.DateTime, nullable=True),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+    sa.Column("updated_at", sa.DateTime, nullable=False),
+    sa.ForeignKeyConstraint(
+        ["attendance_id"], ["attendance.attendance_id"], ondelete="CASCADE"
+    ),
+    sa.Index("ix_attendance_sessions_attendance", "attendance_id"),
+    sa.Index("ix_attendance_sessions_user_date", "user_id", "date"),
+    sa.Index(
+        "uq_attendance_sessions_open", "user_id", unique=True,
+        mssql_where=sa.text("ended_at IS NULL"),
+        postgresql_where=sa.text("ended_at IS NULL"),
+        sqlite_where=sa.text("ended_at IS NULL"),
+    ),
+)
+
+
+def upgrade(connection):
+    add_column(connection, "attendance", sa.Column(
+        "worked_seconds", sa.Integer, nullable=False, server_default=sa.text("0")
+    ))
+    add_column(connection, "attendance", sa.Column("open_since", sa.DateTime, nullable=True))
+
+    if not has_table(connection, "attendance_sessions"):
+        # The foreign key target must be in the same MetaData
+        sa.Table("attendance", metadata, autoload_with=connection)
+        attendance_sessions.create(connection)
+        _backfill(connection)
+
+    create_index(
+        connection, "attendance", "ix_attendance_user_date_hours",
+        ["user_id", "date"],
+        include=["status", "clock_in", "clock_out", "open_since", "worked_seconds"],
+    )
+    drop_index(connection, "attendance", "ix_attendance_user_date_cover")
+
+
+def _backfill(connection):
+    attendance = reflect_table(connection, "attendance")
+    later = attendance.alias("later")
+    now = sa.func.now()
+
+    # One session per pre-existing clocked-in row. Only a user's latest
+    # open row gets an open session (uq_attendance_sessions_open); older
+    # open rows are still closed by the nightly job via open_since.
+    newer_open = sa.exists().where(
+        later.c.user_id == attendance.c.user_id,
+        later.c.clock_in.isnot(None),
+        later.c.clock_out.is_(None),
+        later.c.date > attendance.c.date,
+    )
+
+    connection.execute(attendance_sessions.insert().from_select(
+        ["attendance_id", "user_id", "date", "started_at", "ended_at", "created_at", "updated_at"],
+        sa.select(
+            attendance.c.attendance_id,
+            attendance.c.user_id,
+            attendance.c.date,
+            attendance.c.clock_in,
+            attendance.c.clock_out,
+            now,
+            now,
+        ).where(
+            attendance.c.clock_in.isnot(None),
+            sa.or_(attendance.c.clock_out.isnot(None), ~newer_open),
+        ),
+    ))
+
+    connection.execute(attendance.update().where(
+        attendance.c.clock_in.isnot(None),
+        attendance.c.clock_out.isnot(None),
+    ).values(
+        worked_seconds=seconds_between(connection, attendance.c.clock_in, attendance.c.clock_out),
+    ))
+
+    connection.execute(attendance.update().where(
+        attendance.c.clock_in.isnot(None),
+        attendance.c.clock_out.is_(None),
+    ).values(
+        open_since=attendance.c.clock_in,
+    ))
@@ -0,0 +1,38 @@
+"""
+Bulk punch ingestion:
+- punch_events table; (event_id, user_id) unique for idempotent replays
+"""
+
+import sqlalchemy as sa
+from sqlalchemy import CheckConstraint
+from migrate import has_table
+from models import uuid_type
+
+revision = "0006"
+description = "punch events"
+
+metadata = sa.MetaData()
+
+punch_events = sa.Table(
+    "punch_events", metadata,
+    sa.Column("punch_id", sa.BigInteger, primary_key=True, autoincrement=True),
+    sa.Column("user_id", uuid_type(), nullable=False),
+    sa.Column("event_id", sa.String(64), nullable=False),
+    sa.Column("punch_type", sa.String(10), CheckConstraint(
+        "punch_type IN ('clock_in','clock_out')", name="chk_punch_events_type"), nullable=False),
+    sa.Column("occurred_at", sa.DateTime, nullable=False),
+    sa.Column("device_id", sa.String(64), nullable=True),
+    sa.Column("result", sa.String(10), CheckConstraint(
+        "result IN ('applied','rejected')", name="chk_punch_events_result"), nullable=False),
+    sa.Column("reason", sa.String(100), nullable=True),
+    sa.Column("received_at", sa.DateTime, nullable=False),
+    sa.ForeignKeyConstraint(["user_id"], ["users2.user_id"], ondelete="CASCADE"),
+    sa.UniqueConstraint("event_id", "user_id", name="uq_punch_events_event_user"),
+)
+
+
+def upgrade(connection):
+    if not has_table(connection, "punch_events"):
+        # The foreign key target must be in the same MetaData
+        sa.Table("users2", metadata, autoload_with=connection)
+        punch_events.create(connection)
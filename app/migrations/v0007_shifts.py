@@ -0,0 +1,53 @@
+"""
+Shift definitions for late/half_day classification:
+- shifts table, one per department or per employee
+Existing attendance keeps its status until
+`flask reclassify-attendance` is run.
+"""
+
+import sqlalchemy as sa
+from sqlalchemy import CheckConstraint
+from migrate import has_table
+from models import uuid_type
+
+revision = "0007"
+description = "shifts"
+
+metadata = sa.MetaData()
+
+shifts = sa.Table(
+    "shifts", metadata,
+    sa.Column("shift_id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("name", sa.String(50), nullable=False),
+    sa.Column("department", sa.String(50), nullable=True),
+    sa.Column("user_id", uuid_type(), nullable=True),
+    sa.Column("start_time", sa.Time, nullable=False),
+    sa.Column("grace_minutes", sa.Integer, nullable=False),
+    sa.Column("min_work_minutes", sa.Integer, nullable=False),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+    sa.Column("updated_at", sa.DateTime, nullable=False),
+    sa.ForeignKeyConstraint(["user_id"], ["users2.user_id"], ondelete="CASCADE"),
+    CheckConstraint(
+        "(department IS NULL AND user_id IS NOT NULL) OR (department IS NOT NULL AND user_id IS NULL)",
+        name="chk_shifts_scope",
+    ),
+    sa.Index(
+        "uq_shifts_department", "department", unique=True,
+        mssql_where=sa.text("department IS NOT NULL"),
+        postgresql_where=sa.text("department IS NOT NULL"),
+        sqlite_where=sa.text("department IS NOT NULL"),
+    ),
+    sa.Index(
+        "uq_shifts_user", "user_id", unique=True,
+        mssql_where=sa.text("user_id IS NOT NULL"),
+        postgresql_where=sa.text("user_id IS NOT NULL"),
+        sqlite_where=sa.text("user_id IS NOT NULL"),
+    ),
+)
+
+
+def upgrade(connection):
+    if not has_table(connection, "shifts"):
+        # The foreign key target must be in the same MetaData
+        sa.Table("users2", metadata, autoload_with=connection)
+        shifts.create(connection)
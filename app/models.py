@@ -1,16 +1,93 @@
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import CheckConstraint
+from sqlalchemy import CheckConstraint, BINARY, Uuid
+from sqlalchemy.types import TypeDecorator
 import uuid
 import secrets
 import hashlib
 from datetime import datetime, timedelta
+from config import compact_key_storage
 
-db = SQLAlchemy()
+# Write paths build responses from values already in hand; keeping
+# attributes loaded after commit avoids a reload SELECT per object.
+db = SQLAlchemy(session_options={"expire_on_commit": False})
+
+
+def lock_rows(query, entity, *, skip_locked: bool = False):
+    """
+    Adds row locks held until commit. PostgreSQL/MySQL get FOR UPDATE
+    [SKIP LOCKED]; the SQL Server compiler drops that clause, so it gets
+    UPDLOCK/ROWLOCK table hints instead (READPAST to skip locked rows).
+    """
+
+    hint = "WITH (UPDLOCK, READPAST, ROWLOCK)" if skip_locked else "WITH (UPDLOCK, ROWLOCK)"
+    return query.with_for_update(skip_locked=skip_locked).with_hint(entity, hint, "mssql")
+
+
+# --------------------------
+# Key storage
+# --------------------------
+# With COMPACT_KEY_STORAGE, UUIDs are stored as 16 bytes (native
+# UNIQUEIDENTIFIER/UUID where available) and token hashes as BINARY(32).
+# Conversion happens here, so callers keep seeing str values.
+#
+# The mode is read from the environment when this module is imported
+# (column types are part of the class definitions), so the variable
+# must be set before the first `import models`; changing app.config
+# afterwards has no effect and create_app rejects the mismatch.
+COMPACT_KEY_STORAGE = compact_key_storage()
+
+class CompactUUID(TypeDecorator):
+    """UUID string in Python, 16 bytes in the database."""
+
+    impl = BINARY(16)
+    cache_ok = True
+
+    NATIVE_DIALECTS = ("mssql", "postgresql")
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name in self.NATIVE_DIALECTS:
+            return dialect.type_descriptor(Uuid(as_uuid=False))
+        return dialect.type_descriptor(BINARY(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if dialect.name in self.NATIVE_DIALECTS:
+            return str(value)
+        return uuid.UUID(str(value)).bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, bytes):
+            return str(uuid.UUID(bytes=value))
+        return str(value).lower()
+
+
+class HexDigest(TypeDecorator):
+    """SHA-256 hex digest in Python, BINARY(32) in the database."""
+
+    impl = BINARY(32)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return bytes.fromhex(value) if value is not None else None
+
+    def process_result_value(self, value, dialect):
+        return value.hex() if value is not None else None
+
+
+def uuid_type():
+    return CompactUUID() if COMPACT_KEY_STORAGE else db.String(36)
+
+
+def token_hash_type():
+    return HexDigest() if COMPACT_KEY_STORAGE else db.String(64)
 
 
 class Users(db.Model):
     __tablename__ = 'users2'
-    user_id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()), nullable=False)
+    user_id = db.Column(uuid_type(), primary_key=True, default=lambda: str(uuid.uuid4()), nullable=False)
     role = db.Column(
         db.String(20),
         CheckConstraint("role IN ('admin', 'client')"),
@@ -41,7 +118,7 @@ class Users(db.Model):
 
 class Auth(db.Model):
     __tablename__ = 'auth'
-    user_id = db.Column(db.String(36), db.ForeignKey('users2.user_id', ondelete='CASCADE'), primary_key=True, nullable=False)
+    user_id = db.Column(uuid_type(), db.ForeignKey('users2.user_id', ondelete='CASCADE'), primary_key=True, nullable=False)
     username = db.Column(db.String(150), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=db.func.now(), nullable=False)
@@ -52,22 +129,33 @@ class Auth(db.Model):
 class TokenServices(db.Model):
     __tablename__ = 'token_services'
     token_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
-    user_id = db.Column(db.String(36), db.ForeignKey('users2.user_id', ondelete='CASCADE'), index=True, nullable=False)
-    token_hash = db.Column(db.String(64), nullable=False, unique=True)
+    user_id = db.Column(uuid_type(), db.ForeignKey('users2.user_id', ondelete='CASCADE'), index=True, nullable=False)
+    token_hash = db.Column(token_hash_type(), nullable=False, unique=True)
     token_type = db.Column(
         db.String(20),
         CheckConstraint("token_type IN ('access','refresh')", name="chk_token_type"),
         nullable=False
     )
     revoked = db.Column(db.Boolean, default=False, nullable=False)
+    # Tokens descending from one login share a family (rotation, logout)
+    family_id = db.Column(uuid_type(), index=True, nullable=True)
     expires_at = db.Column(db.DateTime, nullable=False)
     created_at = db.Column(db.DateTime, default=db.func.now(), nullable=False)
 
+    __table_args__ = (
+        # verify_access_token / refresh lookups without key lookups
+        db.Index(
+            'ix_token_hash_type_revoked', 'token_hash', 'token_type', 'revoked',
+            mssql_include=['user_id', 'expires_at'],
+            postgresql_include=['user_id', 'expires_at'],
+        ),
+    )
+
 class Admins(db.Model):
     __tablename__ = 'admins'
-    user_id = db.Column(db.String(36), db.ForeignKey('users2.user_id', ondelete='CASCADE'), primary_key=True, nullable=False)
+    user_id = db.Column(uuid_type(), db.ForeignKey('users2.user_id', ondelete='CASCADE'), primary_key=True, nullable=False)
     permission_level = db.Column(db.Integer, nullable=False, default=1)
-    granted_by = db.Column(db.String(36), db.ForeignKey('users2.user_id'), nullable=True)
+    granted_by = db.Column(uuid_type(), db.ForeignKey('users2.user_id'), nullable=True)
     created_at = db.Column(db.DateTime, default=db.func.now(), nullable=False)
 
     __table_args__ = (
@@ -79,14 +167,17 @@ class Admins(db.Model):
     
 class Clients(db.Model):
     __tablename__ = 'clients'
-    user_id = db.Column(db.String(36), db.ForeignKey('users2.user_id', ondelete='CASCADE'), primary_key=True, nullable=False)
+    user_id = db.Column(uuid_type(), db.ForeignKey('users2.user_id', ondelete='CASCADE'), primary_key=True, nullable=False)
     created_at = db.Column(db.DateTime, default=db.func.now(), nullable=False)
 
 
+DEPARTMENTS = ('software_development', 'qa', 'devops', 'hr', 'finance', 'sales')
+
+
 class UsersInfo(db.Model):
     __tablename__ = 'users_info'
 
-    user_id = db.Column(db.String(36), db.ForeignKey('users2.user_id', ondelete='CASCADE'), primary_key=True, nullable=False)
+    user_id = db.Column(uuid_type(), db.ForeignKey('users2.user_id', ondelete='CASCADE'), primary_key=True, nullable=False)
     profile_photo_key = db.Column(db.String(255), nullable=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(150), unique=True, nullable=True)
@@ -119,12 +210,16 @@ class UsersInfo(db.Model):
     created_at = db.Column(db.DateTime, default=db.func.now(), nullable=False)
     updated_at = db.Column( db.DateTime, default=db.func.now(), onupdate=db.func.now(), nullable=False)
 
+    __table_args__ = (
+        db.Index('ix_users_info_updated_at', 'updated_at'),
+    )
+
 
 class LeaveRequests(db.Model):
     __tablename__ = 'leave_requests'
 
     leave_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
-    user_id = db.Column(db.String(36), db.ForeignKey('users2.user_id', ondelete='CASCADE'), index=True, nullable=False)
+    user_id = db.Column(uuid_type(), db.ForeignKey('users2.user_id', ondelete='CASCADE'), index=True, nullable=False)
     leave_type = db.Column(
         db.String(30),
         CheckConstraint(
@@ -151,15 +246,41 @@ class LeaveRequests(db.Model):
 
     user = db.relationship("Users", backref=db.backref("leave_requests", cascade="all, delete-orphan"))
 
+    __table_args__ = (
+        # Leave summary: approved leaves of a user in a year
+        db.Index(
+            'ix_leave_user_status_from', 'user_id', 'status', 'from_date',
+            mssql_include=['leave_type', 'to_date', 'days'],
+            postgresql_include=['leave_type', 'to_date', 'days'],
+        ),
+        # Admin listing, newest first, optionally by status
+        db.Index('ix_leave_status_created', 'status', 'created_at'),
+        db.Index('ix_leave_updated_at', 'updated_at'),
+        # Leave calendar overlap (to_date >= start AND from_date <= end):
+        # seeking on (status, to_date) only touches leaves ending in/after
+        # the month
+        db.Index(
+            'ix_leave_status_to_date', 'status', 'to_date',
+            mssql_include=['from_date', 'user_id', 'leave_type'],
+            postgresql_include=['from_date', 'user_id', 'leave_type'],
+        ),
+    )
+
 
 class Attendance(db.Model):
     __tablename__ = 'attendance'
 
     attendance_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
-    user_id = db.Column(db.String(36), db.ForeignKey('users2.user_id', ondelete='CASCADE'), index=True, nullable=False)
+    user_id = db.Column(uuid_type(), db.ForeignKey('users2.user_id', ondelete='CASCADE'), index=True, nullable=False)
     date = db.Column(db.Date, nullable=False)
-    clock_in = db.Column(db.DateTime, nullable=False)
+    # Daily aggregate over attendance_sessions:
+    # clock_in = first session start, clock_out = last session end
+    # (NULL while a session is open), open_since = open session start,
+    # worked_seconds = sum of closed sessions
+    clock_in = db.Column(db.DateTime, nullable=True)  # NULL for absent rows
     clock_out = db.Column(db.DateTime, nullable=True)
+    open_since = db.Column(db.DateTime, nullable=True)
+    worked_seconds = db.Column(db.Integer, nullable=False, default=0, server_default=db.text("0"))
     status = db.Column(
         db.String(20),
         CheckConstraint(
@@ -176,4 +297,146 @@ class Attendance(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint('user_id', 'date', name='uq_attendance_user_date'),
+        # Day-wide lookups (live dashboard, nightly job)
+        db.Index('ix_attendance_date_user', 'date', 'user_id'),
+        # Monthly stats/reports read these columns for one user
+        db.Index(
+            'ix_attendance_user_date_hours', 'user_id', 'date',
+            mssql_include=['status', 'clock_in', 'clock_out', 'open_since', 'worked_seconds'],
+            postgresql_include=['status', 'clock_in', 'clock_out', 'open_since', 'worked_seconds'],
+        ),
+        db.Index('ix_attendance_updated_at', 'updated_at'),
+    )
+
+
+class AttendanceSession(db.Model):
+    __tablename__ = 'attendance_sessions'
+
+    session_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    attendance_id = db.Column(db.BigInteger, db.ForeignKey('attendance.attendance_id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(uuid_type(), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=False)
+    ended_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=db.func.now(), nullable=False)
+    updated_at = db.Column(db.DateTime, default=db.func.now(), onupdate=db.func.now(), nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_attendance_sessions_attendance', 'attendance_id'),
+        db.Index('ix_attendance_sessions_user_date', 'user_id', 'date'),
+        # At most one open session per user
+        db.Index(
+            'uq_attendance_sessions_open', 'user_id', unique=True,
+            mssql_where=db.text('ended_at IS NULL'),
+            postgresql_where=db.text('ended_at IS NULL'),
+            sqlite_where=db.text('ended_at IS NULL'),
+        ),
+    )
+
+
+class Shift(db.Model):
+    """
+    Working shift for one department or one employee (the employee's
+    own shift wins). Times are UTC, like the stored clock times.
+    """
+
+    __tablename__ = 'shifts'
+
+    shift_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    name = db.Column(db.String(50), nullable=False)
+    department = db.Column(db.String(50), nullable=True)
+    user_id = db.Column(uuid_type(), db.ForeignKey('users2.user_id', ondelete='CASCADE'), nullable=True)
+    start_time = db.Column(db.Time, nullable=False)
+    # First clock-in later than start_time + grace_minutes -> 'late'
+    grace_minutes = db.Column(db.Integer, nullable=False, default=10)
+    # Closed day with less worked time -> 'half_day'
+    min_work_minutes = db.Column(db.Integer, nullable=False, default=240)
+    created_at = db.Column(db.DateTime, default=db.func.now(), nullable=False)
+    updated_at = db.Column(db.DateTime, default=db.func.now(), onupdate=db.func.now(), nullable=False)
+
+    __table_args__ = (
+        CheckConstraint(
+            "(department IS NULL AND user_id IS NOT NULL) OR (department IS NOT NULL AND user_id IS NULL)",
+            name="chk_shifts_scope"
+        ),
+        db.Index(
+            'uq_shifts_department', 'department', unique=True,
+            mssql_where=db.text('department IS NOT NULL'),
+            postgresql_where=db.text('department IS NOT NULL'),
+            sqlite_where=db.text('department IS NOT NULL'),
+        ),
+        db.Index(
+            'uq_shifts_user', 'user_id', unique=True,
+            mssql_where=db.text('user_id IS NOT NULL'),
+            postgresql_where=db.text('user_id IS NOT NULL'),
+            sqlite_where=db.text('user_id IS NOT NULL'),
+        ),
+    )
+
+
+class PunchEvent(db.Model):
+    """
+    Client-generated punch events ingested in batches (offline kiosks and
+    apps). (event_id, user_id) makes replays idempotent; the stored
+    result is returned again for duplicates. Only applied events are
+    written now, so rejected ones can be retried; 'rejected' rows from
+    earlier ingests stay valid.
+    """
+
+    __tablename__ = 'punch_events'
+
+    punch_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    user_id = db.Column(uuid_type(), db.ForeignKey('users2.user_id', ondelete='CASCADE'), nullable=False)
+    event_id = db.Column(db.String(64), nullable=False)
+    punch_type = db.Column(
+        db.String(10),
+        CheckConstraint(
+            "punch_type IN ('clock_in','clock_out')",
+            name="chk_punch_events_type"
+        ),
+        nullable=False
+    )
+    occurred_at = db.Column(db.DateTime, nullable=False)
+    device_id = db.Column(db.String(64), nullable=True)
+    result = db.Column(
+        db.String(10),
+        CheckConstraint(
+            "result IN ('applied','rejected')",
+            name="chk_punch_events_result"
+        ),
+        nullable=False
+    )
+    reason = db.Column(db.String(100), nullable=True)
+    received_at = db.Column(db.DateTime, default=db.func.now(), nullable=False)
+
+    __table_args__ = (
+        # Client event ids are random, so event_id leads for selectivity
+        db.UniqueConstraint('event_id', 'user_id', name='uq_punch_events_event_user'),
+    )
+
+
+class OutboxEvents(db.Model):
+    __tablename__ = 'outbox_events'
+
+    outbox_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    topic = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON
+    status = db.Column(
+        db.String(20),
+        CheckConstraint(
+            "status IN ('pending','done','failed')",
+            name="chk_outbox_status"
+        ),
+        nullable=False,
+        default='pending'
+    )
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    available_at = db.Column(db.DateTime, default=db.func.now(), nullable=False)
+    last_error = db.Column(db.String(500), nullable=True)
+    created_at = db.Column(db.DateTime, default=db.func.now(), nullable=False)
+    processed_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # Worker poll: pending rows that are due, oldest first
+        db.Index('ix_outbox_status_available', 'status', 'available_at'),
     )
@@ -0,0 +1,258 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import update, delete
+from models import db, OutboxEvents, lock_rows
+from json_provider import dumps_compact
+from exceptions import OutboxError
+
+
+# topic -> list of handler(payload: dict)
+_handlers = {}
+
+
+def register_handler(topic: str):
+    """
+    Decorator registering a side-effect handler for an outbox topic.
+    Handlers must be idempotent: delivery is at-least-once.
+    """
+
+    def decorator(fn):
+        _handlers.setdefault(topic, []).append(fn)
+        return fn
+
+    return decorator
+
+
+def enqueue(topic: str, payload: dict) -> None:
+    """
+    Adds an outbox row to the current session.
+    Must be called inside the transaction that makes the domain change,
+    so both commit (or roll back) together.
+    """
+
+    try:
+        body = dumps_compact(payload)
+    except (TypeError, ValueError) as e:
+        raise OutboxError(f"Unserializable payload for {topic}") from e
+
+    now = datetime.utcnow()
+    db.session.add(OutboxEvents(
+        topic=topic,
+        payload=body,
+        status="pending",
+        attempts=0,
+        available_at=now,
+        created_at=now,
+    ))
+
+
+def drain_outbox(*, batch_size: int | None = None) -> dict:
+    """
+    Delivers one batch of due outbox rows.
+    Rows are claimed with UPDLOCK/READPAST (FOR UPDATE SKIP LOCKED) and
+    leased for OUTBOX_LEASE_SECONDS (available_at pushed forward) in a
+    short transaction, so no lock is held while handlers run and
+    several workers can drain concurrently. Each row is then delivered
+    in its own transaction: handler side effects commit together with
+    the row's 'done' mark, a failing handler rolls back only its own
+    row and the attempt is recorded. Failed rows are retried with
+    exponential backoff; a crashed worker's rows are redelivered once
+    their lease expires.
+    Returns counts for the batch.
+    """
+
+    config = current_app.config
+    batch_size = batch_size or config.get("OUTBOX_BATCH_SIZE", 100)
+    max_attempts = config.get("OUTBOX_MAX_ATTEMPTS", 8)
+    backoff = config.get("OUTBOX_BACKOFF_SECONDS", 2)
+    backoff_max = config.get("OUTBOX_BACKOFF_MAX_SECONDS", 600)
+    lease = config.get("OUTBOX_LEASE_SECONDS", 60)
+
+    now = datetime.utcnow()
+    stats = {"claimed": 0, "delivered": 0, "retried": 0, "failed": 0}
+
+    # ------------------------
+    # Claim: lock, lease, commit
+    # ------------------------
+    try:
+        rows = lock_rows(
+            db.session.query(
+                OutboxEvents.outbox_id,
+                OutboxEvents.topic,
+                OutboxEvents.payload,
+                OutboxEvents.attempts,
+            ).filter(
+                OutboxEvents.status == "pending",
+                OutboxEvents.available_at <= now,
+            ).order_by(
+                OutboxEvents.outbox_id
+            ).limit(batch_size),
+            OutboxEvents,
+            skip_locked=True,
+        ).all()
+
+        if rows:
+            db.session.execute(
+                update(OutboxEvents).where(
+                    OutboxEvents.outbox_id.in_([row.outbox_id for row in rows])
+                ).values(
+                    available_at=now + timedelta(seconds=lease)
+                ).execution_options(synchronize_session=False)
+            )
+        db.session.commit()
+
+    except Exception as e:
+        db.session.rollback()
+        raise OutboxError("Failed to claim outbox rows") from e
+
+    stats["claimed"] = len(rows)
+
+    # ------------------------
+    # Deliver: one transaction per row
+    # ------------------------
+    for row in rows:
+        try:
+            payload = json.loads(row.payload)
+            for handler in _handlers.get(row.topic, ()):
+                handler(payload)
+
+            _set_row(row.outbox_id, status="done", processed_at=datetime.utcnow())
+            db.session.commit()
+            stats["delivered"] += 1
+            continue
+
+        except Exception as e:
+            db.session.rollback()
+            error = str(e)[:500]
+
+        attempts = row.attempts + 1
+        if attempts >= max_attempts:
+            values = {"status": "failed"}
+            stats["failed"] += 1
+        else:
+            delay = min(backoff * (2 ** (attempts - 1)), backoff_max)
+            values = {"available_at": datetime.utcnow() + timedelta(seconds=delay)}
+            stats["retried"] += 1
+
+        try:
+            _set_row(row.outbox_id, attempts=attempts, last_error=error, **values)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise OutboxError("Failed to record outbox failure") from e
+
+    return stats
+
+
+def _set_row(outbox_id: int, **values) -> None:
+    db.session.execute(
+        update(OutboxEvents).where(
+            OutboxEvents.outbox_id == outbox_id
+        ).values(
+            **values
+        ).execution_options(synchronize_session=False)
+    )
+
+
+def purge_outbox(*, retention_days: int | None = None, batch_size: int | None = None) -> int:
+    """
+    Deletes delivered rows older than OUTBOX_RETENTION_DAYS, one short
+    transaction per batch (seek on ix_outbox_status_available: a done
+    row's available_at is its last claim).
+    Returns number of rows deleted.
+    Raises OutboxError on failure.
+    """
+
+    config = current_app.config
+    retention_days = retention_days or config.get("OUTBOX_RETENTION_DAYS", 7)
+    batch_size = batch_size or config.get("OUTBOX_PURGE_BATCH_SIZE", 1000)
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+
+    deleted = 0
+    try:
+        while True:
+            ids = [
+                outbox_id for (outbox_id,) in db.session.query(OutboxEvents.outbox_id).filter(
+                    OutboxEvents.status == "done",
+                    OutboxEvents.available_at < cutoff,
+                ).limit(batch_size)
+            ]
+            if not ids:
+                break
+
+            db.session.execute(
+                delete(OutboxEvents).where(
+                    OutboxEvents.outbox_id.in_(ids)
+                ).execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            deleted += len(ids)
+
+            if len(ids) < batch_size:
+                break
+
+    except Exception as e:
+        db.session.rollback()
+        raise OutboxError("Failed to purge outbox") from e
+
+    return deleted
+
+
+class OutboxWorker(threading.Thread):
+    """
+    Background thread draining the outbox until stopped.
+    Sleeps OUTBOX_POLL_SECONDS whenever a batch comes back empty and
+    purges old delivered rows every OUTBOX_PURGE_INTERVAL_SECONDS.
+    """
+
+    def __init__(self, app):
+        super().__init__(name="outbox-worker", daemon=True)
+        self.app = app
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        poll = self.app.config.get("OUTBOX_POLL_SECONDS", 1.0)
+        purge_interval = self.app.config.get("OUTBOX_PURGE_INTERVAL_SECONDS", 3600)
+        next_purge = time.monotonic()
+
+        while not self._stop_event.is_set():
+            with self.app.app_context():
+                try:
+                    stats = drain_outbox()
+                except OutboxError as e:
+                    self.app.logger.warning(f"Outbox drain failed: {e.__cause__}")
+                    stats = {"claimed": 0}
+                finally:
+                    db.session.remove()
+
+                if time.monotonic() >= next_purge:
+                    next_purge = time.monotonic() + purge_interval
+                    try:
+                        purge_outbox()
+                    except OutboxError as e:
+                        self.app.logger.warning(f"Outbox purge failed: {e.__cause__}")
+                    finally:
+                        db.session.remove()
+
+            if not stats["claimed"]:
+                self._stop_event.wait(poll)
+
+
+def start_outbox_worker(app) -> OutboxWorker:
+    """
+    Starts the in-process drain thread (once per app).
+    """
+
+    worker = app.extensions.get("outbox_worker")
+    if worker is None:
+        worker = OutboxWorker(app)
+        worker.start()
+        app.extensions["outbox_worker"] = worker
+
+    return worker
@@ -0,0 +1,524 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from models import db, Attendance, AttendanceSession, PunchEvent, Users, lock_rows
+from outbox import enqueue
+from shifts import shift_for_user, classify_status
+from exceptions import AttendanceError, InvalidPunchBatch, PunchBatchConflict
+
+
+PUNCH_TYPES = ("clock_in", "clock_out")
+
+# IN-list size per query (SQL Server caps a statement at 2100 parameters)
+QUERY_CHUNK = 1000
+
+
+class _Punch:
+    __slots__ = ("index", "user_id", "event_id", "punch_type", "occurred_at", "device_id")
+
+    def __init__(self, index, user_id, event_id, punch_type, occurred_at, device_id):
+        self.index = index
+        self.user_id = user_id
+        self.event_id = event_id
+        self.punch_type = punch_type
+        self.occurred_at = occurred_at
+        self.device_id = device_id
+
+
+class _InvalidPunch(Exception):
+    pass
+
+
+def ingest_punches(*, actor_user_id: str, events: list, is_admin: bool = False) -> dict:
+    """
+    Ingests a batch of client-timestamped punch events.
+
+    Events are deduplicated on (user_id, event_id), replayed per user in
+    occurred_at order against the stored attendance state, and written
+    with a handful of set-based statements. A session earlier than the
+    stored ones (an offline device syncing late) is merged into its day
+    when its clock_in and clock_out arrive together and it overlaps no
+    stored session. Only applied events are
+    stored: a rejected one (e.g. a clock_out uploaded before its
+    clock_in) can be sent again later. Only admins may punch for
+    another user (per-event `user_id`).
+
+    Returns per-event results (request order) and a summary.
+    Raises AttendanceError subclasses on failure.
+    """
+
+    if not isinstance(events, list) or not events:
+        raise InvalidPunchBatch("events must be a non-empty list")
+
+    max_events = current_app.config.get("PUNCH_BATCH_MAX_EVENTS", 5000)
+    if len(events) > max_events:
+        raise InvalidPunchBatch(f"At most {max_events} events per batch")
+
+    now = datetime.utcnow()
+    results = [None] * len(events)
+
+    # ------------------------
+    # Parse and drop in-batch repeats
+    # ------------------------
+    punches = []
+    seen = set()
+
+    for index, raw in enumerate(events):
+        try:
+            punch = _parse_punch(index, raw, actor_user_id=actor_user_id, is_admin=is_admin, now=now)
+        except _InvalidPunch as e:
+            event_id = raw.get("event_id") if isinstance(raw, dict) else None
+            results[index] = _result(event_id, "invalid", str(e))
+            continue
+
+        key = (punch.user_id, punch.event_id)
+        if key in seen:
+            results[index] = _result(punch.event_id, "duplicate", "repeated in batch")
+            continue
+
+        seen.add(key)
+        punches.append(punch)
+
+    try:
+        punches = _drop_unknown_users(punches, actor_user_id, results)
+
+        # ------------------------
+        # Replays of already-ingested events get their stored outcome
+        # ------------------------
+        stored = _stored_outcomes(punches)
+        fresh = []
+        for punch in punches:
+            outcome = stored.get((punch.user_id, punch.event_id))
+            if outcome is None:
+                fresh.append(punch)
+            else:
+                results[punch.index] = _result(punch.event_id, "duplicate", None, original=outcome)
+
+        if fresh:
+            _apply(fresh, results, now=now)
+            db.session.commit()
+
+    except IntegrityError as e:
+        db.session.rollback()
+        raise PunchBatchConflict("Batch raced another attendance write") from e
+    except Exception as e:
+        db.session.rollback()
+        raise AttendanceError("Failed to ingest punches") from e
+
+    summary = {"applied": 0, "rejected": 0, "duplicate": 0, "invalid": 0}
+    for result in results:
+        summary[result["result"]] += 1
+
+    return {"results": results, "summary": summary}
+
+
+def _result(event_id, result: str, reason: str | None, *, original: str | None = None) -> dict:
+    entry = {"event_id": event_id, "result": result, "reason": reason}
+    if original is not None:
+        entry["original_result"] = original
+    return entry
+
+
+def _parse_punch(index: int, raw, *, actor_user_id: str, is_admin: bool, now: datetime) -> _Punch:
+    if not isinstance(raw, dict):
+        raise _InvalidPunch("event must be an object")
+
+    event_id = raw.get("event_id")
+    if not isinstance(event_id, str) or not event_id or len(event_id) > 64:
+        raise _InvalidPunch("event_id must be a string of 1-64 characters")
+
+    punch_type = raw.get("type")
+    if punch_type not in PUNCH_TYPES:
+        raise _InvalidPunch("type must be clock_in or clock_out")
+
+    try:
+        occurred_at = datetime.fromisoformat(raw.get("occurred_at") or "")
+    except (TypeError, ValueError):
+        raise _InvalidPunch("occurred_at must be an ISO 8601 timestamp")
+
+    # Stored times are naive UTC, like datetime.utcnow()
+    if occurred_at.tzinfo is not None:
+        occurred_at = occurred_at.astimezone(timezone.utc).replace(tzinfo=None)
+
+    config = current_app.config
+    if occurred_at > now + timedelta(seconds=config.get("PUNCH_MAX_FUTURE_SECONDS", 300)):
+        raise _InvalidPunch("occurred_at is in the future")
+    if occurred_at < now - timedelta(days=config.get("PUNCH_MAX_AGE_DAYS", 7)):
+        raise _InvalidPunch("occurred_at is too old")
+
+    user_id = raw.get("user_id")
+    if user_id is None:
+        user_id = actor_user_id
+    elif not isinstance(user_id, str) or not _is_uuid(user_id):
+        raise _InvalidPunch("user_id must be a UUID string")
+    if user_id != actor_user_id and not is_admin:
+        raise _InvalidPunch("user_id not allowed")
+
+    device_id = raw.get("device_id")
+    if device_id is not None and (not isinstance(device_id, str) or len(device_id) > 64):
+        raise _InvalidPunch("device_id must be a string of at most 64 characters")
+
+    return _Punch(index, user_id, event_id, punch_type, occurred_at, device_id)
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        return str(uuid.UUID(value)) == value.lower()
+    except ValueError:
+        return False
+
+
+def _chunks(items: list):
+    for i in range(0, len(items), QUERY_CHUNK):
+        yield items[i:i + QUERY_CHUNK]
+
+
+def _drop_unknown_users(punches: list, actor_user_id: str, results: list) -> list:
+    others = sorted({p.user_id for p in punches} - {actor_user_id})
+    if not others:
+        return punches
+
+    known = {actor_user_id}
+    for chunk in _chunks(others):
+        known.update(
+            row.user_id for row in db.session.query(Users.user_id).filter(Users.user_id.in_(chunk))
+        )
+
+    kept = []
+    for punch in punches:
+        if punch.user_id in known:
+            kept.append(punch)
+        else:
+            results[punch.index] = _result(punch.event_id, "invalid", "unknown user_id")
+    return kept
+
+
+def _stored_outcomes(punches: list) -> dict:
+    """
+    {(user_id, event_id): result} for events already ingested.
+    """
+
+    wanted = {(p.user_id, p.event_id) for p in punches}
+    stored = {}
+
+    for chunk in _chunks(sorted({p.event_id for p in punches})):
+        rows = db.session.query(
+            PunchEvent.user_id, PunchEvent.event_id, PunchEvent.result
+        ).filter(PunchEvent.event_id.in_(chunk))
+
+        for row in rows:
+            if (row.user_id, row.event_id) in wanted:
+                stored[(row.user_id, row.event_id)] = row.result
+
+    return stored
+
+
+def _apply(punches: list, results: list, *, now: datetime) -> None:
+    """
+    Replays new punches against the locked attendance state of their
+    users and writes the outcome set-based (stored sessions are merged
+    with new ones by time):
+    INSERT new days, UPDATE changed days by primary key, close/insert
+    sessions, INSERT punch_events.
+    """
+
+    users = sorted({p.user_id for p in punches})
+    first_day = min(p.occurred_at for p in punches).date()
+    last_day = max(p.occurred_at for p in punches).date()
+
+    # ------------------------
+    # Current state: open sessions and the touched days, locked
+    # against concurrent clock-in/out for the rest of the transaction
+    # (the day UPDATEs below write absolute values from this read)
+    # ------------------------
+    open_sessions = {}
+    for chunk in _chunks(users):
+        query = AttendanceSession.query.filter(
+            AttendanceSession.user_id.in_(chunk),
+            AttendanceSession.ended_at.is_(None),
+        )
+        for session in lock_rows(query, AttendanceSession):
+            open_sessions[session.user_id] = session
+
+    days = {}
+    by_attendance_id = {}
+    open_ids = [s.attendance_id for s in open_sessions.values()]
+
+    def load(rows):
+        for row in rows:
+            day = {
+                "attendance_id": row.attendance_id,
+                "user_id": row.user_id,
+                "date": row.date,
+                "clock_in": row.clock_in,
+                "clock_out": row.clock_out,
+                "open_since": row.open_since,
+                "worked_seconds": row.worked_seconds or 0,
+                "status": row.status,
+                "dirty": False,
+            }
+            days[(row.user_id, row.date)] = day
+            by_attendance_id[row.attendance_id] = day
+
+    for chunk in _chunks(users):
+        load(lock_rows(Attendance.query.filter(
+            Attendance.user_id.in_(chunk),
+            Attendance.date >= first_day,
+            Attendance.date <= last_day,
+        ), Attendance))
+    for chunk in _chunks(open_ids):
+        load(lock_rows(Attendance.query.filter(Attendance.attendance_id.in_(chunk)), Attendance))
+
+    # ------------------------
+    # Closed sessions from the day before the batch on, so sessions
+    # uploaded late can be merged in between by time
+    # ------------------------
+    spans = {}
+    for chunk in _chunks(users):
+        rows = db.session.query(
+            AttendanceSession.user_id,
+            AttendanceSession.started_at,
+            AttendanceSession.ended_at,
+        ).filter(
+            AttendanceSession.user_id.in_(chunk),
+            AttendanceSession.date >= first_day - timedelta(days=1),
+            AttendanceSession.ended_at.isnot(None),
+        )
+        for row in rows:
+            spans.setdefault(row.user_id, []).append([row.started_at, row.ended_at])
+
+    # ------------------------
+    # Replay per user in time order
+    # ------------------------
+    new_days = []
+    new_sessions = []
+    closed_sessions = []
+    punch_rows = []
+
+    def applied(punch):
+        results[punch.index] = _result(punch.event_id, "applied", None)
+        punch_rows.append({
+            "user_id": punch.user_id,
+            "event_id": punch.event_id,
+            "punch_type": punch.punch_type,
+            "occurred_at": punch.occurred_at,
+            "device_id": punch.device_id,
+            "result": "applied",
+            "reason": None,
+            "received_at": now,
+        })
+
+    def day_for(user_id, at):
+        day = days.get((user_id, at.date()))
+        if day is None:
+            day = {
+                "attendance_id": None,
+                "user_id": user_id,
+                "date": at.date(),
+                "clock_in": at,
+                "clock_out": None,
+                "open_since": None,
+                "worked_seconds": 0,
+                "status": "present",
+                "dirty": False,
+            }
+            days[(user_id, at.date())] = day
+            new_days.append(day)
+        elif day["clock_in"] is None:
+            # Explicit absent row written before the punch arrived
+            day["clock_in"] = at
+            day["status"] = "present"
+        return day
+
+    by_user = {}
+    for punch in punches:
+        by_user.setdefault(punch.user_id, []).append(punch)
+
+    for user_id, user_punches in by_user.items():
+        user_punches.sort(key=lambda p: (p.occurred_at, p.index))
+        user_spans = spans.get(user_id, [])
+
+        current = None
+        stored_session = open_sessions.get(user_id)
+        if stored_session is not None:
+            current = {
+                "session_id": stored_session.session_id,
+                "day": by_attendance_id[stored_session.attendance_id],
+                "started_at": stored_session.started_at,
+                "ended_at": None,
+            }
+            user_spans.append([stored_session.started_at, None])
+
+        i = 0
+        while i < len(user_punches):
+            punch = user_punches[i]
+            i += 1
+            at = punch.occurred_at
+            reason = None
+
+            if punch.punch_type == "clock_in":
+                inside, next_start = _locate(user_spans, at)
+
+                if inside is not None:
+                    reason = "already clocked in" if inside[1] is None else "overlaps an earlier session"
+
+                elif next_start is not None:
+                    # Earlier than a stored session (an offline upload
+                    # arriving late): only a complete session that ends
+                    # before the next one can be merged in
+                    closing = user_punches[i] if i < len(user_punches) else None
+
+                    if closing is None or closing.punch_type != "clock_out":
+                        reason = "earlier session needs its clock_out in the same batch"
+                    elif closing.occurred_at > next_start:
+                        reason = "overlaps a later session"
+                    else:
+                        i += 1
+                        ended = closing.occurred_at
+
+                        day = day_for(user_id, at)
+                        day["clock_in"] = min(day["clock_in"], at)
+                        day["worked_seconds"] += int((ended - at).total_seconds())
+                        if day["open_since"] is None and (day["clock_out"] is None or day["clock_out"] < ended):
+                            day["clock_out"] = ended
+                        day["dirty"] = True
+
+                        new_sessions.append({"session_id": None, "day": day, "started_at": at, "ended_at": ended})
+                        user_spans.append([at, ended])
+
+                        applied(punch)
+                        applied(closing)
+                        continue
+
+                else:
+                    day = day_for(user_id, at)
+                    day["clock_out"] = None
+                    day["open_since"] = at
+                    day["dirty"] = True
+
+                    current = {"session_id": None, "day": day, "started_at": at, "ended_at": None}
+                    new_sessions.append(current)
+                    user_spans.append([at, None])
+
+            else:
+                if current is None:
+                    reason = "not clocked in"
+                elif at < current["started_at"]:
+                    reason = "before clock-in"
+                else:
+                    day = current["day"]
+                    day["worked_seconds"] += int((at - current["started_at"]).total_seconds())
+                    day["clock_out"] = at
+                    day["open_since"] = None
+                    day["dirty"] = True
+
+                    current["ended_at"] = at
+                    if current["session_id"] is not None:
+                        closed_sessions.append(current)
+                    user_spans[:] = [
+                        [start, at if end is None else end] for start, end in user_spans
+                    ]
+                    current = None
+
+            if reason:
+                # Not stored, so a retry after the missing punch arrives
+                # is replayed instead of answered as a duplicate
+                results[punch.index] = _result(punch.event_id, "rejected", reason)
+                continue
+
+            applied(punch)
+
+    # ------------------------
+    # Writes
+    # ------------------------
+    changed = [d for d in by_attendance_id.values() if d["dirty"]]
+
+    # Stored status, as clock-in/out would have set it
+    for day in new_days + changed:
+        day["status"] = classify_status(
+            shift_for_user(day["user_id"]),
+            day=day["date"],
+            clock_in=day["clock_in"],
+            worked_seconds=day["worked_seconds"],
+            closed=day["open_since"] is None,
+        )
+
+    if new_days:
+        ids = db.session.execute(
+            insert(Attendance).returning(Attendance.attendance_id, sort_by_parameter_order=True),
+            [_day_values(day, now, created=True) for day in new_days],
+        ).scalars().all()
+        for day, attendance_id in zip(new_days, ids):
+            day["attendance_id"] = attendance_id
+
+    if changed:
+        db.session.execute(
+            update(Attendance),
+            [{"attendance_id": d["attendance_id"], **_day_values(d, now)} for d in changed],
+        )
+
+    if closed_sessions:
+        db.session.execute(
+            update(AttendanceSession),
+            [
+                {"session_id": s["session_id"], "ended_at": s["ended_at"], "updated_at": now}
+                for s in closed_sessions
+            ],
+        )
+
+    if new_sessions:
+        db.session.execute(insert(AttendanceSession), [
+            {
+                "attendance_id": s["day"]["attendance_id"],
+                "user_id": s["day"]["user_id"],
+                "date": s["day"]["date"],
+                "started_at": s["started_at"],
+                "ended_at": s["ended_at"],
+                "created_at": now,
+                "updated_at": now,
+            }
+            for s in new_sessions
+        ])
+
+    if punch_rows:
+        db.session.execute(insert(PunchEvent), punch_rows)
+
+        enqueue("attendance.punches", {
+            "count": len(punch_rows),
+            "users": sorted({row["user_id"] for row in punch_rows}),
+            "from": min(row["occurred_at"] for row in punch_rows),
+            "to": max(row["occurred_at"] for row in punch_rows),
+        })
+
+
+def _locate(spans: list, at: datetime) -> tuple:
+    """
+    (span containing `at` or None, start of the first span after `at`
+    or None) over [started_at, ended_at] pairs; ended_at None is open.
+    """
+
+    inside = None
+    next_start = None
+    for span in spans:
+        start, end = span
+        if start <= at and (end is None or at < end):
+            inside = span
+        elif start > at and (next_start is None or start < next_start):
+            next_start = start
+    return inside, next_start
+
+
+def _day_values(day: dict, now: datetime, *, created: bool = False) -> dict:
+    values = {
+        "clock_in": day["clock_in"],
+        "clock_out": day["clock_out"],
+        "open_since": day["open_since"],
+        "worked_seconds": day["worked_seconds"],
+        "status": day["status"],
+        "updated_at": now,
+    }
+    if created:
+        values.update(user_id=day["user_id"], date=day["date"], created_at=now)
+    return values
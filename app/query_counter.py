@@ -0,0 +1,65 @@
+import threading
+from contextlib import contextmanager
+from flask import g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+_local = threading.local()
+_installed = False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.query_count = g.get("query_count", 0) + 1
+
+    for statements in getattr(_local, "active", ()):
+        statements.append(statement)
+
+
+def _install_listener() -> None:
+    global _installed
+
+    if not _installed:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        _installed = True
+
+
+@contextmanager
+def count_queries():
+    """
+    Collects SQL statements executed on this thread inside the block.
+    Usage: with count_queries() as statements: ...; len(statements)
+    """
+
+    _install_listener()
+
+    statements = []
+    active = getattr(_local, "active", None)
+    if active is None:
+        active = _local.active = []
+
+    active.append(statements)
+    try:
+        yield statements
+    finally:
+        active.remove(statements)
+
+
+def init_query_counter(app) -> None:
+    """
+    With QUERY_COUNT_HEADER on, every response carries X-Query-Count:
+    the number of SQL statements the request executed.
+    Write endpoints should show one statement for the write itself
+    (plus token verification and the outbox row).
+    """
+
+    if not app.config.get("QUERY_COUNT_HEADER"):
+        return
+
+    _install_listener()
+
+    @app.after_request
+    def add_query_count_header(response):
+        response.headers["X-Query-Count"] = str(g.get("query_count", 0))
+        return response
@@ -0,0 +1,188 @@
+import math
+import threading
+import time
+from functools import wraps
+from flask import current_app, request, jsonify, make_response
+
+
+class MemoryBackend:
+    """
+    Per-process sliding-window counters.
+
+    Each key keeps the count for the current and the previous fixed
+    window; the effective count is weighted by how far the current
+    window has progressed (sliding window counter).
+    """
+
+    # Keys kept before stale entries are swept
+    MAX_KEYS = 100_000
+
+    def __init__(self):
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, window: int) -> tuple[bool, int]:
+        now = time.time()
+        current_start = now - (now % window)
+
+        with self._lock:
+            start, previous, current = self._windows.get(key, (current_start, 0, 0))
+
+            if start != current_start:
+                # Roll forward; anything older than one window is dropped
+                previous = current if current_start - start == window else 0
+                current = 0
+
+            allowed, retry_after = _evaluate(
+                previous, current, limit, window, now - current_start
+            )
+            if allowed:
+                current += 1
+
+            self._windows[key] = (current_start, previous, current)
+
+            if len(self._windows) > self.MAX_KEYS:
+                self._sweep(current_start, window)
+
+        return allowed, retry_after
+
+    def _sweep(self, current_start: float, window: int) -> None:
+        cutoff = current_start - window
+        for key in [k for k, v in self._windows.items() if v[0] < cutoff]:
+            del self._windows[key]
+
+
+class RedisBackend:
+    """
+    Shared sliding-window counters in Redis, for multi-worker setups.
+    Requires the `redis` package.
+    """
+
+    # Check and record in one step, so concurrent requests cannot all
+    # pass the check before any of them is counted.
+    # KEYS: previous, current. ARGV: limit, window, weight of previous.
+    HIT_SCRIPT = """
+    local previous = tonumber(redis.call('GET', KEYS[1]) or '0')
+    local current = tonumber(redis.call('GET', KEYS[2]) or '0')
+    if previous * tonumber(ARGV[3]) + current < tonumber(ARGV[1]) then
+        redis.call('INCR', KEYS[2])
+        redis.call('EXPIRE', KEYS[2], tonumber(ARGV[2]) * 2)
+        return {1, previous, current}
+    end
+    return {0, previous, current}
+    """
+
+    def __init__(self, *, url: str, prefix: str = "ratelimit"):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = prefix
+        self._hit = self._redis.register_script(self.HIT_SCRIPT)
+
+    def hit(self, key: str, limit: int, window: int) -> tuple[bool, int]:
+        now = time.time()
+        current_start = int(now - (now % window))
+        current_key = f"{self._prefix}:{key}:{current_start}"
+        previous_key = f"{self._prefix}:{key}:{current_start - window}"
+        elapsed = now - current_start
+
+        allowed, previous, current = self._hit(
+            keys=[previous_key, current_key],
+            args=[limit, window, repr(1 - elapsed / window)],
+        )
+        if allowed:
+            return True, 0
+
+        _, retry_after = _evaluate(int(previous), int(current), limit, window, elapsed)
+        return False, retry_after
+
+
+def _evaluate(previous: int, current: int, limit: int, window: int, elapsed: float) -> tuple[bool, int]:
+    """
+    Returns (allowed, retry_after_seconds) for a sliding-window count.
+    """
+
+    weight = 1 - (elapsed / window)
+    if previous * weight + current < limit:
+        return True, 0
+
+    if current >= limit or previous == 0:
+        # Blocked until the current window rolls over
+        wait = window - elapsed
+    else:
+        # Blocked until the previous window's weight decays enough
+        wait = window * (1 - (limit - current) / previous) - elapsed
+
+    return False, max(1, math.ceil(wait))
+
+
+def get_rate_limit_backend():
+    """
+    Returns the app-wide counter backend, built from config on first use.
+    """
+
+    backend = current_app.extensions.get("rate_limit_backend")
+    if backend is None:
+        if current_app.config.get("RATE_LIMIT_BACKEND") == "redis":
+            backend = RedisBackend(url=current_app.config["RATE_LIMIT_REDIS_URL"])
+        else:
+            backend = MemoryBackend()
+
+        current_app.extensions["rate_limit_backend"] = backend
+
+    return backend
+
+
+def client_ip() -> str:
+    """
+    Client address. Behind nginx, ProxyFix (TRUSTED_PROXY_COUNT) has
+    already replaced remote_addr with the address the proxy saw; client
+    headers are never trusted directly.
+    """
+
+    return request.remote_addr or "unknown"
+
+
+def rate_limit(scope: str):
+    """
+    Rejects the request with 429 + Retry-After once any limit for
+    `scope` (RATE_LIMITS config) is exhausted. Runs before the view,
+    so throttled requests never reach the DB or bcrypt.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            config = current_app.config
+            limits = config.get("RATE_LIMITS", {}).get(scope)
+
+            if not config.get("RATE_LIMIT_ENABLED", True) or not limits:
+                return view(*args, **kwargs)
+
+            backend = get_rate_limit_backend()
+
+            keys = {"ip": client_ip()}
+            username = request.form.get("username")
+            if username:
+                keys["username"] = username.strip().lower()
+
+            for key_type, (limit, window) in limits.items():
+                value = keys.get(key_type)
+                if value is None:
+                    continue
+
+                allowed, retry_after = backend.hit(
+                    f"{scope}:{key_type}:{value}", limit, window
+                )
+                if not allowed:
+                    response = make_response(
+                        jsonify({"message": "Too many requests"}), 429
+                    )
+                    response.headers["Retry-After"] = str(retry_after)
+                    return response
+
+            return view(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
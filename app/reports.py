@@ -2,6 +2,9 @@ from datetime import datetime, date, timedelta
 from calendar import monthrange
 from sqlalchemy import func, extract
 from models import db, Attendance, LeaveRequests
+from attendance import counts_as_worked, worked_seconds_so_far
+from work_calendar import get_work_calendar, get_user_department
+from singleflight import coalesce
 from exceptions import ReportError
 
 
@@ -28,6 +31,7 @@ LEAVE_TYPE_COLORS = {
 }
 
 
+@coalesce("monthly_report", scope="self")
 def get_monthly_report(*, user_id: str, month: int, year: int) -> dict:
     """
     Returns the full monthly report for a user.
@@ -45,14 +49,16 @@ def get_monthly_report(*, user_id: str, month: int, year: int) -> dict:
         raise ReportError("Invalid year")
 
     try:
+        department = get_user_department(user_id)
+
         attendance = _get_attendance_summary(
-            user_id=user_id, month=month, year=year
+            user_id=user_id, month=month, year=year, department=department
         )
         leaves = _get_leave_summary(
             user_id=user_id, year=year
         )
         hours = _get_working_hours(
-            user_id=user_id, month=month, year=year
+            user_id=user_id, month=month, year=year, department=department
         )
         performance = _get_performance_score(attendance=attendance)
 
@@ -71,7 +77,9 @@ def get_monthly_report(*, user_id: str, month: int, year: int) -> dict:
         raise ReportError("Failed to generate report") from e
 
 
-def _get_attendance_summary(*, user_id: str, month: int, year: int) -> dict:
+def _get_attendance_summary(
+    *, user_id: str, month: int, year: int, department: str | None = None
+) -> dict:
     """
     Calculates attendance summary for a given month.
     """
@@ -83,41 +91,27 @@ def _get_attendance_summary(*, user_id: str, month: int, year: int) -> dict:
     # Only count up to today if the month is current
     end_date = min(last_day, today)
 
-    # Count working days (Mon-Fri)
-    working_days = 0
-    current = first_day
-    while current <= end_date:
-        if current.weekday() < 5:
-            working_days += 1
-        current += timedelta(days=1)
-
-    # Fetch attendance records for the month
-    records = Attendance.query.filter(
-        Attendance.user_id == user_id,
-        Attendance.date >= first_day,
-        Attendance.date <= end_date
-    ).all()
-
-    present_days = 0
-    absent_days = 0
-    late_days = 0
-    half_days = 0
-
-    for record in records:
-        if record.status == "present":
-            present_days += 1
-        elif record.status == "absent":
-            absent_days += 1
-        elif record.status == "late":
-            late_days += 1
-        elif record.status == "half_day":
-            half_days += 1
-
-    # Days with no record on working days count as absent
-    days_with_records = len([
-        r for r in records if r.date.weekday() < 5
-    ])
-    absent_days += max(0, working_days - days_with_records)
+    # Count working days (weekends + holidays excluded)
+    working_days = get_work_calendar().working_days_between(
+        first_day, end_date, department
+    )
+
+    # Status counts for the month. Absent days are explicit rows written
+    # by the nightly attendance job, so this is a plain aggregate.
+    counts = dict(
+        db.session.query(
+            Attendance.status, func.count(Attendance.attendance_id)
+        ).filter(
+            Attendance.user_id == user_id,
+            Attendance.date >= first_day,
+            Attendance.date <= end_date
+        ).group_by(Attendance.status).all()
+    )
+
+    present_days = counts.get("present", 0)
+    absent_days = counts.get("absent", 0)
+    late_days = counts.get("late", 0)
+    half_days = counts.get("half_day", 0)
 
     # Attendance rate: days attended / working days
     attended = present_days + late_days + half_days
@@ -170,7 +164,9 @@ def _get_leave_summary(*, user_id: str, year: int) -> list:
     return result
 
 
-def _get_working_hours(*, user_id: str, month: int, year: int) -> dict:
+def _get_working_hours(
+    *, user_id: str, month: int, year: int, department: str | None = None
+) -> dict:
     """
     Calculates working hour stats for a given month.
     """
@@ -181,12 +177,9 @@ def _get_working_hours(*, user_id: str, month: int, year: int) -> dict:
     end_date = min(last_day, today)
 
     # Expected working days
-    working_days = 0
-    current = first_day
-    while current <= end_date:
-        if current.weekday() < 5:
-            working_days += 1
-        current += timedelta(days=1)
+    working_days = get_work_calendar().working_days_between(
+        first_day, end_date, department
+    )
 
     expected_hours = working_days * 8
 
@@ -197,20 +190,19 @@ def _get_working_hours(*, user_id: str, month: int, year: int) -> dict:
         Attendance.date <= end_date
     ).all()
 
-    total_hours = 0.0
+    # Per-day worked_seconds is maintained at clock-out, so this never
+    # reads individual sessions
+    now = datetime.utcnow()
+    total_seconds = 0
     days_counted = 0
 
     for record in records:
-        if record.clock_in and record.clock_out:
-            diff = (record.clock_out - record.clock_in).total_seconds() / 3600.0
-            total_hours += diff
-            days_counted += 1
-        elif record.clock_in:
-            # Still clocked in, count hours so far
-            diff = (datetime.utcnow() - record.clock_in).total_seconds() / 3600.0
-            total_hours += diff
+        if counts_as_worked(record, today=today):
+            total_seconds += worked_seconds_so_far(record, today=today, now=now)
             days_counted += 1
 
+    total_hours = total_seconds / 3600.0
+
     overtime = max(0.0, total_hours - expected_hours)
     avg_daily = round(total_hours / days_counted, 1) if days_counted > 0 else 0.0
 
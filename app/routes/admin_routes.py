@@ -1,14 +1,22 @@
 from flask import Blueprint, request, jsonify, make_response
+from datetime import date
 
 from auth import (
     authenticate_admin,
     verify_access_token,
     is_admin_user,
-    create_access_token,
-    create_refresh_token,
+    issue_token_pair,
 )
 from client import create_client_with_profile
-from leave import get_all_leave_requests, update_leave_status
+from leave import get_all_leave_requests, update_leave_status, get_leave_calendar
+from attendance import get_live_attendance
+from models import DEPARTMENTS
+from ratelimit import rate_limit
+from singleflight import singleflight_metrics
+from admission import admission_metrics
+from directory import get_directory
+from search import search_employees
+from shifts import list_shifts, upsert_shift
 from exceptions import (
     AuthenticationError,
     MissingCredentials,
@@ -24,6 +32,8 @@ from exceptions import (
     LeaveRequestCreationError,
     LeaveRequestNotFound,
     LeaveAlreadyProcessed,
+    ShiftError,
+    InvalidShiftData,
 )
 
 admin_bp = Blueprint("admin", __name__)
@@ -33,6 +43,7 @@ admin_bp = Blueprint("admin", __name__)
 # ADMIN LOGIN
 # =========================
 @admin_bp.route("/api/admin/login", methods=["POST"])
+@rate_limit("login")
 def admin_login_api():
     try:
         username = request.form.get("username")
@@ -40,8 +51,8 @@ def admin_login_api():
 
         user_id = authenticate_admin(username, password)
 
-        access_token = create_access_token(user_id)
-        refresh_token = create_refresh_token(user_id)
+        # Both tokens in one INSERT, one commit
+        access_token, refresh_token = issue_token_pair(user_id)
 
         response = make_response(jsonify({
             "message": "Login successful",
@@ -266,3 +277,290 @@ def admin_update_leave_status(leave_id):
     # ------------------------
     except Exception:
         return jsonify({"message": "Internal server error"}), 500
+
+
+# =========================
+# ADMIN - LEAVE CALENDAR
+# =========================
+@admin_bp.route("/api/admin/leave-calendar", methods=["GET"])
+def admin_leave_calendar():
+    # ------------------------
+    # Auth: verify token + admin check
+    # ------------------------
+    try:
+        auth_header = request.headers.get("Authorization")
+        admin_user_id = verify_access_token(auth_header)
+
+        if not is_admin_user(admin_user_id):
+            return jsonify({"message": "Forbidden"}), 403
+
+    except (MissingAccessToken, InvalidAccessToken):
+        return jsonify({"message": "Unauthorized"}), 401
+
+    # ------------------------
+    # Input validation
+    # ------------------------
+    today = date.today()
+    department = request.args.get("department")
+    month = request.args.get("month", today.month, type=int)
+    year = request.args.get("year", today.year, type=int)
+
+    if department not in DEPARTMENTS:
+        return jsonify({"message": "Invalid department"}), 400
+
+    if not (1 <= month <= 12):
+        return jsonify({"message": "Invalid month. Must be 1-12"}), 400
+
+    if not (2000 <= year <= 2100):
+        return jsonify({"message": "Invalid year"}), 400
+
+    # ------------------------
+    # Core logic
+    # ------------------------
+    try:
+        calendar = get_leave_calendar(department=department, month=month, year=year)
+
+        return jsonify({
+            "success": True,
+            "calendar": calendar
+        }), 200
+
+    # ------------------------
+    # Expected / domain errors
+    # ------------------------
+    except LeaveRequestCreationError:
+        return jsonify({"message": "Failed to build leave calendar"}), 500
+
+    # ------------------------
+    # Safety net
+    # ------------------------
+    except Exception:
+        return jsonify({"message": "Internal server error"}), 500
+
+# =========================
+# ADMIN - LIVE ATTENDANCE DASHBOARD
+# =========================
+@admin_bp.route("/api/admin/attendance/live", methods=["GET"])
+def admin_live_attendance():
+    # ------------------------
+    # Auth: verify token + admin check
+    # ------------------------
+    try:
+        auth_header = request.headers.get("Authorization")
+        admin_user_id = verify_access_token(auth_header)
+
+        if not is_admin_user(admin_user_id):
+            return jsonify({"message": "Forbidden"}), 403
+
+    except (MissingAccessToken, InvalidAccessToken):
+        return jsonify({"message": "Unauthorized"}), 401
+
+    # ------------------------
+    # Optional filter
+    # ------------------------
+    department = request.args.get("department")
+
+    if department and department not in DEPARTMENTS:
+        return jsonify({"message": "Invalid department"}), 400
+
+    # ------------------------
+    # Core logic
+    # ------------------------
+    try:
+        snapshot = get_live_attendance(department=department)
+
+        return jsonify({
+            "success": True,
+            "live": snapshot
+        }), 200
+
+    # ------------------------
+    # Safety net
+    # ------------------------
+    except Exception:
+        return jsonify({"message": "Internal server error"}), 500
+
+
+# =========================
+# ADMIN - EMPLOYEE SEARCH
+# =========================
+@admin_bp.route("/api/admin/employees/search", methods=["GET"])
+def admin_search_employees():
+    # ------------------------
+    # Auth: verify token + admin check
+    # ------------------------
+    try:
+        auth_header = request.headers.get("Authorization")
+        admin_user_id = verify_access_token(auth_header)
+
+        if not is_admin_user(admin_user_id):
+            return jsonify({"message": "Forbidden"}), 403
+
+    except (MissingAccessToken, InvalidAccessToken):
+        return jsonify({"message": "Unauthorized"}), 401
+
+    # ------------------------
+    # Input validation
+    # ------------------------
+    query = (request.args.get("q") or "").strip()
+    limit = request.args.get("limit", 20, type=int)
+    department = request.args.get("department")
+
+    if not query:
+        return jsonify({"message": "q is required"}), 400
+
+    if not (1 <= limit <= 100):
+        return jsonify({"message": "Invalid limit. Must be 1-100"}), 400
+
+    if department and department not in DEPARTMENTS:
+        return jsonify({"message": "Invalid department"}), 400
+
+    # ------------------------
+    # Core logic
+    # ------------------------
+    try:
+        results = search_employees(query=query, limit=limit, department=department)
+
+        return jsonify({
+            "success": True,
+            "total": len(results),
+            "results": results
+        }), 200
+
+    # ------------------------
+    # Safety net
+    # ------------------------
+    except Exception:
+        return jsonify({"message": "Internal server error"}), 500
+
+# =========================
+# ADMIN - PROCESS METRICS
+# =========================
+@admin_bp.route("/api/admin/metrics", methods=["GET"])
+def admin_metrics():
+    # ------------------------
+    # Auth: verify token + admin check
+    # ------------------------
+    try:
+        auth_header = request.headers.get("Authorization")
+        admin_user_id = verify_access_token(auth_header)
+
+        if not is_admin_user(admin_user_id):
+            return jsonify({"message": "Forbidden"}), 403
+
+    except (MissingAccessToken, InvalidAccessToken):
+        return jsonify({"message": "Unauthorized"}), 401
+
+    # ------------------------
+    # Core logic (this worker process only)
+    # ------------------------
+    try:
+        return jsonify({
+            "success": True,
+            "singleflight": singleflight_metrics(),
+            "directory": get_directory().metrics(),
+            "admission": admission_metrics(),
+        }), 200
+
+    # ------------------------
+    # Safety net
+    # ------------------------
+    except Exception:
+        return jsonify({"message": "Internal server error"}), 500
+
+
+# =========================
+# ADMIN - SHIFTS
+# =========================
+@admin_bp.route("/api/admin/shifts", methods=["GET"])
+def admin_list_shifts():
+    # ------------------------
+    # Auth: verify token + admin check
+    # ------------------------
+    try:
+        auth_header = request.headers.get("Authorization")
+        admin_user_id = verify_access_token(auth_header)
+
+        if not is_admin_user(admin_user_id):
+            return jsonify({"message": "Forbidden"}), 403
+
+    except (MissingAccessToken, InvalidAccessToken):
+        return jsonify({"message": "Unauthorized"}), 401
+
+    # ------------------------
+    # Core logic
+    # ------------------------
+    try:
+        return jsonify({
+            "success": True,
+            "shifts": list_shifts()
+        }), 200
+
+    except Exception:
+        return jsonify({"message": "Internal server error"}), 500
+
+
+@admin_bp.route("/api/admin/shifts", methods=["PUT"])
+def admin_upsert_shift():
+    # ------------------------
+    # Auth: verify token + admin check
+    # ------------------------
+    try:
+        auth_header = request.headers.get("Authorization")
+        admin_user_id = verify_access_token(auth_header)
+
+        if not is_admin_user(admin_user_id):
+            return jsonify({"message": "Forbidden"}), 403
+
+    except (MissingAccessToken, InvalidAccessToken):
+        return jsonify({"message": "Unauthorized"}), 401
+
+    # ------------------------
+    # Input validation
+    # ------------------------
+    data = request.get_json(silent=True)
+
+    if not data:
+        return jsonify({"message": "Invalid JSON body"}), 400
+
+    missing = [f for f in ("name", "start_time") if not data.get(f)]
+
+    if missing:
+        return jsonify({
+            "message": "Missing required fields",
+            "missing_fields": missing
+        }), 400
+
+    # ------------------------
+    # Core logic
+    # ------------------------
+    try:
+        result = upsert_shift(
+            name=data["name"],
+            start_time=data["start_time"],
+            department=data.get("department"),
+            user_id=data.get("user_id"),
+            grace_minutes=data.get("grace_minutes", 10),
+            min_work_minutes=data.get("min_work_minutes", 240),
+        )
+
+        return jsonify({
+            "success": True,
+            "message": "Shift saved successfully",
+            "shift": result
+        }), 200
+
+    # ------------------------
+    # Expected / domain errors
+    # ------------------------
+    except InvalidShiftData as e:
+        return jsonify({"message": str(e)}), 400
+
+    except ShiftError:
+        return jsonify({"message": "Failed to save shift"}), 500
+
+    # ------------------------
+    # Safety net
+    # ------------------------
+    except Exception:
+        return jsonify({"message": "Internal server error"}), 500
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
-from auth import verify_access_token
+from auth import verify_access_token, is_admin_user
 from attendance import clock_in, clock_out, get_today_summary, get_weekly_attendance, get_monthly_stats
+from punches import ingest_punches
 from exceptions import (
     MissingAccessToken,
     InvalidAccessToken,
@@ -8,6 +9,8 @@ from exceptions import (
     AlreadyClockedIn,
     NotClockedIn,
     AlreadyClockedOut,
+    InvalidPunchBatch,
+    PunchBatchConflict,
 )
 
 
@@ -191,3 +194,67 @@ def api_monthly_stats():
 
     except Exception:
         return jsonify({"message": "Internal server error"}), 500
+
+
+# =========================
+# BULK PUNCH INGESTION (offline kiosks/apps)
+# =========================
+@attendance_bp.route("/api/attendance/punches", methods=["POST"])
+def api_ingest_punches():
+    # ------------------------
+    # Auth
+    # ------------------------
+    try:
+        auth_header = request.headers.get("Authorization")
+        user_id = verify_access_token(auth_header)
+
+    except (MissingAccessToken, InvalidAccessToken):
+        return jsonify({"message": "Unauthorized"}), 401
+
+    # ------------------------
+    # Input validation
+    # ------------------------
+    data = request.get_json(silent=True)
+
+    if not data or not isinstance(data.get("events"), list):
+        return jsonify({"message": "Invalid JSON body"}), 400
+
+    events = data["events"]
+
+    # Only look up the role when the batch punches for someone else
+    for_others = any(
+        isinstance(e, dict) and e.get("user_id") not in (None, user_id) for e in events
+    )
+
+    # ------------------------
+    # Core logic
+    # ------------------------
+    try:
+        result = ingest_punches(
+            actor_user_id=user_id,
+            events=events,
+            is_admin=for_others and is_admin_user(user_id),
+        )
+
+        return jsonify({
+            "success": True,
+            **result
+        }), 200
+
+    # ------------------------
+    # Expected / domain errors
+    # ------------------------
+    except InvalidPunchBatch as e:
+        return jsonify({"message": str(e)}), 400
+
+    except PunchBatchConflict:
+        return jsonify({"message": "Conflicting attendance update, retry the batch"}), 409
+
+    except AttendanceError:
+        return jsonify({"message": "Failed to ingest punches"}), 500
+
+    # ------------------------
+    # Safety net
+    # ------------------------
+    except Exception:
+        return jsonify({"message": "Internal server error"}), 500
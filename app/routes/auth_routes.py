@@ -2,11 +2,13 @@ from flask import Blueprint, request, jsonify, make_response
 
 from auth import (
     authenticate_user,
-    create_access_token,
-    create_refresh_token,
-    verify_refresh_token_and_get_user,
-    revoke_refresh_token,        # optional but recommended
+    issue_token_pair,
+    rotate_refresh_token,
+    revoke_family_of_refresh_token,
+    revoke_all_user_tokens,
+    verify_access_token,
 )
+from ratelimit import rate_limit
 from exceptions import (
     AuthenticationError,
     MissingCredentials,
@@ -14,6 +16,8 @@ from exceptions import (
     InactiveUser,
     MissingRefreshToken,
     InvalidRefreshToken,
+    MissingAccessToken,
+    InvalidAccessToken,
 )
 
 auth_bp = Blueprint("auth", __name__)
@@ -23,6 +27,7 @@ auth_bp = Blueprint("auth", __name__)
 # LOGIN
 # =========================
 @auth_bp.route("/api/login", methods=["POST"])
+@rate_limit("login")
 def login_api():
     try:
         username = request.form.get("username")
@@ -30,8 +35,8 @@ def login_api():
 
         user_id = authenticate_user(username, password)
 
-        access_token = create_access_token(user_id)
-        refresh_token = create_refresh_token(user_id)
+        # Both tokens in one INSERT, one commit
+        access_token, refresh_token = issue_token_pair(user_id)
 
         response = make_response(jsonify({
             "message": "Login successful",
@@ -63,21 +68,75 @@ def login_api():
     
 
 @auth_bp.route("/api/refresh", methods=["POST"])
+@rate_limit("refresh")
 def refresh_api():
     try:
         raw_refresh = request.cookies.get("refresh_token")
-        user_id = verify_refresh_token_and_get_user(raw_refresh)
 
-        access_token = create_access_token(user_id)
+        # Old refresh token is revoked, a new pair is issued (rotation)
+        user_id, access_token, refresh_token = rotate_refresh_token(raw_refresh)
 
-        return jsonify({
+        response = make_response(jsonify({
             "access_token": access_token,
             "token_type": "Bearer",
             "expires_in": 900
-        }), 200
+        }), 200)
+
+        response.set_cookie(
+            "refresh_token",
+            refresh_token,
+            httponly=True,
+            secure=False,          # TRUE in production (HTTPS)
+            samesite="Strict",
+            max_age=3 * 24 * 60 * 60
+        )
+
+        return response
 
     except MissingRefreshToken:
         return jsonify({"message": "Unauthorized"}), 401
 
     except InvalidRefreshToken:
+        # Includes RefreshTokenReused (family already revoked)
         return jsonify({"message": "Unauthorized"}), 401
+
+
+# =========================
+# LOGOUT (this login / device family)
+# =========================
+@auth_bp.route("/api/logout", methods=["POST"])
+def logout_api():
+    try:
+        raw_refresh = request.cookies.get("refresh_token")
+        revoke_family_of_refresh_token(raw_refresh)
+
+    except MissingRefreshToken:
+        pass
+
+    response = make_response(jsonify({"message": "Logged out"}), 200)
+    response.delete_cookie("refresh_token", samesite="Strict")
+
+    return response
+
+
+# =========================
+# LOGOUT EVERYWHERE
+# =========================
+@auth_bp.route("/api/logout-all", methods=["POST"])
+def logout_all_api():
+    try:
+        auth_header = request.headers.get("Authorization")
+        user_id = verify_access_token(auth_header)
+
+    except (MissingAccessToken, InvalidAccessToken):
+        return jsonify({"message": "Unauthorized"}), 401
+
+    revoked = revoke_all_user_tokens(user_id)
+
+    response = make_response(jsonify({
+        "message": "Logged out from all sessions",
+        "revoked": revoked
+    }), 200)
+    response.delete_cookie("refresh_token", samesite="Strict")
+
+    return response
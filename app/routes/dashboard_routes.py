@@ -0,0 +1,64 @@
+from flask import Blueprint, request, jsonify
+from auth import verify_access_token
+from dashboard import get_dashboard, DASHBOARD_FIELDS
+from exceptions import (
+    MissingAccessToken,
+    InvalidAccessToken,
+    AttendanceError,
+)
+
+
+dashboard_bp = Blueprint("dashboard", __name__)
+
+
+# =========================
+# APP-OPEN DASHBOARD
+# =========================
+@dashboard_bp.route("/api/dashboard", methods=["GET"])
+def api_dashboard():
+    # ------------------------
+    # Auth
+    # ------------------------
+    try:
+        auth_header = request.headers.get("Authorization")
+        user_id = verify_access_token(auth_header)
+
+    except (MissingAccessToken, InvalidAccessToken):
+        return jsonify({"message": "Unauthorized"}), 401
+
+    # ------------------------
+    # Input validation
+    # ------------------------
+    fields_param = request.args.get("fields")
+    if fields_param:
+        fields = tuple(f.strip() for f in fields_param.split(",") if f.strip())
+        unknown = [f for f in fields if f not in DASHBOARD_FIELDS]
+        if unknown or not fields:
+            return jsonify({
+                "message": f"Invalid fields. Choose from: {', '.join(DASHBOARD_FIELDS)}"
+            }), 400
+    else:
+        fields = DASHBOARD_FIELDS
+
+    # ------------------------
+    # Core logic
+    # ------------------------
+    try:
+        dashboard = get_dashboard(user_id=user_id, fields=fields)
+
+        return jsonify({
+            "success": True,
+            **dashboard
+        }), 200
+
+    # ------------------------
+    # Expected / domain errors
+    # ------------------------
+    except AttendanceError:
+        return jsonify({"message": "Failed to load dashboard"}), 500
+
+    # ------------------------
+    # Safety net
+    # ------------------------
+    except Exception:
+        return jsonify({"message": "Internal server error"}), 500
@@ -0,0 +1,144 @@
+import time
+from datetime import datetime
+from flask import Blueprint, request, jsonify, Response, current_app
+from auth import verify_access_token, is_admin_user, access_token_expires_at
+from events import get_event_broker, format_sse
+from exceptions import (
+    MissingAccessToken,
+    InvalidAccessToken,
+)
+
+
+event_bp = Blueprint("events", __name__)
+
+# Browser EventSource cannot set Authorization; it sends this cookie
+STREAM_COOKIE = "event_stream_token"
+STREAM_PATH = "/api/admin/events"
+
+
+def _bearer_token(auth_header: str | None) -> str | None:
+    if auth_header and auth_header.startswith("Bearer "):
+        return auth_header.split(" ", 1)[1].strip() or None
+    return None
+
+
+# =========================
+# ADMIN - LIVE EVENT STREAM SESSION (cookie for EventSource)
+# =========================
+@event_bp.route(f"{STREAM_PATH}/session", methods=["POST"])
+def admin_event_stream_session():
+    # ------------------------
+    # Auth: verify token + admin check
+    # ------------------------
+    try:
+        auth_header = request.headers.get("Authorization")
+        admin_user_id = verify_access_token(auth_header)
+
+        if not is_admin_user(admin_user_id):
+            return jsonify({"message": "Forbidden"}), 403
+
+    except (MissingAccessToken, InvalidAccessToken):
+        return jsonify({"message": "Unauthorized"}), 401
+
+    # ------------------------
+    # Core logic: the cookie carries the access token, lives no longer
+    # than it and is only sent to the stream endpoint
+    # ------------------------
+    raw_token = _bearer_token(auth_header)
+    expires_at = access_token_expires_at(raw_token)
+    if expires_at is None:
+        return jsonify({"message": "Unauthorized"}), 401
+
+    response = jsonify({"success": True, "expires_at": expires_at})
+    response.set_cookie(
+        STREAM_COOKIE,
+        raw_token,
+        max_age=max(int((expires_at - datetime.utcnow()).total_seconds()), 0),
+        path=STREAM_PATH,
+        secure=current_app.config.get("EVENT_COOKIE_SECURE", True),
+        httponly=True,
+        samesite="Strict",
+    )
+    return response, 200
+
+
+# =========================
+# ADMIN - LIVE EVENT STREAM (SSE)
+# =========================
+@event_bp.route(STREAM_PATH, methods=["GET"])
+def admin_event_stream():
+    # ------------------------
+    # Auth: Authorization header, or the session cookie (EventSource);
+    # re-checked while the stream runs
+    # ------------------------
+    raw_token = _bearer_token(request.headers.get("Authorization")) or request.cookies.get(STREAM_COOKIE)
+
+    try:
+        admin_user_id = verify_access_token(f"Bearer {raw_token}" if raw_token else None)
+
+        if not is_admin_user(admin_user_id):
+            return jsonify({"message": "Forbidden"}), 403
+
+        expires_at = access_token_expires_at(raw_token)
+        if expires_at is None:
+            raise InvalidAccessToken("Invalid access token")
+
+    except (MissingAccessToken, InvalidAccessToken):
+        return jsonify({"message": "Unauthorized"}), 401
+
+    # ------------------------
+    # Optional filter: ?types=leave,attendance
+    # ------------------------
+    types = request.args.get("types")
+    prefixes = tuple(f"{t.strip()}." for t in types.split(",") if t.strip()) if types else None
+
+    app = current_app._get_current_object()
+    heartbeat = app.config.get("EVENT_HEARTBEAT_SECONDS", 15)
+    recheck = app.config.get("EVENT_AUTH_RECHECK_SECONDS", 60)
+    subscription = get_event_broker().subscribe()
+
+    # The generator holds no DB session between checks; the request's
+    # session is released as soon as this view returns.
+    def stream():
+        nonlocal expires_at
+        next_check = time.monotonic() + recheck
+
+        try:
+            yield "retry: 1000\n\n"
+
+            while True:
+                now = time.monotonic()
+                if now >= next_check:
+                    # Logout/revocation ends the stream
+                    with app.app_context():
+                        expires_at = access_token_expires_at(raw_token)
+                    next_check = now + recheck
+
+                if expires_at is None or expires_at <= datetime.utcnow():
+                    # Client refreshes its token, renews the session
+                    # cookie and reconnects
+                    yield "event: auth.expired\ndata: {}\n\n"
+                    return
+
+                event = subscription.get(timeout=min(heartbeat, max(next_check - now, 0.1)))
+
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                if prefixes and not event["type"].startswith(prefixes):
+                    continue
+
+                yield format_sse(event)
+
+        finally:
+            subscription.close()
+
+    return Response(
+        stream(),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
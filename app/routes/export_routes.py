@@ -0,0 +1,79 @@
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from datetime import date
+from auth import verify_access_token, is_admin_user
+from exports import parse_export_filters, stream_export
+from exceptions import (
+    MissingAccessToken,
+    InvalidAccessToken,
+    InvalidExportFilter,
+)
+
+
+export_bp = Blueprint("export", __name__)
+
+EXPORT_MIMETYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+
+def _export_response(kind: str):
+    # ------------------------
+    # Auth: verify token + admin check
+    # ------------------------
+    try:
+        auth_header = request.headers.get("Authorization")
+        admin_user_id = verify_access_token(auth_header)
+
+        if not is_admin_user(admin_user_id):
+            return jsonify({"message": "Forbidden"}), 403
+
+    except (MissingAccessToken, InvalidAccessToken):
+        return jsonify({"message": "Unauthorized"}), 401
+
+    # ------------------------
+    # Input validation
+    # ------------------------
+    fmt = request.args.get("format", "csv")
+
+    try:
+        filters = parse_export_filters(
+            from_date=request.args.get("from"),
+            to_date=request.args.get("to"),
+            department=request.args.get("department"),
+            user_id=request.args.get("user_id"),
+        )
+        chunks = stream_export(kind=kind, fmt=fmt, filters=filters)
+
+    except InvalidExportFilter as e:
+        return jsonify({"message": str(e)}), 400
+
+    # ------------------------
+    # Stream (chunked transfer, no Content-Length)
+    # ------------------------
+    filename = f"{kind}_{date.today().isoformat()}.{fmt}"
+
+    return Response(
+        stream_with_context(chunks),
+        mimetype=EXPORT_MIMETYPES[fmt],
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+# =========================
+# ADMIN - EXPORT ATTENDANCE
+# =========================
+@export_bp.route("/api/admin/export/attendance", methods=["GET"])
+def admin_export_attendance():
+    return _export_response("attendance")
+
+
+# =========================
+# ADMIN - EXPORT LEAVE REQUESTS
+# =========================
+@export_bp.route("/api/admin/export/leave-requests", methods=["GET"])
+def admin_export_leave_requests():
+    return _export_response("leave")
@@ -33,8 +33,8 @@ def get_user_profile_info(user_id: str) -> Optional[Dict]:
             "phone": user_info.phone,
             "employee_id": user_info.employee_id,
             "department": user_info.department,
-            "created_at": user_info.created_at.isoformat() if user_info.created_at else None,
-            "updated_at": user_info.updated_at.isoformat() if user_info.updated_at else None
+            "created_at": user_info.created_at,
+            "updated_at": user_info.updated_at
         }
     except Exception as e:
         print(f"Error fetching user profile info: {e}")
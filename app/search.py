@@ -0,0 +1,288 @@
+import bisect
+import threading
+from flask import current_app
+from directory import get_directory
+
+
+# Ranking, highest first
+SCORE_EXACT_ID = 100      # employee_id or phone equals the query
+SCORE_ID_PREFIX = 80      # employee_id or phone starts with the query
+SCORE_NAME_PREFIX = 60    # full name starts with the query
+SCORE_WORD_PREFIX = 50    # a name word or the email starts with the query
+SCORE_SUBSTRING = 30      # name or email contains the query
+
+MIN_TRIGRAM_QUERY = 3
+# Cap per prefix source (matches that pass the department filter),
+# so one-letter queries stay fast
+MAX_PREFIX_MATCHES = 2000
+# Above this share of changed records, sync rebuilds instead of patching
+REBUILD_FRACTION = 0.1
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _normalize(text: str | None) -> str:
+    return (text or "").strip().lower()
+
+
+def _words(employee) -> list:
+    words = _normalize(employee.name).split()
+    if employee.email:
+        words.append(_normalize(employee.email))
+    return words
+
+
+class EmployeeSearchIndex:
+    """
+    In-process search over the employee directory.
+
+    - Sorted prefix arrays (bisect) for employee_id, phone and name words,
+      so prefix lookups are O(log n + matches).
+    - A trigram index over names and emails for substring matches:
+      candidates are the intersection of the query's trigram postings,
+      then verified against the text.
+
+    The index follows the directory snapshot incrementally. Records are
+    compared by their indexed values: a full directory reload builds new
+    Employee objects for every row, and those with unchanged values are
+    carried over without re-indexing. When more than REBUILD_FRACTION of
+    the records changed, the index is rebuilt on the side and swapped in,
+    so searches are not blocked meanwhile.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()        # readers vs. swaps/patches
+        self._sync_lock = threading.Lock()   # one sync at a time
+        self._source = None
+        self._indexed = {}
+
+        self._ids = []       # sorted (key, user_id) for employee_id and phone
+        self._words = []     # sorted (word, user_id) for name words and email
+        self._trigrams = {}  # trigram -> set(user_id)
+
+    def __len__(self) -> int:
+        return len(self._indexed)
+
+    # --------------------------
+    # Maintenance
+    # --------------------------
+    def sync(self, by_user: dict) -> None:
+        """
+        Brings the index in line with a directory mapping.
+        """
+
+        with self._sync_lock:
+            if by_user is self._source:
+                return
+
+            # Only syncs write _indexed, so it can be diffed unlocked
+            indexed = self._indexed
+            removed = [u for u in indexed if u not in by_user]
+            changed, carried = [], []
+
+            for user_id, employee in by_user.items():
+                current = indexed.get(user_id)
+                if current is employee:
+                    continue
+                if current is not None and self._values(current) == self._values(employee):
+                    carried.append(employee)
+                else:
+                    changed.append(employee)
+
+            if not indexed or len(removed) + len(changed) > len(by_user) * REBUILD_FRACTION:
+                built = self._build(by_user)
+                with self._lock:
+                    self._ids, self._words, self._trigrams, self._indexed = built
+            else:
+                with self._lock:
+                    for user_id in removed:
+                        self._remove(self._indexed.pop(user_id))
+
+                    for employee in changed:
+                        current = self._indexed.get(employee.user_id)
+                        if current is not None:
+                            self._remove(current)
+                        self._add(employee)
+
+                    # Same indexed values; keep the newer object for results
+                    for employee in carried:
+                        self._indexed[employee.user_id] = employee
+
+            self._source = by_user
+
+    def _build(self, by_user: dict) -> tuple:
+        ids, words, trigrams = [], [], {}
+
+        for user_id, employee in by_user.items():
+            for key in self._id_keys(employee):
+                ids.append((key, user_id))
+            for word in _words(employee):
+                words.append((word, user_id))
+            for gram in self._grams(employee):
+                trigrams.setdefault(gram, set()).add(user_id)
+
+        ids.sort()
+        words.sort()
+
+        return ids, words, trigrams, dict(by_user)
+
+    def _add(self, employee) -> None:
+        user_id = employee.user_id
+
+        for key in self._id_keys(employee):
+            bisect.insort(self._ids, (key, user_id))
+        for word in _words(employee):
+            bisect.insort(self._words, (word, user_id))
+        for gram in self._grams(employee):
+            self._trigrams.setdefault(gram, set()).add(user_id)
+
+        self._indexed[user_id] = employee
+
+    def _remove(self, employee) -> None:
+        user_id = employee.user_id
+
+        for array, keys in ((self._ids, self._id_keys(employee)), (self._words, _words(employee))):
+            for key in keys:
+                i = bisect.bisect_left(array, (key, user_id))
+                if i < len(array) and array[i] == (key, user_id):
+                    del array[i]
+
+        for gram in self._grams(employee):
+            postings = self._trigrams.get(gram)
+            if postings is not None:
+                postings.discard(user_id)
+                if not postings:
+                    del self._trigrams[gram]
+
+    @staticmethod
+    def _values(employee) -> tuple:
+        """Everything the index keys on or filters by."""
+        return (employee.name, employee.email, employee.employee_id, employee.phone, employee.department)
+
+    @staticmethod
+    def _id_keys(employee) -> list:
+        return [_normalize(k) for k in (employee.employee_id, employee.phone) if k]
+
+    @staticmethod
+    def _grams(employee) -> set:
+        return _trigrams(_normalize(employee.name)) | _trigrams(_normalize(employee.email))
+
+    # --------------------------
+    # Query
+    # --------------------------
+    def search(self, query: str, *, limit: int = 20, department: str | None = None) -> list:
+        """
+        Returns up to `limit` (score, Employee) pairs, best first.
+        """
+
+        q = _normalize(query)
+        if not q:
+            return []
+
+        with self._lock:
+            indexed = self._indexed
+            scores = {}
+
+            def keep(user_id):
+                return not department or indexed[user_id].department == department
+
+            def bump(user_id, score):
+                if not keep(user_id):
+                    return
+                if score > scores.get(user_id, 0):
+                    scores[user_id] = score
+
+            for key, user_id in self._prefix(self._ids, q, keep):
+                bump(user_id, SCORE_EXACT_ID if key == q else SCORE_ID_PREFIX)
+
+            for _, user_id in self._prefix(self._words, q, keep):
+                bump(user_id, SCORE_WORD_PREFIX)
+
+            # Substring hits rank below every prefix hit, so they are
+            # only needed when prefixes did not fill the page
+            if len(scores) < limit and len(q) >= MIN_TRIGRAM_QUERY:
+                for user_id in self._substring_candidates(q):
+                    bump(user_id, SCORE_SUBSTRING)
+
+            results = []
+            for user_id, score in scores.items():
+                employee = indexed[user_id]
+                if score < SCORE_NAME_PREFIX and _normalize(employee.name).startswith(q):
+                    score = SCORE_NAME_PREFIX
+                results.append((score, employee))
+
+        results.sort(key=lambda r: (-r[0], r[1].name))
+        return results[:limit]
+
+    @staticmethod
+    def _prefix(array: list, q: str, keep):
+        # The cap counts kept entries only: filtering after it would
+        # let other departments use up a department's matches
+        i = bisect.bisect_left(array, (q, ""))
+        matched = 0
+        while i < len(array) and matched < MAX_PREFIX_MATCHES and array[i][0].startswith(q):
+            if keep(array[i][1]):
+                matched += 1
+                yield array[i]
+            i += 1
+
+    def _substring_candidates(self, q: str) -> set:
+        postings = []
+        for gram in _trigrams(q):
+            found = self._trigrams.get(gram)
+            if not found:
+                return set()
+            postings.append(found)
+
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for other in postings[1:]:
+            candidates &= other
+            if not candidates:
+                return candidates
+
+        # Trigram hits can be false positives; confirm the substring
+        return {
+            user_id for user_id in candidates
+            if q in _normalize(self._indexed[user_id].name)
+            or q in _normalize(self._indexed[user_id].email)
+        }
+
+
+def get_search_index() -> EmployeeSearchIndex:
+    """
+    Returns the app-wide search index, synced with the directory.
+    """
+
+    index = current_app.extensions.get("employee_search")
+    if index is None:
+        index = EmployeeSearchIndex()
+        current_app.extensions["employee_search"] = index
+
+    index.sync(get_directory().by_user_id())
+    return index
+
+
+def search_employees(*, query: str, limit: int = 20, department: str | None = None) -> list:
+    """
+    Ranked employee search by name, employee_id, email or phone.
+    Returns result dicts, best first.
+    """
+
+    return [
+        {
+            "user_id": employee.user_id,
+            "name": employee.name,
+            "employee_id": employee.employee_id,
+            "department": employee.department,
+            "designation": employee.designation,
+            "email": employee.email,
+            "phone": employee.phone,
+            "score": score,
+        }
+        for score, employee in get_search_index().search(
+            query, limit=limit, department=department
+        )
+    ]
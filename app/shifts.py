@@ -0,0 +1,225 @@
+from datetime import date, datetime, time, timedelta
+from flask import current_app
+from sqlalchemy import case, literal
+from models import db, Attendance, Shift, Users, DEPARTMENTS
+from cache import TTLCache
+from directory import get_directory
+from exceptions import ShiftError, InvalidShiftData
+
+
+class ShiftRule:
+    """
+    Classification rule for one shift:
+    - 'late' when the day's first clock-in is after start + grace, in
+      whole minutes (09:10:59 is on time for 09:00 + 10)
+    - 'half_day' when the day is closed with less than min_work_minutes
+      worked (takes precedence over 'late')
+    - otherwise 'present'
+    """
+
+    __slots__ = ("shift_id", "name", "department", "user_id", "start_time", "grace_minutes", "min_work_minutes")
+
+    def __init__(self, shift_id, name, department, user_id, start_time, grace_minutes, min_work_minutes):
+        self.shift_id = shift_id
+        self.name = name
+        self.department = department
+        self.user_id = user_id
+        self.start_time = start_time
+        self.grace_minutes = grace_minutes
+        self.min_work_minutes = min_work_minutes
+
+    @property
+    def min_work_seconds(self) -> int:
+        return self.min_work_minutes * 60
+
+    @property
+    def late_after_minute(self) -> int:
+        """Minute of the day after which a first clock-in is late."""
+        return self.start_time.hour * 60 + self.start_time.minute + self.grace_minutes
+
+    def late_from(self, day: date) -> datetime:
+        """
+        Earliest clock-in on `day` that is late: the start of the minute
+        after late_after_minute, matching the minute-of-day comparison
+        of the nightly reclassification.
+        """
+        return datetime.combine(day, time()) + timedelta(minutes=self.late_after_minute + 1)
+
+    def classify(self, *, day: date, clock_in: datetime, worked_seconds: int, closed: bool) -> str:
+        if closed and worked_seconds < self.min_work_seconds:
+            return "half_day"
+        if clock_in >= self.late_from(day):
+            return "late"
+        return "present"
+
+    def status_case(self, *, day: date, worked_seconds, closed: bool, clock_in=None):
+        """
+        The same rule as a SQL CASE over today's Attendance row, for
+        single-statement clock-in/out UPDATEs. `worked_seconds` and
+        `clock_in` (default: the stored column) are post-update values.
+        """
+
+        if clock_in is None:
+            clock_in = Attendance.clock_in
+
+        whens = []
+        if closed:
+            whens.append((worked_seconds < self.min_work_seconds, "half_day"))
+        whens.append((clock_in >= self.late_from(day), "late"))
+        return case(*whens, else_="present")
+
+    def to_dict(self) -> dict:
+        return {
+            "shift_id": self.shift_id,
+            "name": self.name,
+            "department": self.department,
+            "user_id": self.user_id,
+            "start_time": self.start_time.strftime("%H:%M"),
+            "grace_minutes": self.grace_minutes,
+            "min_work_minutes": self.min_work_minutes,
+        }
+
+
+_COLUMNS = [getattr(Shift, name) for name in ShiftRule.__slots__]
+
+# One snapshot of the (small) shifts table per worker
+_shift_cache = TTLCache(ttl_seconds=60, max_entries=1)
+
+
+def load_shift_rules() -> tuple[dict, dict]:
+    """
+    Reads the shifts table.
+    Returns ({user_id: ShiftRule}, {department: ShiftRule}).
+    """
+
+    by_user, by_department = {}, {}
+    for row in db.session.query(*_COLUMNS):
+        rule = ShiftRule(*row)
+        if rule.user_id is not None:
+            by_user[rule.user_id] = rule
+        else:
+            by_department[rule.department] = rule
+
+    return by_user, by_department
+
+
+def shift_for_user(user_id: str, department: str | None = None) -> ShiftRule | None:
+    """
+    Returns the shift that applies to a user (their own, else their
+    department's), or None when no shift is defined.
+    Served from a per-worker snapshot; no query on a cache hit.
+    """
+
+    ttl = current_app.config.get("SHIFT_CACHE_TTL_SECONDS", 60)
+    by_user, by_department = _shift_cache.get_or_set("rules", load_shift_rules, ttl_seconds=ttl)
+
+    rule = by_user.get(user_id)
+    if rule is not None:
+        return rule
+
+    if department is None:
+        employee = get_directory().get(user_id)
+        department = employee.department if employee else None
+
+    return by_department.get(department)
+
+
+def classify_status(shift: ShiftRule | None, *, day: date, clock_in: datetime | None, worked_seconds: int, closed: bool) -> str:
+    """
+    Status for a worked day; 'present' when no shift applies.
+    """
+
+    if shift is None or clock_in is None:
+        return "present"
+    return shift.classify(day=day, clock_in=clock_in, worked_seconds=worked_seconds, closed=closed)
+
+
+def status_value(shift: ShiftRule | None, *, day: date, worked_seconds, closed: bool, clock_in=None):
+    """
+    SQL value for Attendance.status in a clock-in/out UPDATE.
+    """
+
+    if shift is None:
+        return literal("present")
+    return shift.status_case(day=day, worked_seconds=worked_seconds, closed=closed, clock_in=clock_in)
+
+
+def list_shifts() -> list:
+    """
+    Returns every shift definition, department shifts first.
+    """
+
+    by_user, by_department = load_shift_rules()
+    rules = sorted(by_department.values(), key=lambda r: r.department)
+    rules += sorted(by_user.values(), key=lambda r: r.name)
+    return [rule.to_dict() for rule in rules]
+
+
+def upsert_shift(
+    *,
+    name: str,
+    start_time: str,
+    department: str | None = None,
+    user_id: str | None = None,
+    grace_minutes: int = 10,
+    min_work_minutes: int = 240,
+) -> dict:
+    """
+    Creates or replaces the shift for a department or an employee.
+    History is not reclassified; run `flask reclassify-attendance`.
+    Returns shift dict.
+    Raises ShiftError subclasses on failure.
+    """
+
+    # ------------------------
+    # Basic validation
+    # ------------------------
+    if not name:
+        raise InvalidShiftData("Missing required field: name")
+
+    if bool(department) == bool(user_id):
+        raise InvalidShiftData("Give exactly one of department or user_id")
+
+    if department and department not in DEPARTMENTS:
+        raise InvalidShiftData("Invalid department")
+
+    try:
+        parsed_start = datetime.strptime(start_time or "", "%H:%M").time()
+    except ValueError:
+        raise InvalidShiftData("Invalid start_time. Use HH:MM (UTC)")
+
+    if not isinstance(grace_minutes, int) or not 0 <= grace_minutes <= 240:
+        raise InvalidShiftData("grace_minutes must be between 0 and 240")
+
+    if not isinstance(min_work_minutes, int) or not 0 <= min_work_minutes <= 1440:
+        raise InvalidShiftData("min_work_minutes must be between 0 and 1440")
+
+    try:
+        if user_id and db.session.get(Users, user_id) is None:
+            raise InvalidShiftData("Unknown user_id")
+
+        if department:
+            shift = Shift.query.filter_by(department=department).first()
+        else:
+            shift = Shift.query.filter_by(user_id=user_id).first()
+
+        if shift is None:
+            shift = Shift(department=department, user_id=user_id)
+            db.session.add(shift)
+
+        shift.name = name
+        shift.start_time = parsed_start
+        shift.grace_minutes = grace_minutes
+        shift.min_work_minutes = min_work_minutes
+        db.session.commit()
+
+        _shift_cache.delete("rules")
+
+        return ShiftRule(*(getattr(shift, c) for c in ShiftRule.__slots__)).to_dict()
+
+    except InvalidShiftData:
+        db.session.rollback()
+        raise
+    except Exception as e:
+        db.session.rollback()
+        raise ShiftError("Failed to save shift") from e
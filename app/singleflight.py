@@ -0,0 +1,127 @@
+import threading
+import time
+from functools import wraps
+from flask import current_app, has_app_context
+
+
+# Followers stop waiting after this long and run the computation
+# themselves, so a hung leader cannot hold every caller with it
+DEFAULT_WAIT_SECONDS = 30.0
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Per-process request coalescing: concurrent callers with the same key
+    wait for one in-flight computation and share its result (or error).
+    Nothing is cached once the computation finishes.
+    Shared results must be treated as read-only.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+        self.timed_out = 0
+        self.wait_seconds = 0.0
+
+    def do(self, key, compute, *, wait_seconds: float = DEFAULT_WAIT_SECONDS):
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            started = time.monotonic()
+            finished = call.done.wait(wait_seconds)
+
+            with self._lock:
+                self.wait_seconds += time.monotonic() - started
+                if not finished:
+                    self.timed_out += 1
+
+            if not finished:
+                # Leader is stuck: compute uncoalesced rather than hang
+                return compute()
+
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = compute()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "timed_out": self.timed_out,
+                "in_flight": len(self._calls),
+                "avg_wait_ms": round(self.wait_seconds / self.coalesced * 1000, 2) if self.coalesced else 0.0,
+            }
+
+
+# name -> SingleFlight, for /api/admin/metrics
+_flights = {}
+
+
+def coalesce(name: str, *, scope: str):
+    """
+    Decorator coalescing concurrent calls with equal arguments.
+    `scope` names the authorization scope the arguments are valid in
+    (e.g. "self" for a user's own data, "admin" for admin-wide views)
+    and is part of the key, so results never cross scopes.
+    Followers wait at most SINGLEFLIGHT_WAIT_SECONDS for the leader.
+    """
+
+    flight = _flights.setdefault(name, SingleFlight(name))
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (scope, args, tuple(sorted(kwargs.items())))
+            wait_seconds = (
+                current_app.config.get("SINGLEFLIGHT_WAIT_SECONDS", DEFAULT_WAIT_SECONDS)
+                if has_app_context() else DEFAULT_WAIT_SECONDS
+            )
+            return flight.do(key, lambda: fn(*args, **kwargs), wait_seconds=wait_seconds)
+
+        return wrapper
+
+    return decorator
+
+
+def singleflight_metrics() -> dict:
+    """
+    Returns {name: counters} for every coalesced function.
+    """
+
+    return {name: flight.metrics() for name, flight in _flights.items()}
@@ -0,0 +1,294 @@
+import json
+import os
+import time
+from datetime import date, datetime
+from sqlalchemy import func, and_, or_
+from models import db, Attendance, LeaveRequests, UsersInfo
+from exceptions import SnapshotError
+
+
+# Rows per keyset page; each page is a short indexed range query
+SNAPSHOT_BATCH_SIZE = 5000
+
+WATERMARK_FILE = "_watermarks.json"
+# Rows per written partition, to notice deletes and moved rows
+MANIFEST_FILE = "_partitions.json"
+
+
+# table name -> (model, primary key, partition column)
+SNAPSHOT_TABLES = {
+    "attendance": (Attendance, "attendance_id", "date"),
+    "leave_requests": (LeaveRequests, "leave_id", "from_date"),
+    "users_info": (UsersInfo, "user_id", "created_at"),
+}
+
+
+def export_snapshots(*, out_dir: str, tables=None, full: bool = False) -> list:
+    """
+    Writes columnar Parquet snapshots partitioned by year/month:
+        <out_dir>/<table>/year=YYYY/month=MM/part-0.parquet
+
+    Incremental by default: partitions containing rows with updated_at
+    at or after the stored watermark are rewritten, and so are those
+    whose row count no longer matches what was last written (deleted
+    rows, rows moved to another month); emptied ones are removed.
+    Returns per-table stats.
+    Raises SnapshotError on failure.
+    """
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise SnapshotError("pyarrow is required for snapshot exports") from e
+
+    tables = tables or list(SNAPSHOT_TABLES)
+    unknown = [t for t in tables if t not in SNAPSHOT_TABLES]
+    if unknown:
+        raise SnapshotError(f"Unknown tables: {', '.join(unknown)}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    watermarks = _load_watermarks(out_dir)
+    manifest = _load_json(out_dir, MANIFEST_FILE)
+
+    results = []
+    for table in tables:
+        started = time.perf_counter()
+
+        try:
+            written = manifest.setdefault(table, {})
+            stats = _export_table(
+                table=table,
+                out_dir=out_dir,
+                since=None if full else _parse_watermark(watermarks.get(table)),
+                written=written,
+            )
+        except Exception as e:
+            raise SnapshotError(f"Failed to export {table}") from e
+        finally:
+            # Release the connection between tables
+            db.session.rollback()
+
+        _save_json(out_dir, MANIFEST_FILE, manifest)
+        if stats["watermark"]:
+            watermarks[table] = stats["watermark"]
+            _save_watermarks(out_dir, watermarks)
+
+        stats["seconds"] = round(time.perf_counter() - started, 2)
+        results.append(stats)
+
+    return results
+
+
+def _export_table(*, table: str, out_dir: str, since: datetime | None, written: dict) -> dict:
+    """
+    Rewrites every year/month partition touched since the watermark or
+    whose row count differs from `written` ({"YYYY-MM": rows}, updated
+    in place).
+    """
+
+    model, _, partition_name = SNAPSHOT_TABLES[table]
+    partition_col = getattr(model, partition_name)
+
+    # Read the new watermark first so rows updated during the export
+    # are picked up again next run
+    new_watermark = db.session.query(func.max(model.updated_at)).scalar()
+
+    counts = _partition_counts(partition_col)
+    months = _changed_months(
+        model=model, partition_col=partition_col, since=since, counts=counts, written=written
+    )
+
+    rows = 0
+    for year, month in months:
+        written_rows = _write_partition(
+            table=table, out_dir=out_dir, year=year, month=month
+        )
+        rows += written_rows
+
+        key = f"{year}-{month:02d}"
+        if written_rows:
+            written[key] = written_rows
+        else:
+            written.pop(key, None)
+
+    return {
+        "table": table,
+        "partitions": len(months),
+        "rows": rows,
+        "watermark": new_watermark.isoformat() if new_watermark else None,
+    }
+
+
+def _partition_counts(partition_col) -> dict:
+    """
+    {(year, month): rows} currently in the table, one GROUP BY.
+    """
+
+    year = func.extract("year", partition_col)
+    month = func.extract("month", partition_col)
+
+    return {
+        (int(y), int(m)): n
+        for y, m, n in db.session.query(year, month, func.count()).group_by(year, month)
+        if y is not None
+    }
+
+
+def _changed_months(*, model, partition_col, since: datetime | None, counts: dict, written: dict) -> list:
+    """
+    Returns sorted (year, month) partitions that need rewriting.
+    """
+
+    previous = {tuple(int(p) for p in key.split("-")): n for key, n in written.items()}
+
+    if since is None:
+        months = set(counts) | set(previous)
+        if counts:
+            months.update(_month_range(date(*min(counts), 1), date(*max(counts), 1)))
+        return sorted(months)
+
+    values = db.session.query(partition_col).filter(
+        model.updated_at >= since
+    ).distinct().all()
+
+    months = {(v.year, v.month) for (v,) in values}
+
+    # Deletes and rows moved to another month leave no updated_at
+    # behind, but change the count
+    months.update(
+        m for m in set(counts) | set(previous)
+        if counts.get(m, 0) != previous.get(m, 0)
+    )
+
+    return sorted(months)
+
+
+def _month_range(low, high) -> list:
+    if low is None or high is None:
+        return []
+
+    months = []
+    year, month = low.year, low.month
+    while (year, month) <= (high.year, high.month):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    return months
+
+
+def _write_partition(*, table: str, out_dir: str, year: int, month: int) -> int:
+    """
+    Streams one month of rows into a Parquet file via keyset pages.
+    The file is written to a temp path and swapped in atomically.
+    Returns number of rows written.
+    """
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    model, pk_name, partition_name = SNAPSHOT_TABLES[table]
+    columns = [c for c in model.__table__.columns]
+    schema = pa.schema([(c.name, _arrow_type(c.type)) for c in columns])
+
+    pk = getattr(model, pk_name)
+    partition_col = getattr(model, partition_name)
+
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+
+    part_dir = os.path.join(out_dir, table, f"year={year}", f"month={month:02d}")
+    os.makedirs(part_dir, exist_ok=True)
+    final_path = os.path.join(part_dir, "part-0.parquet")
+    tmp_path = final_path + ".tmp"
+
+    rows = 0
+    last = None
+
+    with pq.ParquetWriter(tmp_path, schema, compression="zstd") as writer:
+        while True:
+            query = db.session.query(
+                *[getattr(model, c.key) for c in columns]
+            ).filter(
+                partition_col >= start,
+                partition_col < end,
+            )
+
+            if last is not None:
+                query = query.filter(or_(
+                    partition_col > last[0],
+                    and_(partition_col == last[0], pk > last[1]),
+                ))
+
+            page = query.order_by(partition_col, pk).limit(SNAPSHOT_BATCH_SIZE).all()
+            if not page:
+                break
+
+            data = {c.name: [row[i] for row in page] for i, c in enumerate(columns)}
+            writer.write_batch(pa.RecordBatch.from_pydict(data, schema=schema))
+
+            rows += len(page)
+            last = (
+                getattr(page[-1], partition_name),
+                getattr(page[-1], pk_name),
+            )
+
+            if len(page) < SNAPSHOT_BATCH_SIZE:
+                break
+
+    if rows:
+        os.replace(tmp_path, final_path)
+    else:
+        # Partition emptied since the last export
+        os.remove(tmp_path)
+        if os.path.exists(final_path):
+            os.remove(final_path)
+
+    return rows
+
+
+def _arrow_type(sql_type):
+    import pyarrow as pa
+
+    python_type = sql_type.python_type
+
+    if python_type is bool:
+        return pa.bool_()
+    if python_type is int:
+        return pa.int64()
+    if python_type is datetime:
+        return pa.timestamp("us")
+    if python_type is date:
+        return pa.date32()
+
+    return pa.string()
+
+
+def _load_watermarks(out_dir: str) -> dict:
+    return _load_json(out_dir, WATERMARK_FILE)
+
+
+def _save_watermarks(out_dir: str, watermarks: dict) -> None:
+    _save_json(out_dir, WATERMARK_FILE, watermarks)
+
+
+def _load_json(out_dir: str, name: str) -> dict:
+    path = os.path.join(out_dir, name)
+    if not os.path.exists(path):
+        return {}
+
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def _save_json(out_dir: str, name: str, data: dict) -> None:
+    path = os.path.join(out_dir, name)
+    tmp_path = path + ".tmp"
+
+    with open(tmp_path, "w") as fh:
+        json.dump(data, fh, indent=2, sort_keys=True)
+
+    os.replace(tmp_path, path)
+
+
+def _parse_watermark(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
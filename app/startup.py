@@ -0,0 +1,103 @@
+import os
+import re
+import subprocess
+import sys
+import time
+from datetime import date
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+from models import db, DEPARTMENTS
+from work_calendar import get_work_calendar
+from directory import get_directory
+from search import get_search_index
+
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile_imports(*, module: str = "app") -> dict:
+    """
+    Imports `module` in a fresh interpreter with `-X importtime`.
+    Returns {"total_ms", "modules": [(name, self_ms, cumulative_ms, depth)]}
+    with modules sorted by self time, slowest first.
+    Raises RuntimeError if the import fails.
+    """
+
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=app_dir,
+        capture_output=True,
+        text=True,
+    )
+
+    if proc.returncode != 0:
+        errors = [l for l in proc.stderr.splitlines() if not _IMPORT_LINE.match(l)]
+        raise RuntimeError(f"import {module} failed: {(errors or ['no output'])[-1]}")
+
+    modules = []
+    total_us = 0
+
+    for line in proc.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if not match:
+            continue
+
+        self_us, cumulative_us = int(match.group(1)), int(match.group(2))
+        depth = len(match.group(3)) // 2
+        name = match.group(4)
+
+        modules.append((name, self_us / 1000, cumulative_us / 1000, depth))
+        if depth == 0 and name == module:
+            total_us = cumulative_us
+
+    modules.sort(key=lambda m: m[1], reverse=True)
+
+    return {"total_ms": total_us / 1000, "modules": modules}
+
+
+def warm_up() -> dict:
+    """
+    Prepares a freshly started worker before it takes traffic:
+    opens pooled DB connections, configures ORM mappers, builds the
+    work calendar tables, loads the employee directory and builds the
+    search index over it. Best effort: failures are logged, not raised.
+    Returns what was warmed and how long it took.
+    """
+
+    started = time.perf_counter()
+    stats = {"connections": 0, "calendar_primed": False, "employees": 0, "search_indexed": 0}
+
+    try:
+        configure_mappers()
+
+        connections = []
+        try:
+            for _ in range(current_app.config.get("WARM_UP_CONNECTIONS", 4)):
+                connection = db.engine.connect()
+                connection.execute(text("SELECT 1"))
+                connections.append(connection)
+        finally:
+            # Back to the pool, still open
+            for connection in connections:
+                connection.close()
+        stats["connections"] = len(connections)
+
+        calendar = get_work_calendar()
+        year = date.today().year
+        for department in (None, *DEPARTMENTS):
+            calendar.working_days_between(date(year, 1, 1), date(year, 12, 31), department)
+        stats["calendar_primed"] = True
+
+        directory = get_directory()
+        directory.refresh(full=True)
+        stats["employees"] = len(directory)
+
+        stats["search_indexed"] = len(get_search_index())
+
+    except Exception as e:
+        current_app.logger.warning(f"Warm-up incomplete: {e}")
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return stats
@@ -0,0 +1,56 @@
+"""
+Shared test setup: the app on an in-memory SQLite database.
+Import this before the app modules.
+Run from app/: python -m unittest discover -s tests -t .
+"""
+
+import unittest
+import uuid
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.compiler import compiles
+from config import Config
+
+Config.SQLALCHEMY_DATABASE_URI = "sqlite://"
+Config.ADMISSION_ENABLED = False
+
+
+# SQLite only autoincrements INTEGER PRIMARY KEY columns
+@compiles(BigInteger, "sqlite")
+def _sqlite_big_integer(type_, compiler, **kw):
+    return "INTEGER"
+
+
+from app import app  # noqa: E402
+from models import db, Users, UsersInfo  # noqa: E402
+from shifts import _shift_cache  # noqa: E402
+
+
+class AppTestCase(unittest.TestCase):
+    """Fresh schema and app context per test."""
+
+    def setUp(self):
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        _shift_cache.delete("rules")
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def add_user(self, name: str, department: str = "qa") -> str:
+        user_id = str(uuid.uuid4())
+        db.session.add(Users(user_id=user_id, role="client", name=name, is_active=True))
+        db.session.add(UsersInfo(
+            user_id=user_id,
+            name=name.title(),
+            email=f"{name}@example.com",
+            department=department,
+            designation="developer",
+            phone="0300" + str(uuid.UUID(user_id).int)[:7],
+            employee_id=f"EMP-{name}",
+            gender="female",
+        ))
+        db.session.commit()
+        return user_id
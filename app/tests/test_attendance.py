@@ -0,0 +1,44 @@
+import uuid
+from datetime import date, datetime
+from sqlalchemy import text
+from tests.support import AppTestCase, db
+from models import Attendance, AttendanceSession
+from attendance import clock_in
+from exceptions import AttendanceError, AlreadyClockedIn
+
+
+class ClockInTests(AppTestCase):
+
+    def test_second_clock_in_is_rejected(self):
+        user_id = self.add_user("alice")
+        clock_in(user_id=user_id)
+
+        with self.assertRaises(AlreadyClockedIn):
+            clock_in(user_id=user_id)
+
+    def test_clock_in_claims_absent_row(self):
+        user_id = self.add_user("alice")
+        now = datetime.utcnow()
+        db.session.add(Attendance(
+            user_id=user_id, date=date.today(), status="absent",
+            worked_seconds=0, created_at=now, updated_at=now,
+        ))
+        db.session.commit()
+
+        result = clock_in(user_id=user_id)
+
+        self.assertEqual(result["status"], "present")
+        self.assertIsNotNone(result["clock_in"])
+        db.session.expire_all()
+        self.assertEqual(Attendance.query.filter_by(user_id=user_id).count(), 1)
+        self.assertEqual(AttendanceSession.query.filter_by(user_id=user_id, ended_at=None).count(), 1)
+
+    def test_other_integrity_errors_are_not_already_clocked_in(self):
+        db.session.execute(text("PRAGMA foreign_keys=ON"))
+
+        # FK violation: no such user
+        with self.assertRaises(AttendanceError) as raised:
+            clock_in(user_id=str(uuid.uuid4()))
+
+        self.assertNotIsInstance(raised.exception, AlreadyClockedIn)
+        db.session.execute(text("PRAGMA foreign_keys=OFF"))
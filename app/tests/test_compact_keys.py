@@ -0,0 +1,60 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+import compact_keys
+
+
+class FakeInspector:
+    """Reflection results as the MSSQL dialect reports them."""
+
+    INDEXES = {
+        "attendance_sessions": [{
+            "name": "uq_attendance_sessions_open",
+            "unique": True,
+            "column_names": ["user_id"],
+            "dialect_options": {"mssql_include": [], "mssql_clustered": False, "mssql_where": "([ended_at] IS NULL)"},
+        }],
+        "attendance": [{
+            "name": "ix_attendance_user_date_hours",
+            "unique": False,
+            "column_names": ["user_id", "date"],
+            "dialect_options": {"mssql_include": ["status", "clock_in"], "mssql_clustered": False},
+        }],
+    }
+
+    def get_foreign_keys(self, table):
+        return []
+
+    def get_pk_constraint(self, table):
+        return {"name": None, "constrained_columns": []}
+
+    def get_unique_constraints(self, table):
+        return []
+
+    def get_indexes(self, table):
+        return self.INDEXES.get(table, [])
+
+    def get_columns(self, table):
+        return [{"name": c, "nullable": True} for c in ("user_id", "family_id", "granted_by")]
+
+
+class CompactKeysMigrationTests(unittest.TestCase):
+
+    def build(self):
+        connection = SimpleNamespace(dialect=SimpleNamespace(name="mssql"))
+        with mock.patch.object(compact_keys, "inspect", return_value=FakeInspector()):
+            return compact_keys.build_compact_keys_migration(connection)
+
+    def test_recreated_indexes_keep_filter_and_include(self):
+        statements = self.build()
+
+        self.assertIn(
+            "CREATE UNIQUE INDEX [uq_attendance_sessions_open] ON [attendance_sessions] ([user_id]) "
+            "WHERE ([ended_at] IS NULL)",
+            statements,
+        )
+        self.assertIn(
+            "CREATE INDEX [ix_attendance_user_date_hours] ON [attendance] ([user_id], [date]) "
+            "INCLUDE ([status], [clock_in])",
+            statements,
+        )
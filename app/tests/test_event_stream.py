@@ -0,0 +1,51 @@
+from tests.support import AppTestCase, app, db
+from models import Users
+from auth import issue_token_pair, revoke_all_user_tokens
+from routes.event_routes import STREAM_COOKIE
+
+
+class EventStreamAuthTests(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.admin_id = self.add_user("admin")
+        db.session.get(Users, self.admin_id).role = "admin"
+        db.session.commit()
+        self.access, _ = issue_token_pair(self.admin_id)
+
+        self.client = app.test_client()
+        self.config = dict(app.config)
+        app.config.update(EVENT_COOKIE_SECURE=False, EVENT_AUTH_RECHECK_SECONDS=0.1, EVENT_HEARTBEAT_SECONDS=0.1)
+
+    def tearDown(self):
+        app.config.clear()
+        app.config.update(self.config)
+        super().tearDown()
+
+    def test_event_source_connects_with_session_cookie(self):
+        response = self.client.post(
+            "/api/admin/events/session", headers={"Authorization": f"Bearer {self.access}"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(self.client.get_cookie(STREAM_COOKIE, path="/api/admin/events"))
+
+        # No Authorization header, as with a browser EventSource
+        stream = self.client.get("/api/admin/events", buffered=False)
+        self.assertEqual(stream.status_code, 200)
+        self.assertEqual(next(stream.response), b"retry: 1000\n\n")
+        stream.close()
+
+    def test_stream_closes_after_logout(self):
+        stream = self.client.get(
+            "/api/admin/events", headers={"Authorization": f"Bearer {self.access}"}, buffered=False
+        )
+        frames = iter(stream.response)
+        next(frames)
+
+        revoke_all_user_tokens(self.admin_id)
+
+        rest = b"".join(frames)
+        self.assertIn(b"event: auth.expired", rest)
+
+    def test_stream_without_credentials_is_rejected(self):
+        self.assertEqual(self.client.get("/api/admin/events").status_code, 401)
@@ -0,0 +1,36 @@
+from datetime import date, datetime
+from tests.support import AppTestCase, db
+from models import LeaveRequests
+from directory import get_directory
+from leave import get_leave_calendar
+
+
+class LeaveCalendarTests(AppTestCase):
+
+    def add_leave(self, user_id, from_date, to_date, status="approved"):
+        db.session.add(LeaveRequests(
+            user_id=user_id,
+            leave_type="casual_leave",
+            from_date=from_date,
+            to_date=to_date,
+            days=(to_date - from_date).days + 1,
+            reason="trip",
+            status=status,
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow(),
+        ))
+        db.session.commit()
+
+    def test_available_counts_people_not_leave_entries(self):
+        alice = self.add_user("alice")
+        self.add_user("bob")
+        get_directory().refresh(full=True)
+
+        # Overlapping approved entries for the same person
+        self.add_leave(alice, date(2030, 1, 2), date(2030, 1, 4))
+        self.add_leave(alice, date(2030, 1, 3), date(2030, 1, 3))
+
+        day = get_leave_calendar(department="qa", month=1, year=2030)["days"][2]
+
+        self.assertEqual(day["approved_count"], 2)
+        self.assertEqual(day["available"], 1)
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from tests.support import AppTestCase, db
+from models import OutboxEvents
+from outbox import enqueue, drain_outbox, purge_outbox, register_handler, _handlers
+
+
+class OutboxTests(AppTestCase):
+
+    def tearDown(self):
+        _handlers.pop("test.seen", None)
+        super().tearDown()
+
+    def test_claim_is_committed_before_handlers_run(self):
+        seen = []
+
+        @register_handler("test.seen")
+        def handler(payload):
+            # Another worker polling now must not see the row as due
+            due = OutboxEvents.query.filter(
+                OutboxEvents.status == "pending",
+                OutboxEvents.available_at <= datetime.utcnow(),
+            ).count()
+            seen.append(due)
+
+        enqueue("test.seen", {"n": 1})
+        db.session.commit()
+
+        self.assertEqual(drain_outbox()["delivered"], 1)
+        self.assertEqual(seen, [0])
+
+    def test_purge_deletes_only_old_delivered_rows(self):
+        old = datetime.utcnow() - timedelta(days=30)
+        for status, available_at in (("done", old), ("done", datetime.utcnow()), ("failed", old), ("pending", old)):
+            db.session.add(OutboxEvents(
+                topic="t", payload="{}", status=status, attempts=0,
+                available_at=available_at, created_at=available_at,
+            ))
+        db.session.commit()
+
+        self.assertEqual(purge_outbox(retention_days=7, batch_size=1), 1)
+        self.assertEqual(
+            sorted(r.status for r in OutboxEvents.query),
+            ["done", "failed", "pending"],
+        )
@@ -0,0 +1,75 @@
+from datetime import datetime, time, timedelta
+from tests.support import AppTestCase, db
+from models import Attendance, AttendanceSession, PunchEvent
+from punches import ingest_punches
+
+
+class IngestPunchesTests(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user_id = self.add_user("alice")
+        # Midnight yesterday, so every punch below falls on one day
+        self.start = datetime.combine(datetime.utcnow().date() - timedelta(days=1), time())
+
+    def punch(self, event_id, punch_type, hours, **extra):
+        at = self.start + timedelta(hours=hours)
+        return {"event_id": event_id, "type": punch_type, "occurred_at": at.isoformat(), **extra}
+
+    def ingest(self, events):
+        return ingest_punches(actor_user_id=self.user_id, events=events)
+
+    def test_rejected_event_is_applied_when_retried_in_order(self):
+        clock_out = self.punch("out-1", "clock_out", 8)
+
+        first = self.ingest([clock_out])
+        self.assertEqual(first["results"][0]["result"], "rejected")
+        self.assertEqual(PunchEvent.query.count(), 0)
+
+        retry = self.ingest([self.punch("in-1", "clock_in", 0), clock_out])
+        self.assertEqual([r["result"] for r in retry["results"]], ["applied", "applied"])
+
+    def test_earlier_session_uploaded_late_is_merged_into_the_day(self):
+        # Online 13:00-17:00 first, then an offline 09:00-12:00 sync
+        self.ingest([self.punch("in-13", "clock_in", 13), self.punch("out-17", "clock_out", 17)])
+        late = self.ingest([self.punch("in-9", "clock_in", 9), self.punch("out-12", "clock_out", 12)])
+
+        self.assertEqual([r["result"] for r in late["results"]], ["applied", "applied"])
+
+        db.session.expire_all()
+        day = Attendance.query.filter_by(user_id=self.user_id).one()
+        self.assertEqual(day.clock_in, self.start + timedelta(hours=9))
+        self.assertEqual(day.clock_out, self.start + timedelta(hours=17))
+        self.assertEqual(day.worked_seconds, 7 * 3600)
+        self.assertEqual(AttendanceSession.query.count(), 2)
+
+    def test_earlier_session_before_an_open_one_keeps_the_day_open(self):
+        self.ingest([self.punch("in-13", "clock_in", 13)])
+        late = self.ingest([self.punch("in-9", "clock_in", 9), self.punch("out-12", "clock_out", 12)])
+
+        self.assertEqual([r["result"] for r in late["results"]], ["applied", "applied"])
+
+        db.session.expire_all()
+        day = Attendance.query.filter_by(user_id=self.user_id).one()
+        self.assertEqual(day.clock_in, self.start + timedelta(hours=9))
+        self.assertIsNone(day.clock_out)
+        self.assertEqual(day.open_since, self.start + timedelta(hours=13))
+        self.assertEqual(day.worked_seconds, 3 * 3600)
+
+    def test_late_session_overlapping_a_stored_one_is_rejected(self):
+        self.ingest([self.punch("in-13", "clock_in", 13), self.punch("out-17", "clock_out", 17)])
+        late = self.ingest([self.punch("in-9", "clock_in", 9), self.punch("out-14", "clock_out", 14)])
+
+        self.assertEqual([r["result"] for r in late["results"]], ["rejected", "rejected"])
+        self.assertEqual(late["results"][0]["reason"], "overlaps a later session")
+
+    def test_user_id_must_be_a_uuid_string(self):
+        events = [
+            self.punch("e1", "clock_in", 0, user_id=["x"]),
+            self.punch("e2", "clock_in", 0, user_id=42),
+            self.punch("e3", "clock_in", 0, user_id="not-a-uuid"),
+        ]
+
+        results = self.ingest(events)["results"]
+
+        self.assertEqual([r["result"] for r in results], ["invalid"] * 3)
@@ -0,0 +1,79 @@
+"""
+Statement budgets for the hot write paths (see query_counter.py):
+one write per step, plus the outbox row, no reload SELECTs.
+"""
+
+from datetime import date
+from tests.support import AppTestCase, db
+from models import LeaveRequests
+from query_counter import count_queries
+from attendance import clock_in, clock_out
+from leave import create_leave_request, update_leave_status
+from shifts import shift_for_user
+
+
+class QueryCountTests(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user_id = self.add_user("alice")
+        # Shift rules and the directory are cached per worker
+        shift_for_user(self.user_id)
+
+    def test_first_clock_in(self):
+        with count_queries() as statements:
+            clock_in(user_id=self.user_id)
+
+        # reopen attempt, attendance insert, session insert, outbox
+        self.assertEqual(len(statements), 4, statements)
+
+    def test_clock_out(self):
+        clock_in(user_id=self.user_id)
+
+        with count_queries() as statements:
+            clock_out(user_id=self.user_id)
+
+        # close session, update day, outbox
+        self.assertEqual(len(statements), 3, statements)
+
+    def test_clock_in_reopens_day(self):
+        clock_in(user_id=self.user_id)
+        clock_out(user_id=self.user_id)
+
+        with count_queries() as statements:
+            clock_in(user_id=self.user_id)
+
+        # reopen, session insert, outbox
+        self.assertEqual(len(statements), 3, statements)
+
+    def test_create_leave_request(self):
+        with count_queries() as statements:
+            create_leave_request(
+                user_id=self.user_id,
+                leave_type="Casual Leave",
+                from_date="01/02/2030",
+                to_date="01/03/2030",
+                reason="family",
+            )
+
+        # INSERT ... RETURNING leave_id; no outbox row (nothing to deliver)
+        self.assertEqual(len(statements), 1, statements)
+
+    def test_update_leave_status(self):
+        leave = LeaveRequests(
+            user_id=self.user_id,
+            leave_type="casual_leave",
+            from_date=date(2030, 1, 2),
+            to_date=date(2030, 1, 3),
+            days=2,
+            reason="family",
+            status="pending",
+        )
+        db.session.add(leave)
+        db.session.commit()
+
+        with count_queries() as statements:
+            update_leave_status(leave_id=leave.leave_id, status="approved")
+
+        # conditional update with RETURNING, outbox
+        self.assertEqual(len(statements), 2, statements)
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from tests.support import AppTestCase, db
+from models import TokenServices
+from auth import issue_token_pair, rotate_refresh_token, revoke_family_of_refresh_token, _hash_refresh_token
+from exceptions import RefreshTokenReused
+
+
+class RefreshRotationTests(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user_id = self.add_user("alice")
+        _, self.refresh = issue_token_pair(self.user_id)
+
+    def live_refresh_tokens(self) -> int:
+        db.session.expire_all()
+        return TokenServices.query.filter_by(token_type="refresh", revoked=False).count()
+
+    def test_concurrent_refresh_with_same_token_keeps_the_login(self):
+        # Two tabs send the same token; the second arrives after the
+        # first rotated it
+        _, _, first = rotate_refresh_token(self.refresh)
+        _, _, second = rotate_refresh_token(self.refresh)
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.live_refresh_tokens(), 2)
+
+        # Both tabs keep refreshing normally
+        rotate_refresh_token(first)
+        rotate_refresh_token(second)
+
+    def test_reuse_after_grace_window_revokes_family(self):
+        _, _, child = rotate_refresh_token(self.refresh)
+
+        db.session.execute(
+            update(TokenServices)
+            .where(TokenServices.token_hash == _hash_refresh_token(child))
+            .values(created_at=datetime.utcnow() - timedelta(minutes=5))
+        )
+        db.session.commit()
+
+        with self.assertRaises(RefreshTokenReused):
+            rotate_refresh_token(self.refresh)
+        self.assertEqual(self.live_refresh_tokens(), 0)
+
+    def test_reuse_after_logout_is_not_graced(self):
+        _, _, child = rotate_refresh_token(self.refresh)
+        revoke_family_of_refresh_token(child)
+
+        with self.assertRaises(RefreshTokenReused):
+            rotate_refresh_token(self.refresh)
@@ -0,0 +1,36 @@
+import unittest
+from unittest import mock
+from directory import Employee
+from search import EmployeeSearchIndex
+
+
+def _employee(n, department):
+    return Employee(
+        user_id=f"u{n}",
+        name=f"Sam {department} {n}",
+        employee_id=f"EMP{n:05d}",
+        department=department,
+        designation="engineer",
+        email=None,
+        phone=None,
+        gender=None,
+        updated_at=None,
+    )
+
+
+class SearchIndexTests(unittest.TestCase):
+
+    def test_prefix_cap_counts_department_matches_only(self):
+        # "sa" matches every sales row's "sales" name word before any qa
+        # row; the cap must not be used up by rows the filter drops.
+        # Two letters, so there is no trigram fallback
+        employees = [_employee(n, "sales") for n in range(20)]
+        employees += [_employee(n, "qa") for n in range(20, 25)]
+
+        index = EmployeeSearchIndex()
+        index.sync({e.user_id: e for e in employees})
+
+        with mock.patch("search.MAX_PREFIX_MATCHES", 10):
+            results = index.search("sa", limit=50, department="qa")
+
+        self.assertEqual(sorted(e.user_id for _, e in results), ["u20", "u21", "u22", "u23", "u24"])
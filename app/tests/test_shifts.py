@@ -0,0 +1,71 @@
+from datetime import date, datetime, time
+from sqlalchemy import select
+from tests.support import AppTestCase, db
+from models import Attendance, Shift
+from shifts import shift_for_user
+from attendance_jobs import reclassify_window
+
+
+DAY = date(2024, 3, 4)
+
+
+class ClassificationTests(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        db.session.add(Shift(
+            name="Day", department="qa", start_time=time(9, 0),
+            grace_minutes=10, min_work_minutes=240,
+        ))
+        db.session.commit()
+
+    def test_write_time_and_nightly_paths_agree(self):
+        # (clock_in, worked_seconds, closed) around the 09:10 cutoff
+        cases = [
+            (time(8, 59, 59), 8 * 3600, True),
+            (time(9, 10, 0), 8 * 3600, True),
+            (time(9, 10, 30), 8 * 3600, True),
+            (time(9, 10, 59), 0, False),
+            (time(9, 11, 0), 8 * 3600, True),
+            (time(9, 11, 1), 0, False),
+            (time(9, 30, 0), 3600, True),
+            (time(8, 0, 0), 3600, True),
+        ]
+
+        rows = []
+        for i, (clock_in, worked, closed) in enumerate(cases):
+            user_id = self.add_user(f"user{i}")
+            rule = shift_for_user(user_id, "qa")
+            started = datetime.combine(DAY, clock_in)
+            record = Attendance(
+                user_id=user_id,
+                date=DAY,
+                clock_in=started,
+                open_since=None if closed else started,
+                worked_seconds=worked,
+                status=rule.classify(day=DAY, clock_in=started, worked_seconds=worked, closed=closed),
+                created_at=started,
+                updated_at=started,
+            )
+            db.session.add(record)
+            rows.append((record, rule, closed))
+        db.session.commit()
+
+        for record, rule, closed in rows:
+            in_sql = db.session.execute(
+                select(rule.status_case(day=DAY, worked_seconds=Attendance.worked_seconds, closed=closed))
+                .where(Attendance.attendance_id == record.attendance_id)
+            ).scalar()
+            self.assertEqual(in_sql, record.status, record.clock_in)
+
+        written = {r.attendance_id: r.status for r, _, _ in rows}
+        self.assertEqual(reclassify_window(start=DAY, end=DAY), 0)
+        db.session.commit()
+        db.session.expire_all()
+
+        nightly = {a.attendance_id: a.status for a in Attendance.query}
+        self.assertEqual(nightly, written)
+        self.assertEqual(
+            [written[r.attendance_id] for r, _, _ in rows],
+            ["present", "present", "present", "present", "late", "late", "half_day", "half_day"],
+        )
@@ -0,0 +1,53 @@
+import threading
+import time
+import unittest
+from singleflight import SingleFlight
+
+
+class SingleFlightTests(unittest.TestCase):
+
+    def test_follower_shares_leader_result(self):
+        flight = SingleFlight("test")
+        started, release = threading.Event(), threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return "leader"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+        leader.start()
+        started.wait(5)
+
+        follower = threading.Thread(target=lambda: results.append(flight.do("k", lambda: "follower")))
+        follower.start()
+        while flight.metrics()["coalesced"] == 0:
+            time.sleep(0.01)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+        self.assertEqual(results, ["leader", "leader"])
+
+    def test_follower_stops_waiting_for_a_hung_leader(self):
+        flight = SingleFlight("test")
+        started, release = threading.Event(), threading.Event()
+
+        def hung():
+            started.set()
+            release.wait(5)
+            return "leader"
+
+        leader = threading.Thread(target=lambda: flight.do("k", hung))
+        leader.start()
+        started.wait(5)
+
+        try:
+            result = flight.do("k", lambda: "follower", wait_seconds=0.05)
+        finally:
+            release.set()
+            leader.join(5)
+
+        self.assertEqual(result, "follower")
+        self.assertEqual(flight.metrics()["timed_out"], 1)
@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date, datetime
+from tests.support import AppTestCase, db
+from models import Attendance
+from snapshot import export_snapshots
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+@unittest.skipIf(pq is None, "pyarrow not installed")
+class IncrementalSnapshotTests(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.out_dir = tempfile.mkdtemp()
+        self.user_id = self.add_user("alice")
+        self.rows = {}
+        for day in (date(2024, 1, 10), date(2024, 1, 11), date(2024, 2, 5)):
+            record = Attendance(
+                user_id=self.user_id, date=day, status="present",
+                clock_in=datetime.combine(day, datetime.min.time()),
+                created_at=datetime(2024, 3, 1), updated_at=datetime(2024, 3, 1),
+            )
+            db.session.add(record)
+            self.rows[day] = record
+        db.session.commit()
+        export_snapshots(out_dir=self.out_dir, tables=["attendance"])
+
+    def tearDown(self):
+        shutil.rmtree(self.out_dir)
+        super().tearDown()
+
+    def exported_dates(self) -> list:
+        table = pq.read_table(os.path.join(self.out_dir, "attendance"))
+        return sorted(table.column("date").to_pylist())
+
+    def test_deleted_rows_leave_the_snapshot(self):
+        db.session.delete(self.rows[date(2024, 2, 5)])
+        db.session.delete(self.rows[date(2024, 1, 10)])
+        db.session.commit()
+
+        export_snapshots(out_dir=self.out_dir, tables=["attendance"])
+
+        self.assertEqual(self.exported_dates(), [date(2024, 1, 11)])
+
+    def test_moved_row_leaves_its_old_partition(self):
+        record = self.rows[date(2024, 2, 5)]
+        record.date = date(2024, 1, 12)
+        record.updated_at = datetime(2024, 3, 2)
+        db.session.commit()
+
+        export_snapshots(out_dir=self.out_dir, tables=["attendance"])
+
+        self.assertEqual(self.exported_dates(), [date(2024, 1, 10), date(2024, 1, 11), date(2024, 1, 12)])
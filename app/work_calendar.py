@@ -0,0 +1,108 @@
+from datetime import date, datetime, timedelta
+from flask import current_app
+from models import db, UsersInfo
+
+
+class WorkCalendar:
+    """
+    Working-day calendar with public holidays and per-department weekends.
+
+    For every (year, weekend rule) a prefix table is built once:
+    prefix[n] = working days in the first n days of the year,
+    so counting working days between two dates is O(1) per year spanned.
+    """
+
+    def __init__(self, *, holidays=(), default_weekend=(5, 6), department_weekends=None):
+        self.holidays = frozenset(holidays)
+        self.default_weekend = frozenset(default_weekend)
+        self.department_weekends = {
+            dept: frozenset(days) for dept, days in (department_weekends or {}).items()
+        }
+        self._prefix_tables = {}
+
+    @classmethod
+    def from_config(cls, config) -> "WorkCalendar":
+        holidays = [
+            datetime.strptime(d, "%Y-%m-%d").date() if isinstance(d, str) else d
+            for d in config.get("HOLIDAYS", [])
+        ]
+        return cls(
+            holidays=holidays,
+            default_weekend=config.get("DEFAULT_WEEKEND", (5, 6)),
+            department_weekends=config.get("DEPARTMENT_WEEKENDS", {}),
+        )
+
+    def weekend_for(self, department: str | None) -> frozenset:
+        return self.department_weekends.get(department, self.default_weekend)
+
+    def is_working_day(self, day: date, department: str | None = None) -> bool:
+        if day in self.holidays:
+            return False
+        return day.weekday() not in self.weekend_for(department)
+
+    def working_days_between(self, start: date, end: date, department: str | None = None) -> int:
+        """
+        Counts working days in [start, end], both inclusive.
+        """
+
+        if end < start:
+            return 0
+
+        weekend = self.weekend_for(department)
+
+        if start.year == end.year:
+            prefix = self._prefix(start.year, weekend)
+            return prefix[_day_of_year(end)] - prefix[_day_of_year(start) - 1]
+
+        first = self._prefix(start.year, weekend)
+        last = self._prefix(end.year, weekend)
+
+        total = first[-1] - first[_day_of_year(start) - 1]
+        for year in range(start.year + 1, end.year):
+            total += self._prefix(year, weekend)[-1]
+        total += last[_day_of_year(end)]
+
+        return total
+
+    def _prefix(self, year: int, weekend: frozenset) -> list:
+        key = (year, weekend)
+        table = self._prefix_tables.get(key)
+        if table is not None:
+            return table
+
+        table = [0]
+        day = date(year, 1, 1)
+        while day.year == year:
+            working = day.weekday() not in weekend and day not in self.holidays
+            table.append(table[-1] + (1 if working else 0))
+            day += timedelta(days=1)
+
+        self._prefix_tables[key] = table
+        return table
+
+
+def _day_of_year(day: date) -> int:
+    return day.timetuple().tm_yday
+
+
+def get_work_calendar() -> WorkCalendar:
+    """
+    Returns the app-wide calendar, built from config on first use.
+    """
+
+    calendar = current_app.extensions.get("work_calendar")
+    if calendar is None:
+        calendar = WorkCalendar.from_config(current_app.config)
+        current_app.extensions["work_calendar"] = calendar
+
+    return calendar
+
+
+def get_user_department(user_id: str) -> str | None:
+    """
+    Returns the user's department (None if no profile).
+    """
+
+    return db.session.query(
+        UsersInfo.department
+    ).filter_by(user_id=user_id).scalar()
@@ -0,0 +1,50 @@
+#!/usr/bin/env bash
+# Compares response size and latency through nginx for the bulk JSON
+# endpoints: identity vs gzip, and cold vs micro-cached.
+#
+# Usage: TOKEN=<admin access token> ./bench.sh [base_url] [requests]
+
+set -euo pipefail
+
+BASE_URL="${1:-http://localhost}"
+REQUESTS="${2:-20}"
+: "${TOKEN:?set TOKEN to an admin access token}"
+
+ENDPOINTS=(
+    "/api/admin/leave-requests"
+    "/api/admin/attendance/live"
+)
+
+measure() {
+    local url="$1"; shift
+    # prints: bytes total_seconds cache_status
+    curl -s -o /dev/null -D - "$@" \
+        -H "Authorization: Bearer ${TOKEN}" \
+        -w '%{size_download} %{time_total}\n' "$url" \
+        | awk 'tolower($1) == "x-cache-status:" { cache = $2 }
+               /^[0-9]+ [0-9.]+$/ { print $1, $2, (cache ? cache : "-") }' \
+        | tr -d '\r'
+}
+
+run() {
+    local label="$1" url="$2"; shift 2
+    local total=0 bytes=0 hits=0
+
+    for _ in $(seq "$REQUESTS"); do
+        read -r size seconds cache < <(measure "$url" "$@")
+        bytes="$size"
+        total=$(awk -v a="$total" -v b="$seconds" 'BEGIN { print a + b }')
+        [[ "$cache" == "HIT" ]] && hits=$((hits + 1))
+    done
+
+    awk -v l="$label" -v b="$bytes" -v t="$total" -v n="$REQUESTS" -v h="$hits" \
+        'BEGIN { printf "  %-22s %10d bytes %9.2f ms avg %4d cache hits\n", l, b, t / n * 1000, h }'
+}
+
+for endpoint in "${ENDPOINTS[@]}"; do
+    url="${BASE_URL}${endpoint}"
+    echo "${endpoint}"
+    run "identity, no cache" "$url" -H "Accept-Encoding: identity" -H "Cache-Control: no-cache"
+    run "gzip, no cache" "$url" -H "Accept-Encoding: gzip" -H "Cache-Control: no-cache"
+    run "gzip, micro-cached" "$url" -H "Accept-Encoding: gzip"
+done
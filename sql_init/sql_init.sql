@@ -1,3 +1,7 @@
+-- NOTE: kept for reference only; this MySQL script predates the
+-- current models. The schema is managed by versioned migrations in
+-- app/migrations (`flask db-upgrade`, `flask db-status`).
+
 CREATE DATABASE IF NOT EXISTS pass_app;
 USE pass_app;
 